@@ -1,11 +1,21 @@
 from __future__ import annotations
 
-import os
+from typing import TYPE_CHECKING
 
-# Enable the new experimental OpenAPI parser for FastMCP
-# This must be set before importing FastMCP to ensure tools are properly created
-os.environ["FASTMCP_EXPERIMENTAL_ENABLE_NEW_OPENAPI_PARSER"] = "true"
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from fastmcp import FastMCP
+
+    from .main import create_app
+
+
+def __getattr__(name: str) -> FastAPI | FastMCP:
+    # Importing a submodule such as app.services must not build the app
+    if name not in ("app", "create_app", "mcp"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from . import main
+
+    return getattr(main, name)
 
-from .main import app, create_app, mcp
 
 __all__ = ["app", "create_app", "mcp"]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from ..compression import build_compressors, negotiate_encoding
+from ..config import COMPRESSION_LEVEL, COMPRESSION_MINIMUM_SIZE
+from ..models import (
+    CheapestSearchResponse,
+    SearchResponse,
+    SearchView,
+    SummarySearchResponse,
+)
+from ..services import render_search_response
+
+# Documented response shape of the search endpoints for every available view
+SearchViewResponse = SearchResponse | SummarySearchResponse | CheapestSearchResponse
+
+_COMPRESSORS = build_compressors(COMPRESSION_LEVEL)
+_ENCODINGS = tuple(_COMPRESSORS)
+
+
+class PydanticJSONResponse(Response):
+    """
+    JSON response encoded directly by pydantic-core.
+
+    Models are serialized with their compiled serializer in a single pass,
+    skipping FastAPI's response re-validation and ``json.dumps``. Pre-rendered
+    bytes are sent as they are.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes | memoryview:
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return super().render(content)
+
+
+def search_view_response(
+    response: SearchResponse,
+    view: SearchView,
+    http_request: Request,
+    payloads: dict[str, bytes] | None = None,
+) -> Response:
+    """
+    Render a search response in the requested view.
+
+    When ``payloads`` (the store of a live cache entry) is given, the rendered
+    body and its compressed variants are reused from and saved into it.
+    """
+    if payloads is None:
+        payloads = {}
+
+    body = payloads.get(view.value)
+    if body is None:
+        body = payloads[view.value] = render_search_response(response, view)
+
+    encoding = negotiate_encoding(
+        http_request.headers.get("accept-encoding", ""), _ENCODINGS
+    )
+    if len(body) < COMPRESSION_MINIMUM_SIZE:
+        return PydanticJSONResponse(content=body)
+    if encoding is None:
+        return PydanticJSONResponse(content=body, headers={"Vary": "Accept-Encoding"})
+
+    variant = f"{view.value}:{encoding}"
+    compressed = payloads.get(variant)
+    if compressed is None:
+        compressed = payloads[variant] = _COMPRESSORS[encoding](body)
+    return PydanticJSONResponse(
+        content=compressed,
+        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+    )
@@ -2,12 +2,30 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
-from .routes import categories_router, health_router, search_router
+from .routes import (
+    admin_router,
+    basket_router,
+    categories_router,
+    changes_router,
+    compare_router,
+    health_router,
+    history_router,
+    metrics_router,
+    search_router,
+    suggest_router,
+)
 
 
 def build_api_router() -> APIRouter:
     router = APIRouter()
     router.include_router(health_router)
+    router.include_router(metrics_router)
     router.include_router(search_router)
     router.include_router(categories_router)
+    router.include_router(suggest_router)
+    router.include_router(basket_router)
+    router.include_router(compare_router)
+    router.include_router(history_router)
+    router.include_router(changes_router)
+    router.include_router(admin_router)
     return router
@@ -1,7 +1,25 @@
 from __future__ import annotations
 
+from .admin import router as admin_router
+from .basket import router as basket_router
 from .categories import router as categories_router
+from .changes import router as changes_router
+from .compare import router as compare_router
 from .health import router as health_router
+from .history import router as history_router
+from .metrics import router as metrics_router
 from .search import router as search_router
+from .suggest import router as suggest_router
 
-__all__ = ["health_router", "search_router", "categories_router"]
+__all__ = [
+    "health_router",
+    "metrics_router",
+    "search_router",
+    "categories_router",
+    "suggest_router",
+    "basket_router",
+    "compare_router",
+    "history_router",
+    "changes_router",
+    "admin_router",
+]
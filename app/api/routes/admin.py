@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from ...services import MarketfiyatService
+from ..dependencies import get_marketfiyat_service
+
+router = APIRouter(prefix="/admin")
+
+
+@router.get("/cache", tags=["admin"])
+async def get_cache_stats(
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> dict:
+    """
+    Get cache statistics.
+
+    Reports cache occupancy, the product registry and how much memory the
+    shared string vocabulary saves across the live cache entries.
+    """
+    return service.cache_stats()
+
+
+@router.get("/prewarm", tags=["admin"])
+async def get_prewarm_stats(request: Request) -> dict:
+    """Get cache pre-warmer statistics"""
+    return request.app.state.prewarmer.stats()
+
+
+@router.get("/queries/top", tags=["admin"])
+async def get_top_queries(
+    limit: Annotated[
+        int, Query(ge=1, le=100, description="Number of queries to return")
+    ] = 20,
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> dict:
+    """
+    Get the most frequent searches.
+
+    Keywords are case and diacritic folded and coordinates rounded to about
+    100 m; counts are Count-Min estimates that decay over time.
+    """
+    return {
+        "total": service.queries.total,
+        "queries": service.top_queries(limit),
+    }
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ...models import BasketRequest, BasketResponse
+from ...services import MarketfiyatService, MarketfiyatServiceError, optimize_basket
+from ..dependencies import get_marketfiyat_service
+from ..responses import PydanticJSONResponse
+
+router = APIRouter()
+
+
+@router.post(
+    "/basket",
+    response_model=BasketResponse,
+    response_class=PydanticJSONResponse,
+    tags=["basket"],
+)
+async def basket(
+    request: BasketRequest,
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> PydanticJSONResponse:
+    """
+    Find the cheapest place to buy a shopping list.
+
+    Searches every item near the given location and returns the cheapest
+    single-store basket together with the cheapest basket split across at
+    most maxStores depots.
+    """
+    try:
+        response = await optimize_basket(service, request)
+    except MarketfiyatServiceError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+    return PydanticJSONResponse(response)
@@ -1,22 +1,39 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated
 
-from ...models import CategoriesResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ...models import (
+    CategoriesResponse,
+    Category,
+    CategoryLookupResponse,
+    CategoryTreeResponse,
+)
 from ...services import MarketfiyatService, MarketfiyatServiceError
+from ...services.category_tree import CategoryTree
 from ..dependencies import get_marketfiyat_service
+from ..responses import PydanticJSONResponse
 
 router = APIRouter()
 
 
+async def _category_tree(service: MarketfiyatService) -> CategoryTree:
+    try:
+        return await service.get_category_tree()
+    except MarketfiyatServiceError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+
 @router.get(
     "/categories",
     response_model=CategoriesResponse,
+    response_class=PydanticJSONResponse,
     tags=["categories"],
 )
 async def get_categories(
     service: MarketfiyatService = Depends(get_marketfiyat_service),
-) -> CategoriesResponse:
+) -> PydanticJSONResponse:
     """
     Get available product categories.
 
@@ -24,6 +41,74 @@ async def get_categories(
     from the Marketfiyati API.
     """
     try:
-        return await service.get_categories()
+        categories = await service.get_categories()
     except MarketfiyatServiceError as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+    return PydanticJSONResponse(categories)
+
+
+@router.get(
+    "/categories/tree",
+    response_model=CategoryTreeResponse,
+    response_class=PydanticJSONResponse,
+    tags=["categories"],
+)
+async def get_category_tree(
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> PydanticJSONResponse:
+    """
+    Get the main categories with their subcategory counts.
+
+    Use /categories/{name} to expand one main category.
+    """
+    tree = await _category_tree(service)
+    return PydanticJSONResponse(tree.summary())
+
+
+@router.get(
+    "/categories/lookup",
+    response_model=CategoryLookupResponse,
+    response_class=PydanticJSONResponse,
+    tags=["categories"],
+)
+async def lookup_categories(
+    name: Annotated[
+        list[str],
+        Query(
+            min_length=1,
+            max_length=100,
+            description=(
+                "Category or subcategory names, e.g. sub_category facet names "
+                "from a search; matching ignores case and Turkish diacritics"
+            ),
+        ),
+    ],
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> PydanticJSONResponse:
+    """
+    Resolve category names to their main category.
+
+    Validates search_by_categories keywords and maps subcategories back to
+    their parent category.
+    """
+    tree = await _category_tree(service)
+    return PydanticJSONResponse(tree.lookup(name))
+
+
+@router.get(
+    "/categories/{name}",
+    response_model=Category,
+    response_class=PydanticJSONResponse,
+    tags=["categories"],
+)
+async def get_category(
+    name: str,
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> PydanticJSONResponse:
+    """Get one main category with its subcategories"""
+    tree = await _category_tree(service)
+    category = tree.main_category(name)
+    if category is None:
+        raise HTTPException(status_code=404, detail=f"Unknown category: {name}")
+    return PydanticJSONResponse(category)
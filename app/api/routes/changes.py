@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from ...models import ChangeFeedResponse
+from ...services import MarketfiyatService
+from ..dependencies import get_marketfiyat_service
+from ..responses import PydanticJSONResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/changes",
+    response_model=ChangeFeedResponse,
+    response_class=PydanticJSONResponse,
+    tags=["changes"],
+)
+async def get_changes(
+    since: Annotated[
+        str | None,
+        Query(description="Token returned by the previous poll; omit to start"),
+    ] = None,
+    limit: Annotated[
+        int, Query(ge=1, le=1000, description="Maximum number of changes")
+    ] = 500,
+    market: Annotated[
+        str | None, Query(description="Only return changes for one market")
+    ] = None,
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> PydanticJSONResponse:
+    """
+    Get price changes since a token.
+
+    Returns only the offers whose price changed, or that appeared, in search
+    results fetched after the token was issued. Poll again with nextToken to
+    continue; when reset is true, re-fetch full results first.
+    """
+    return PydanticJSONResponse(service.changes.changes_since(since, limit, market))
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ...models import PriceComparisonResponse, SearchRequest
+from ...services import MarketfiyatService, MarketfiyatServiceError, compare_prices
+from ..dependencies import get_marketfiyat_service
+from ..responses import PydanticJSONResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/compare",
+    response_model=PriceComparisonResponse,
+    response_class=PydanticJSONResponse,
+    tags=["search"],
+)
+async def compare(
+    keywords: Annotated[str, Query(description="Search keywords")],
+    latitude: Annotated[float, Query(description="User latitude coordinate")],
+    longitude: Annotated[float, Query(description="User longitude coordinate")],
+    distance: Annotated[
+        int, Query(ge=1, description="Search radius in kilometers")
+    ] = 1,
+    size: Annotated[
+        int, Query(ge=1, le=100, description="Number of products per page")
+    ] = 24,
+    page_count: Annotated[
+        int, Query(ge=1, le=10, description="Number of result pages to compare")
+    ] = 1,
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> PydanticJSONResponse:
+    """
+    Compare the prices of a search per market.
+
+    Returns the lowest, median and highest price and unit price of every
+    market near the location, together with its cheapest depot offer.
+    """
+    request = SearchRequest(
+        keywords=keywords,
+        latitude=latitude,
+        longitude=longitude,
+        distance=distance,
+        size=size,
+    )
+    try:
+        response = await compare_prices(service, request, page_count)
+    except MarketfiyatServiceError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+    return PydanticJSONResponse(response)
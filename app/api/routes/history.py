@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ...models import PriceHistoryResponse
+from ...services import MarketfiyatService
+from ..dependencies import get_marketfiyat_service
+from ..responses import PydanticJSONResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/history/{product_id}",
+    response_model=PriceHistoryResponse,
+    response_class=PydanticJSONResponse,
+    tags=["history"],
+)
+async def get_price_history(
+    product_id: str,
+    market: Annotated[
+        str | None, Query(description="Limit the history to one market (e.g. bim)")
+    ] = None,
+    days: Annotated[
+        int, Query(ge=1, le=365, description="Number of days to look back")
+    ] = 30,
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> PydanticJSONResponse:
+    """
+    Get the price trend of a product.
+
+    Answers from the local history of previously seen search results without
+    calling the Marketfiyati API.
+    """
+    if service.history is None:
+        raise HTTPException(status_code=503, detail="Price history is not enabled")
+
+    trend = await service.history.price_trend(product_id, market, days)
+    return PydanticJSONResponse(trend)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Response
+
+from ...metrics import CONTENT_TYPE
+from ...services import MarketfiyatService
+from ..dependencies import get_marketfiyat_service
+
+router = APIRouter()
+
+
+@router.get("/metrics", tags=["health"], response_class=Response)
+async def get_metrics(
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> Response:
+    """
+    Get metrics in the Prometheus text format.
+
+    Covers request latency and status codes per route, MCP tool calls,
+    Marketfiyati API requests, cache hits and misses and the upstream
+    connection pool.
+    """
+    return Response(service.metrics.render(), media_type=CONTENT_TYPE)
@@ -2,42 +2,127 @@ from __future__ import annotations
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
-from ...models import SearchByCategoryRequest, SearchRequest, SearchResponse
+from ...models import SearchByCategoryRequest, SearchRequest, SearchView
 from ...services import MarketfiyatService, MarketfiyatServiceError
+from ...timing import record_timing, timed
 from ..dependencies import get_marketfiyat_service
+from ..responses import (
+    PydanticJSONResponse,
+    SearchViewResponse,
+    search_view_response,
+)
 
 router = APIRouter()
 
+ViewQuery = Annotated[
+    SearchView,
+    Query(
+        description=(
+            "Response shape: 'full' returns every field, 'summary' returns title, "
+            "brand and minimum price, 'cheapest' returns the cheapest offer "
+            "per product"
+        )
+    ),
+]
+
+PageCountQuery = Annotated[
+    int,
+    Query(
+        ge=1,
+        le=10,
+        description=(
+            "Number of consecutive pages to fetch, starting at 'pages', merged "
+            "into one response with duplicate products removed"
+        ),
+    ),
+]
+
+LocalQuery = Annotated[
+    bool,
+    Query(
+        description=(
+            "Answer from the local product index when the same area was searched "
+            "recently, falling back to the Marketfiyati API otherwise. Cannot be "
+            "combined with page_count above 1"
+        )
+    ),
+]
+
+
+async def _search_response(
+    service: MarketfiyatService,
+    request: SearchRequest,
+    page_count: int,
+    view: SearchView,
+    http_request: Request,
+    local: bool = False,
+) -> Response:
+    if local and page_count > 1:
+        raise HTTPException(
+            status_code=422, detail="local cannot be combined with page_count above 1"
+        )
+    with record_timing() as timing:
+        response = service.search_local(request) if local else None
+        if response is not None:
+            timing.mark_cache("local")
+            payloads = None
+        else:
+            try:
+                if page_count > 1:
+                    response = await service.search_pages(request, page_count)
+                elif isinstance(request, SearchByCategoryRequest):
+                    response = await service.search_by_categories(request)
+                else:
+                    response = await service.search(request)
+            except MarketfiyatServiceError as exc:
+                raise HTTPException(
+                    status_code=exc.status_code, detail=exc.message
+                ) from exc
+
+            # Merged multi-page results are not cached as a unit
+            payloads = service.get_payload_cache(request) if page_count == 1 else None
+
+        with timed("serialize"):
+            rendered = search_view_response(response, view, http_request, payloads)
+        rendered.headers["Server-Timing"] = timing.header()
+    return rendered
+
 
 @router.post(
     "/search",
-    response_model=SearchResponse,
+    response_model=SearchViewResponse,
+    response_class=PydanticJSONResponse,
     tags=["search"],
 )
 async def search(
     request: SearchRequest,
+    http_request: Request,
+    page_count: PageCountQuery = 1,
+    view: ViewQuery = SearchView.FULL,
+    local: LocalQuery = False,
     service: MarketfiyatService = Depends(get_marketfiyat_service),
-) -> SearchResponse:
+) -> Response:
     """
     Search for products by keywords.
 
     This endpoint allows you to search for products available in Turkish markets
     based on keywords, location, and other filters (without menuCategory parameter).
     """
-    try:
-        return await service.search(request)
-    except MarketfiyatServiceError as exc:
-        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+    return await _search_response(
+        service, request, page_count, view, http_request, local
+    )
 
 
 @router.get(
     "/search",
-    response_model=SearchResponse,
+    response_model=SearchViewResponse,
+    response_class=PydanticJSONResponse,
     tags=["search"],
 )
 async def search_get(
+    http_request: Request,
     keywords: Annotated[str, Query(description="Search keywords")],
     latitude: Annotated[float, Query(description="User latitude coordinate")],
     longitude: Annotated[float, Query(description="User longitude coordinate")],
@@ -48,8 +133,11 @@ async def search_get(
     distance: Annotated[
         int, Query(ge=1, description="Search radius in kilometers")
     ] = 1,
+    page_count: PageCountQuery = 1,
+    view: ViewQuery = SearchView.FULL,
+    local: LocalQuery = False,
     service: MarketfiyatService = Depends(get_marketfiyat_service),
-) -> SearchResponse:
+) -> Response:
     """
     Search for products by keywords (GET method).
 
@@ -65,21 +153,24 @@ async def search_get(
         distance=distance,
     )
 
-    try:
-        return await service.search(request)
-    except MarketfiyatServiceError as exc:
-        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+    return await _search_response(
+        service, request, page_count, view, http_request, local
+    )
 
 
 @router.post(
     "/search_by_categories",
-    response_model=SearchResponse,
+    response_model=SearchViewResponse,
+    response_class=PydanticJSONResponse,
     tags=["search"],
 )
 async def search_by_categories(
     request: SearchByCategoryRequest,
+    http_request: Request,
+    page_count: PageCountQuery = 1,
+    view: ViewQuery = SearchView.FULL,
     service: MarketfiyatService = Depends(get_marketfiyat_service),
-) -> SearchResponse:
+) -> Response:
     """
     Search for products by categories and keywords.
 
@@ -87,18 +178,17 @@ async def search_by_categories(
     based on categories, keywords, location, and other
     filters (with menuCategory parameter).
     """
-    try:
-        return await service.search_by_categories(request)
-    except MarketfiyatServiceError as exc:
-        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+    return await _search_response(service, request, page_count, view, http_request)
 
 
 @router.get(
     "/search_by_categories",
-    response_model=SearchResponse,
+    response_model=SearchViewResponse,
+    response_class=PydanticJSONResponse,
     tags=["search"],
 )
 async def search_by_categories_get(
+    http_request: Request,
     keywords: Annotated[str, Query(description="Search keywords or category name")],
     latitude: Annotated[float, Query(description="User latitude coordinate")],
     longitude: Annotated[float, Query(description="User longitude coordinate")],
@@ -112,8 +202,10 @@ async def search_by_categories_get(
     distance: Annotated[
         int, Query(ge=1, description="Search radius in kilometers")
     ] = 1,
+    page_count: PageCountQuery = 1,
+    view: ViewQuery = SearchView.FULL,
     service: MarketfiyatService = Depends(get_marketfiyat_service),
-) -> SearchResponse:
+) -> Response:
     """
     Search for products by categories and keywords (GET method).
 
@@ -130,7 +222,4 @@ async def search_by_categories_get(
         distance=distance,
     )
 
-    try:
-        return await service.search_by_categories(request)
-    except MarketfiyatServiceError as exc:
-        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+    return await _search_response(service, request, page_count, view, http_request)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+
+from ...models import SuggestResponse
+from ...services import MarketfiyatService
+from ..dependencies import get_marketfiyat_service
+from ..responses import PydanticJSONResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/suggest",
+    response_model=SuggestResponse,
+    response_class=PydanticJSONResponse,
+    tags=["suggest"],
+)
+async def suggest(
+    q: Annotated[
+        str, Query(min_length=1, max_length=100, description="Typed search prefix")
+    ],
+    limit: Annotated[
+        int, Query(ge=1, le=10, description="Maximum number of suggestions")
+    ] = 10,
+    service: MarketfiyatService = Depends(get_marketfiyat_service),
+) -> PydanticJSONResponse:
+    """
+    Suggest search keywords for a typed prefix.
+
+    Suggestions come from category names and from searches, brands and product
+    titles seen earlier, ranked by how often they were searched. Matching
+    ignores case and Turkish diacritics, and never calls the upstream API.
+    """
+    return PydanticJSONResponse(
+        SuggestResponse(query=q, suggestions=service.suggestions.suggest(q, limit))
+    )
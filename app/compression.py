@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import gzip
+from collections.abc import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # pragma: no cover - optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+Compressor = Callable[[bytes], bytes]
+
+# Preferred encodings when the client accepts several with the same quality
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+
+# Streaming responses (SSE) must reach the client event by event
+EXCLUDED_CONTENT_TYPES = ("text/event-stream",)
+
+
+def build_compressors(level: int) -> dict[str, Compressor]:
+    """Build a compressor for every encoding supported by the installed libraries"""
+    compressors: dict[str, Compressor] = {
+        "gzip": lambda body: gzip.compress(
+            body, compresslevel=min(max(level, 1), 9), mtime=0
+        ),
+    }
+    if brotli is not None:
+        quality = min(max(level, 0), 11)
+        compressors["br"] = lambda body: brotli.compress(body, quality=quality)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=min(max(level, 1), 22))
+        compressors["zstd"] = compressor.compress
+    return compressors
+
+
+def negotiate_encoding(accept_encoding: str, supported: tuple[str, ...]) -> str | None:
+    """Pick the best supported encoding from an Accept-Encoding header value"""
+    if not accept_encoding:
+        return None
+
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    best: str | None = None
+    best_quality = 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in supported:
+            continue
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli/zstd compression for complete responses.
+
+    Responses that are smaller than ``minimum_size``, already encoded or
+    streamed (e.g. server-sent events) are passed through untouched. Every
+    other response carries ``Vary: Accept-Encoding``, compressed or not, so
+    shared caches never hand one client's encoding to another.
+    """
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = 1024, compresslevel: int = 5
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors = build_compressors(compresslevel)
+        self.encodings = tuple(self.compressors)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        compressor = self.compressors[encoding] if encoding is not None else None
+        responder = _CompressionResponder(send, compressor, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        send: Send,
+        compressor: Compressor | None,
+        encoding: str | None,
+        minimum_size: int,
+    ) -> None:
+        self._send = send
+        self._compressor = compressor
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._start_message: Message | None = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or content_type.startswith(
+                EXCLUDED_CONTENT_TYPES
+            ):
+                self._passthrough = True
+                await self._send(message)
+            else:
+                self._start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self._start_message is None:
+            await self._send(message)
+            return
+
+        start_message = self._start_message
+        self._start_message = None
+        body = message.get("body", b"")
+
+        if message.get("more_body", False) or len(body) < self._minimum_size:
+            # Streamed or small bodies are forwarded as they are
+            self._passthrough = True
+            await self._send(start_message)
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(raw=start_message["headers"])
+        if "accept-encoding" not in headers.get("vary", "").lower():
+            headers.add_vary_header("Accept-Encoding")
+        if self._compressor is None:
+            await self._send(start_message)
+            await self._send(message)
+            return
+
+        compressed = self._compressor(body)
+        headers["Content-Encoding"] = self._encoding
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(start_message)
+        await self._send({"type": "http.response.body", "body": compressed})
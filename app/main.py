@@ -1,22 +1,40 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
-from typing import cast
+from typing import TYPE_CHECKING
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastmcp import FastMCP
 
 from .api import build_api_router
+from .compression import CompressionMiddleware
 from .config import (
     ALLOWED_ORIGINS,
     API_DESCRIPTION,
     API_TITLE,
     API_VERSION,
+    COMPRESSION_LEVEL,
+    COMPRESSION_MINIMUM_SIZE,
     DEFAULT_CACHE_SECONDS,
+    PREWARM_INTERVAL_SECONDS,
+    PREWARM_LEAD_SECONDS,
+    PREWARM_LEARNED,
+    PREWARM_RATE,
+    PREWARM_TARGETS,
+    PRICE_HISTORY_PATH,
+    TRACE_EXPORT_PATH,
+    TRACE_EXPORTER,
 )
-from .mcp import configure_mcp
-from .services import MarketfiyatService
+from .mcp_mount import configure_lazy_mcp, get_mcp_server
+from .metrics import Metrics, MetricsMiddleware
+from .schema_artifact import load_schema_artifact
+from .services import CachePrewarmer, MarketfiyatService, PriceHistoryStore
+from .services.prewarm import parse_targets
+from .tracing import Tracer, TracingMiddleware, load_span_exporter
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
 
 
 @asynccontextmanager
@@ -24,12 +42,17 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     await app.state.marketfiyat_service.initialize()
+    app.state.prewarmer.start()
     yield
     # Shutdown
+    await app.state.mcp_mount.close()
+    await app.state.prewarmer.stop()
     await app.state.marketfiyat_service.close()
+    # Waits for buffered spans to reach the exporter's file or collector
+    await asyncio.to_thread(app.state.tracer.close)
 
 
-def create_app() -> FastAPI:
+def create_app(use_artifact: bool = True) -> FastAPI:
     app = FastAPI(
         title=API_TITLE,
         description=API_DESCRIPTION,
@@ -47,18 +70,61 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MINIMUM_SIZE,
+        compresslevel=COMPRESSION_LEVEL,
+    )
+
+    tracer = Tracer(load_span_exporter(TRACE_EXPORTER, TRACE_EXPORT_PATH))
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    app.state.tracer = tracer
+
+    # Added last so it is outermost and times the whole request
+    metrics = Metrics()
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    app.state.metrics = metrics
 
-    app.state.marketfiyat_service = MarketfiyatService(DEFAULT_CACHE_SECONDS)
+    history = PriceHistoryStore(PRICE_HISTORY_PATH) if PRICE_HISTORY_PATH else None
+    app.state.marketfiyat_service = MarketfiyatService(
+        DEFAULT_CACHE_SECONDS, history=history, metrics=metrics, tracer=tracer
+    )
+    # Without a cache there is nothing to keep warm
+    warm = DEFAULT_CACHE_SECONDS > 0
+    app.state.prewarmer = CachePrewarmer(
+        app.state.marketfiyat_service,
+        targets=parse_targets(PREWARM_TARGETS) if warm else [],
+        learned=PREWARM_LEARNED if warm else 0,
+        interval=PREWARM_INTERVAL_SECONDS,
+        lead_seconds=PREWARM_LEAD_SECONDS,
+        rate=PREWARM_RATE,
+    )
 
     app.include_router(build_api_router())
 
-    configure_mcp(app)
+    # Serve the precomputed schemas when they match the routes
+    artifact = load_schema_artifact(app) if use_artifact else None
+    if artifact is not None:
+        app.openapi_schema = artifact["openapi"]
+    app.state.schema_artifact = artifact
+
+    configure_lazy_mcp(app)
 
     return app
 
 
-app = create_app()
-mcp = cast(FastMCP, app.state.mcp)
+_app: FastAPI | None = None
+
+
+def __getattr__(name: str) -> FastAPI | FastMCP:
+    # Build the module-level app on first access (``uvicorn app.main:app``),
+    # so importing create_app does not construct a throwaway application
+    global _app
+    if name not in ("app", "mcp"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app if name == "app" else get_mcp_server(_app)
 
 
-__all__ = ["app", "create_app", "mcp"]
+__all__ = ["app", "create_app", "mcp"]  # noqa: F822 - built by __getattr__
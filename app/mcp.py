@@ -1,43 +1,628 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
-from fastmcp import FastMCP
+import json
+import time
+from collections.abc import Callable
+from typing import Annotated, Any
 
-try:  # pragma: no cover - depends on installed FastMCP version
-    from fastmcp.experimental.server.openapi import MCPType, RouteMap
-except ImportError:  # pragma: no cover
-    from fastmcp.server.openapi import MCPType, RouteMap
+from fastmcp import Context, FastMCP
+from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.http import StarletteWithLifespan, create_streamable_http_app
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp.server.streamable_http import EventStore
+from mcp.types import CallToolRequestParams, TextContent, Tool
+from pydantic import Field
 
-from .lifespan import merge_lifespans
+from .config import MCP_EVENT_STORE, MCP_JSON_RESPONSE, MCP_STATELESS_HTTP
+from .mcp_store import load_event_store
+from .models import (
+    BasketItem,
+    BasketRequest,
+    BasketResponse,
+    CategoriesResponse,
+    Category,
+    CategoryLookupResponse,
+    CategoryTreeResponse,
+    ChangeFeedResponse,
+    PriceComparisonResponse,
+    PriceHistoryResponse,
+    SearchByCategoryRequest,
+    SearchRequest,
+    SearchResponse,
+    SearchView,
+    SuggestResponse,
+)
+from .services import (
+    MarketfiyatService,
+    MarketfiyatServiceError,
+    compare_prices,
+    optimize_basket,
+    project_search_response,
+    render_search_response,
+)
+from .services.budget import (
+    InvalidCursorError,
+    ResponseBudget,
+    decode_cursor,
+    fit_search_response,
+    render_budgeted_response,
+    search_fingerprint,
+)
+from .services.category_tree import CategoryTree
+from .services.progress import ProgressCallback
+from .timing import record_timing, timed
+from .tracing import parse_traceparent
 
+# Metadata key of the phase timings attached to search results
+SERVER_TIMING_META = "serverTiming"
 
-def configure_mcp(app: FastAPI) -> FastMCP:
-    route_maps = [
-        RouteMap(
-            methods=["GET"],
-            pattern=r".*",
-            mcp_type=MCPType.TOOL,
+# Logger name of the log notifications that carry partial results
+PARTIAL_RESULT_LOGGER = "partial_result"
+
+Keywords = Annotated[str, Field(description="Search keywords")]
+Latitude = Annotated[float, Field(description="User latitude coordinate")]
+Longitude = Annotated[float, Field(description="User longitude coordinate")]
+Distance = Annotated[int, Field(ge=1, description="Search radius in kilometers")]
+Pages = Annotated[int, Field(ge=0, description="Page number for pagination")]
+Size = Annotated[int, Field(ge=1, le=100, description="Number of results per page")]
+PageCount = Annotated[
+    int,
+    Field(
+        ge=1,
+        le=10,
+        description=(
+            "Number of consecutive pages to fetch, starting at 'pages', merged "
+            "into one response with duplicate products removed"
         ),
-        RouteMap(
-            methods=["POST"],
-            pattern=r".*",
-            mcp_type=MCPType.TOOL,
+    ),
+]
+MaxBytes = Annotated[
+    int | None,
+    Field(
+        ge=256,
+        description=(
+            "Trim the result to about this many bytes: cheapest products first, "
+            "one offer per product, no facets"
         ),
-        # Other methods fall back to default TOOL mapping
-    ]
+    ),
+]
+MaxTokens = Annotated[
+    int | None,
+    Field(
+        ge=64,
+        description="Like max_bytes, with the limit given in approximate tokens",
+    ),
+]
+MaxItems = Annotated[
+    int | None,
+    Field(
+        ge=1,
+        le=100,
+        description="Return at most this many products, cheapest first",
+    ),
+]
+Cursor = Annotated[
+    str | None,
+    Field(
+        description=(
+            "nextCursor from a previous budgeted call with the same arguments, "
+            "to continue with the next products"
+        )
+    ),
+]
+View = Annotated[
+    SearchView,
+    Field(
+        description=(
+            "Response shape: 'full' returns every field, 'summary' returns title, "
+            "brand and minimum price, 'cheapest' returns the cheapest offer "
+            "per product. Budgeted results have a compact shape of their own, "
+            "so only 'full' can be combined with a budget or cursor"
+        )
+    ),
+]
 
-    mcp_server = FastMCP.from_fastapi(
-        app=app,
-        name="Marketfiyat MCP",
-        route_maps=route_maps,
-    )
 
-    mcp_http = mcp_server.http_app(path="/")
-    app.mount("/mcp", mcp_http, name="mcp")
-    app.router.lifespan_context = merge_lifespans(
-        app.router.lifespan_context, mcp_http.lifespan
-    )
-    app.state.mcp = mcp_server
-    app.state.mcp_http = mcp_http
+def _partial_results(
+    ctx: Context | None, labels: list[str]
+) -> ProgressCallback[SearchResponse] | None:
+    """
+    Report each finished upstream page or sub-query as progress, and send its
+    products in the summary view as a partial result log message.
+
+    Only clients that asked for progress by sending a progressToken get them.
+    """
+    if ctx is None:
+        return None
+    meta = ctx.request_context.meta
+    if meta is None or meta.progressToken is None:
+        return None
+    completed = 0
+
+    async def report(position: int, response: SearchResponse) -> None:
+        nonlocal completed
+        completed += 1
+        label = labels[position]
+        await ctx.report_progress(completed, len(labels), f"{label} done")
+        await ctx.log(
+            f"Partial result for {label}",
+            logger_name=PARTIAL_RESULT_LOGGER,
+            extra={
+                "position": position,
+                "label": label,
+                "result": project_search_response(
+                    response, SearchView.SUMMARY
+                ).model_dump(mode="json"),
+            },
+        )
+
+    return report
+
+
+async def _search_result(
+    service: MarketfiyatService,
+    request: SearchRequest,
+    page_count: int,
+    view: SearchView,
+    local: bool = False,
+    budget: ResponseBudget | None = None,
+    cursor: str | None = None,
+    ctx: Context | None = None,
+) -> ToolResult:
+    if local and page_count > 1:
+        raise ToolError("local cannot be combined with page_count above 1")
+    budgeted = cursor is not None or (budget is not None and budget.active)
+    if budgeted and view != SearchView.FULL:
+        raise ToolError(
+            f"view '{view.value}' cannot be combined with max_tokens, max_bytes, "
+            "max_items or cursor; budgeted results have their own compact shape"
+        )
+    with record_timing() as timing:
+        response = service.search_local(request) if local else None
+        cached = local and response is not None
+        if cached:
+            timing.mark_cache("local")
+        if response is None:
+            try:
+                if page_count > 1:
+                    on_page = _partial_results(ctx, _page_labels(request, page_count))
+                    response = await service.search_pages(request, page_count, on_page)
+                elif isinstance(request, SearchByCategoryRequest):
+                    response = await service.search_by_categories(request)
+                else:
+                    response = await service.search(request)
+            except MarketfiyatServiceError as exc:
+                raise ToolError(exc.message) from exc
+
+        with timed("serialize"):
+            body = _render_result(
+                service, request, page_count, view, response, cached, budget, cursor
+            )
+        return ToolResult(
+            content=[
+                TextContent(
+                    type="text",
+                    text=body.decode(),
+                    _meta={SERVER_TIMING_META: timing.meta()},
+                )
+            ],
+            structured_content=json.loads(body),
+        )
+
+
+def _render_result(
+    service: MarketfiyatService,
+    request: SearchRequest,
+    page_count: int,
+    view: SearchView,
+    response: SearchResponse,
+    cached: bool,
+    budget: ResponseBudget | None,
+    cursor: str | None,
+) -> bytes:
+    if cursor is not None or (budget is not None and budget.active):
+        fingerprint = search_fingerprint(
+            type(request).__name__, request.model_dump(), page_count
+        )
+        try:
+            offset = decode_cursor(cursor, fingerprint) if cursor else 0
+        except InvalidCursorError as exc:
+            raise ToolError(str(exc)) from exc
+        return render_budgeted_response(
+            fit_search_response(
+                response, budget or ResponseBudget(), fingerprint, offset
+            )
+        )
+
+    # Share rendered bodies with the REST routes through the cache entry
+    payloads = None if cached or page_count > 1 else service.get_payload_cache(request)
+    if payloads is None:
+        payloads = {}
+    body = payloads.get(view.value)
+    if body is None:
+        body = payloads[view.value] = render_search_response(response, view)
+    return body
+
+
+def _page_labels(request: SearchRequest, page_count: int) -> list[str]:
+    return [f"page {request.pages + offset}" for offset in range(page_count)]
+
+
+async def _category_tree(service: MarketfiyatService) -> CategoryTree:
+    try:
+        return await service.get_category_tree()
+    except MarketfiyatServiceError as exc:
+        raise ToolError(exc.message) from exc
+
+
+class _ToolTelemetry(Middleware):
+    """
+    Record the latency and outcome of every tool call and trace it as a span.
+
+    The span continues the trace of a ``traceparent`` sent in the request's
+    ``_meta`` or HTTP headers.
+    """
+
+    def __init__(self, get_service: Callable[[], MarketfiyatService]) -> None:
+        self._get_service = get_service
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[CallToolRequestParams],
+        call_next: CallNext[CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        service = self._get_service()
+        metrics = service.metrics
+        tool = context.message.name
+        parent = None
+        if service.tracer.enabled:
+            parent = parse_traceparent(
+                _meta_traceparent(context) or get_http_headers().get("traceparent")
+            )
+        outcome = "error"
+        started = time.perf_counter()
+        try:
+            with service.tracer.span(f"mcp.tool {tool}", parent, tool=tool):
+                result = await call_next(context)
+            outcome = "ok"
+            return result
+        finally:
+            metrics.tool_duration.observe(time.perf_counter() - started, tool)
+            metrics.tool_calls.inc(tool, outcome)
+
+
+def _meta_traceparent(context: MiddlewareContext) -> str | None:
+    # FastMCP rebuilds the call parameters without _meta; read the request's
+    if context.fastmcp_context is None:
+        return None
+    try:
+        meta = context.fastmcp_context.request_context.meta
+    except LookupError:
+        return None
+    return getattr(meta, "traceparent", None)
+
+
+def build_mcp_server(
+    get_service: Callable[[], MarketfiyatService],
+    listed_tools: list[dict[str, Any]] | None = None,
+) -> FastMCP:
+    """
+    Build the MCP server with tools that call the service directly.
 
+    Tool calls skip the HTTP round trip through the REST routes: arguments
+    are validated once from their annotations and results are returned as
+    structured content without re-encoding. ``listed_tools`` are
+    precomputed tool definitions answered to tools/list instead of
+    converting the tools on every listing.
+    """
+    mcp_server = FastMCP(name="Marketfiyat MCP")
+
+    @mcp_server.tool
+    async def search_products(
+        keywords: Keywords,
+        latitude: Latitude,
+        longitude: Longitude,
+        distance: Distance = 1,
+        pages: Pages = 0,
+        size: Size = 24,
+        page_count: PageCount = 1,
+        view: View = SearchView.FULL,
+        local: Annotated[
+            bool,
+            Field(
+                description=(
+                    "Answer from the local product index when the same area was "
+                    "searched recently, falling back to the Marketfiyati API. "
+                    "Cannot be combined with page_count above 1"
+                )
+            ),
+        ] = False,
+        max_bytes: MaxBytes = None,
+        max_tokens: MaxTokens = None,
+        max_items: MaxItems = None,
+        cursor: Cursor = None,
+        ctx: Context | None = None,
+    ) -> ToolResult:
+        """
+        Search for products by keywords in nearby Turkish markets.
+
+        Returns the products matching the keywords with their prices in every
+        depot within the given distance of the location. Set max_tokens,
+        max_bytes or max_items to get a compact result that lists the cheapest
+        products first and says what was omitted. With page_count above 1,
+        progress and per-page partial results are reported as pages arrive.
+        """
+        request = SearchRequest(
+            keywords=keywords,
+            latitude=latitude,
+            longitude=longitude,
+            distance=distance,
+            pages=pages,
+            size=size,
+        )
+        budget = ResponseBudget(max_bytes, max_tokens, max_items)
+        return await _search_result(
+            get_service(), request, page_count, view, local, budget, cursor, ctx
+        )
+
+    @mcp_server.tool
+    async def search_by_categories(
+        keywords: Annotated[str, Field(description="Category or subcategory name")],
+        latitude: Latitude,
+        longitude: Longitude,
+        distance: Distance = 1,
+        pages: Pages = 0,
+        size: Size = 24,
+        page_count: PageCount = 1,
+        view: View = SearchView.FULL,
+        menu_category: Annotated[
+            bool, Field(description="Search in menu categories")
+        ] = True,
+        max_bytes: MaxBytes = None,
+        max_tokens: MaxTokens = None,
+        max_items: MaxItems = None,
+        cursor: Cursor = None,
+        ctx: Context | None = None,
+    ) -> ToolResult:
+        """
+        Search for products in a category near a location.
+
+        Use get_categories or lookup_categories to find valid category names.
+        The budget parameters and progress reporting work as in search_products.
+        """
+        request = SearchByCategoryRequest(
+            keywords=keywords,
+            latitude=latitude,
+            longitude=longitude,
+            distance=distance,
+            pages=pages,
+            size=size,
+            menuCategory=menu_category,
+        )
+        budget = ResponseBudget(max_bytes, max_tokens, max_items)
+        return await _search_result(
+            get_service(),
+            request,
+            page_count,
+            view,
+            budget=budget,
+            cursor=cursor,
+            ctx=ctx,
+        )
+
+    @mcp_server.tool
+    async def get_categories() -> CategoriesResponse:
+        """Get all product categories with their subcategories"""
+        return (await _category_tree(get_service())).categories
+
+    @mcp_server.tool
+    async def get_category_tree() -> CategoryTreeResponse:
+        """Get the main categories with their subcategory counts"""
+        tree = await _category_tree(get_service())
+        return tree.summary()
+
+    @mcp_server.tool
+    async def get_category(
+        name: Annotated[str, Field(description="Main category name")],
+    ) -> Category:
+        """Get one main category with its subcategories"""
+        tree = await _category_tree(get_service())
+        category = tree.main_category(name)
+        if category is None:
+            raise ToolError(f"Unknown category: {name}")
+        return category
+
+    @mcp_server.tool
+    async def lookup_categories(
+        names: Annotated[
+            list[str],
+            Field(
+                min_length=1,
+                max_length=100,
+                description=(
+                    "Category or subcategory names, e.g. sub_category facet names "
+                    "from a search; matching ignores case and Turkish diacritics"
+                ),
+            ),
+        ],
+    ) -> CategoryLookupResponse:
+        """Resolve category names to their main category"""
+        tree = await _category_tree(get_service())
+        return tree.lookup(names)
+
+    @mcp_server.tool
+    async def suggest(
+        query: Annotated[
+            str, Field(min_length=1, max_length=100, description="Typed prefix")
+        ],
+        limit: Annotated[
+            int, Field(ge=1, le=10, description="Maximum number of suggestions")
+        ] = 10,
+    ) -> SuggestResponse:
+        """Suggest search keywords for a typed prefix without calling upstream"""
+        return SuggestResponse(
+            query=query, suggestions=get_service().suggestions.suggest(query, limit)
+        )
+
+    @mcp_server.tool(name="compare_prices")
+    async def compare_market_prices(
+        keywords: Keywords,
+        latitude: Latitude,
+        longitude: Longitude,
+        distance: Distance = 1,
+        size: Size = 24,
+        page_count: PageCount = 1,
+        ctx: Context | None = None,
+    ) -> PriceComparisonResponse:
+        """
+        Compare the prices of a product search per market.
+
+        Returns the lowest, median and highest price and unit price of every
+        market nearby with its cheapest depot, cheapest market first. Use this
+        instead of aggregating search_products results yourself.
+        """
+        request = SearchRequest(
+            keywords=keywords,
+            latitude=latitude,
+            longitude=longitude,
+            distance=distance,
+            size=size,
+        )
+        on_page = _partial_results(ctx, _page_labels(request, page_count))
+        try:
+            return await compare_prices(get_service(), request, page_count, on_page)
+        except MarketfiyatServiceError as exc:
+            raise ToolError(exc.message) from exc
+
+    @mcp_server.tool
+    async def optimize_shopping_basket(
+        items: Annotated[
+            list[BasketItem],
+            Field(min_length=1, max_length=50, description="Shopping list"),
+        ],
+        latitude: Latitude,
+        longitude: Longitude,
+        distance: Distance = 1,
+        max_stores: Annotated[
+            int, Field(ge=1, le=3, description="Maximum number of stores to visit")
+        ] = 2,
+        candidates: Annotated[
+            int,
+            Field(ge=1, le=24, description="Products considered for each item"),
+        ] = 5,
+        ctx: Context | None = None,
+    ) -> BasketResponse:
+        """
+        Find the cheapest place to buy a shopping list.
+
+        Returns the cheapest single-store basket and the cheapest basket split
+        across at most max_stores depots. Progress and each item's candidates
+        are reported as their searches finish.
+        """
+        request = BasketRequest(
+            items=items,
+            latitude=latitude,
+            longitude=longitude,
+            distance=distance,
+            maxStores=max_stores,
+            candidates=candidates,
+        )
+        try:
+            on_item = _partial_results(ctx, [item.keywords for item in items])
+            return await optimize_basket(get_service(), request, on_item)
+        except MarketfiyatServiceError as exc:
+            raise ToolError(exc.message) from exc
+
+    @mcp_server.tool
+    async def get_price_history(
+        product_id: Annotated[str, Field(description="Unique product identifier")],
+        market: Annotated[
+            str | None, Field(description="Limit the history to one market")
+        ] = None,
+        days: Annotated[
+            int, Field(ge=1, le=365, description="Number of days to look back")
+        ] = 30,
+    ) -> PriceHistoryResponse:
+        """Get the daily price trend of a product from the local price history"""
+        service = get_service()
+        if service.history is None:
+            raise ToolError("Price history is not enabled")
+        return await service.history.price_trend(product_id, market, days)
+
+    @mcp_server.tool
+    async def get_price_changes(
+        since: Annotated[
+            str | None,
+            Field(description="Token returned by the previous call; omit to start"),
+        ] = None,
+        limit: Annotated[
+            int, Field(ge=1, le=1000, description="Maximum number of changes")
+        ] = 500,
+        market: Annotated[
+            str | None, Field(description="Only return changes for one market")
+        ] = None,
+    ) -> ChangeFeedResponse:
+        """
+        Get price changes seen in search results since a token.
+
+        Call again with nextToken to continue; when reset is true, re-fetch full
+        results first.
+        """
+        return get_service().changes.changes_since(since, limit, market)
+
+    mcp_server.add_middleware(_ToolTelemetry(get_service))
+    _register_handlers(mcp_server, listed_tools)
     return mcp_server
+
+
+def _register_handlers(
+    mcp_server: FastMCP, listed_tools: list[dict[str, Any]] | None
+) -> None:
+    # FastMCP has no public hook for replacing protocol handlers, so these go
+    # through its low-level server; fastmcp is pinned to the tested minor
+    # release and test_fastmcp_handler_hooks fails if the internals move.
+    # Tool arguments are validated by pydantic against the tool signatures;
+    # the SDK's extra jsonschema pass rebuilds a validator for the tool's
+    # schema on every call and costs more than most tools
+    mcp_server._mcp_server.call_tool(validate_input=False)(mcp_server._mcp_call_tool)
+    if listed_tools is None:
+        return
+    tools = [Tool.model_validate(tool) for tool in listed_tools]
+
+    async def list_tools() -> list[Tool]:
+        return tools
+
+    mcp_server._mcp_server.list_tools()(list_tools)
+
+
+def build_mcp_http_app(
+    mcp_server: FastMCP,
+    stateless_http: bool | None = None,
+    json_response: bool | None = None,
+    event_store: EventStore | None = None,
+) -> StarletteWithLifespan:
+    """
+    Build the MCP streamable HTTP app.
+
+    The transport modes default to MCP_STATELESS_HTTP and MCP_JSON_RESPONSE.
+    In stateless mode no session outlives a request, so any worker can answer
+    any MCP call. Otherwise sessions live in the worker that created them and
+    ``event_store`` (by default the one named by MCP_EVENT_STORE) lets
+    clients resume interrupted streams.
+    """
+    if stateless_http is None:
+        stateless_http = MCP_STATELESS_HTTP
+    if json_response is None:
+        json_response = MCP_JSON_RESPONSE
+    if event_store is None and not stateless_http:
+        event_store = load_event_store(MCP_EVENT_STORE)
+    return create_streamable_http_app(
+        server=mcp_server,
+        streamable_http_path="/",
+        event_store=event_store,
+        auth=mcp_server.auth,
+        json_response=json_response,
+        stateless_http=stateless_http,
+    )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI
+from starlette.types import Receive, Scope, Send
+
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+    from fastmcp.server.http import StarletteWithLifespan
+
+
+class LazyMCPMount:
+    """
+    ASGI app that builds the MCP endpoint on its first request.
+
+    FastMCP and the MCP SDK are only imported, and the tool schemas only
+    generated, once something actually uses MCP, so workers boot and serve
+    REST traffic without paying for them. The streamable HTTP app's lifespan
+    runs in a task of its own because its task group has to be entered and
+    exited by the same task.
+    """
+
+    def __init__(self, app: FastAPI) -> None:
+        self._app = app
+        self._http: StarletteWithLifespan | None = None
+        self._lock = asyncio.Lock()
+        self._stop = asyncio.Event()
+        self._runner: asyncio.Task | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._http is not None
+
+    def server(self) -> FastMCP:
+        """Return the MCP server, building its tools on first use"""
+        server = getattr(self._app.state, "mcp", None)
+        if server is None:
+            from .mcp import build_mcp_server
+
+            artifact = getattr(self._app.state, "schema_artifact", None)
+            server = build_mcp_server(
+                lambda: self._app.state.marketfiyat_service,
+                listed_tools=artifact["mcpTools"] if artifact else None,
+            )
+            self._app.state.mcp = server
+        return server
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        http = self._http if self._http is not None else await self._start()
+        await http(scope, receive, send)
+
+    async def close(self) -> None:
+        """Shut the MCP endpoint down if it was started"""
+        if self._runner is None:
+            return
+        self._stop.set()
+        await self._runner
+        self._runner = None
+        self._http = None
+
+    # Internal helpers -------------------------------------------------
+
+    async def _start(self) -> StarletteWithLifespan:
+        async with self._lock:
+            if self._http is not None:
+                return self._http
+
+            from .mcp import build_mcp_http_app
+
+            http = build_mcp_http_app(self.server())
+            started = asyncio.Event()
+            self._stop = asyncio.Event()
+            self._runner = asyncio.create_task(self._run(http, started))
+            waiter = asyncio.create_task(started.wait())
+            await asyncio.wait(
+                {self._runner, waiter}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not started.is_set():
+                waiter.cancel()
+                runner, self._runner = self._runner, None
+                runner.result()  # re-raise the startup failure
+            self._app.state.mcp_http = http
+            self._http = http
+            return http
+
+    async def _run(self, http: StarletteWithLifespan, started: asyncio.Event) -> None:
+        async with http.lifespan(http):
+            started.set()
+            await self._stop.wait()
+
+
+def configure_lazy_mcp(app: FastAPI) -> LazyMCPMount:
+    """Mount an MCP endpoint at /mcp that is built on its first request"""
+    mount = LazyMCPMount(app)
+    app.mount("/mcp", mount, name="mcp")
+    app.state.mcp_mount = mount
+    return mount
+
+
+def get_mcp_server(app: FastAPI) -> FastMCP:
+    """Return the app's MCP server, building it if it is still deferred"""
+    server = getattr(app.state, "mcp", None)
+    if server is not None:
+        return server
+    return app.state.mcp_mount.server()
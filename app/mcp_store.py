@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import importlib
+import itertools
+from collections import OrderedDict
+
+from mcp.server.streamable_http import (
+    EventCallback,
+    EventId,
+    EventMessage,
+    EventStore,
+    StreamId,
+)
+from mcp.types import JSONRPCMessage
+
+MEMORY_EVENT_STORE = "memory"
+
+
+class MemoryEventStore(EventStore):
+    """
+    Bounded in-process event store for resumable MCP streams.
+
+    Stands in for an external store (Redis, a database) in tests and
+    single-process deployments; anything implementing the MCP SDK's
+    ``EventStore`` interface can replace it. Oldest events are dropped once
+    ``max_events`` is reached, so very late reconnects replay nothing.
+    """
+
+    def __init__(self, max_events: int = 10_000) -> None:
+        self._max_events = max(max_events, 1)
+        self._events: OrderedDict[EventId, tuple[StreamId, JSONRPCMessage]] = (
+            OrderedDict()
+        )
+        self._ids = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __bool__(self) -> bool:
+        # The MCP SDK only stores events when ``if event_store:`` holds, which
+        # __len__ alone would make false until the first event is stored
+        return True
+
+    async def store_event(
+        self, stream_id: StreamId, message: JSONRPCMessage
+    ) -> EventId:
+        event_id = str(next(self._ids))
+        self._events[event_id] = (stream_id, message)
+        while len(self._events) > self._max_events:
+            self._events.popitem(last=False)
+        return event_id
+
+    async def replay_events_after(
+        self, last_event_id: EventId, send_callback: EventCallback
+    ) -> StreamId | None:
+        stored = self._events.get(last_event_id)
+        if stored is None:
+            return None
+        stream_id = stored[0]
+        replay = False
+        for event_id, (event_stream, message) in list(self._events.items()):
+            if replay and event_stream == stream_id:
+                await send_callback(EventMessage(message, event_id))
+            replay = replay or event_id == last_event_id
+        return stream_id
+
+
+def load_event_store(spec: str) -> EventStore | None:
+    """
+    Build the event store named by ``MCP_EVENT_STORE``.
+
+    An empty value disables resumability, ``memory`` selects
+    ``MemoryEventStore`` and ``package.module:factory`` calls a factory that
+    returns an external ``EventStore``.
+    """
+    spec = spec.strip()
+    if not spec:
+        return None
+    if spec == MEMORY_EVENT_STORE:
+        return MemoryEventStore()
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(
+            f"MCP_EVENT_STORE must be '{MEMORY_EVENT_STORE}' or 'module:factory', "
+            f"got {spec!r}"
+        )
+    store = getattr(importlib.import_module(module_name), attribute)()
+    if not isinstance(store, EventStore):
+        raise TypeError(f"{spec} did not return an EventStore")
+    return store
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[str, ...]
+# (label values, value) pairs of one metric family
+Samples = list[tuple[dict[str, str], float]]
+# Metric family computed at scrape time: (name, type, help, samples)
+Family = tuple[str, str, str, Samples]
+Collector = Callable[[], Iterable[Family]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def lines(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            names = _format_labels(dict(zip(self.labels, labels, strict=True)))
+            yield f"{self.name}{names} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value per label combination that can go up and down"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+
+class Histogram:
+    """
+    Latency histogram per label combination.
+
+    Observing is one bisect and two additions; buckets are only made
+    cumulative when the metrics are rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._buckets = buckets
+        # Per-bucket counts with a final +Inf bucket, followed by the sum
+        self._series: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self._buckets) + 2)
+        series[bisect_left(self._buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series is not None else 0
+
+    def lines(self) -> Iterable[str]:
+        for labels, series in self._series.items():
+            base = dict(zip(self.labels, labels, strict=True))
+            cumulative = 0.0
+            for bound, count in zip(
+                (*self._buckets, float("inf")), series[:-1], strict=True
+            ):
+                cumulative += count
+                names = _format_labels({**base, "le": _format_value(bound)})
+                yield f"{self.name}_bucket{names} {_format_value(cumulative)}"
+            names = _format_labels(base)
+            yield f"{self.name}_sum{names} {_format_value(series[-1])}"
+            yield f"{self.name}_count{names} {_format_value(cumulative)}"
+
+
+class Metrics:
+    """
+    Process-local metrics rendered in the Prometheus text format.
+
+    Hot paths only touch plain dicts and floats; cache and connection pool
+    figures are read by collectors when /metrics is scraped.
+    """
+
+    def __init__(self) -> None:
+        self.http_duration = Histogram(
+            "marketfiyat_http_request_duration_seconds",
+            "Latency of HTTP requests by route",
+            ("method", "route"),
+        )
+        self.http_responses = Counter(
+            "marketfiyat_http_responses_total",
+            "HTTP responses by route and status code",
+            ("method", "route", "status"),
+        )
+        self.http_in_flight = Gauge(
+            "marketfiyat_http_requests_in_flight",
+            "HTTP requests currently being handled",
+        )
+        self.tool_duration = Histogram(
+            "marketfiyat_mcp_tool_duration_seconds",
+            "Latency of MCP tool calls by tool",
+            ("tool",),
+        )
+        self.tool_calls = Counter(
+            "marketfiyat_mcp_tool_calls_total",
+            "MCP tool calls by tool and outcome",
+            ("tool", "outcome"),
+        )
+        self.upstream_duration = Histogram(
+            "marketfiyat_upstream_request_duration_seconds",
+            "Latency of Marketfiyati API requests by endpoint",
+            ("endpoint",),
+        )
+        self.upstream_responses = Counter(
+            "marketfiyat_upstream_responses_total",
+            "Marketfiyati API responses by endpoint and status code",
+            ("endpoint", "status"),
+        )
+        self.upstream_in_flight = Gauge(
+            "marketfiyat_upstream_requests_in_flight",
+            "Marketfiyati API requests currently running",
+            ("endpoint",),
+        )
+        self._metrics: list[Counter | Histogram] = [
+            self.http_duration,
+            self.http_responses,
+            self.http_in_flight,
+            self.tool_duration,
+            self.tool_calls,
+            self.upstream_duration,
+            self.upstream_responses,
+            self.upstream_in_flight,
+        ]
+        self._collectors: list[Collector] = []
+
+    def add_collector(self, collector: Collector) -> None:
+        """Register a callable that reports metric families at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.lines())
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(
+                    f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    for labels, value in samples
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _route_label(scope: Scope) -> str:
+    # Route templates keep the label set bounded; unmatched paths share one
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is not None:
+        return path
+    if scope.get("path", "").startswith("/mcp"):
+        return "/mcp"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Record latency, status code and concurrency of every HTTP request"""
+
+    def __init__(self, app: ASGIApp, metrics: Metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.http_in_flight.dec()
+            method = scope["method"]
+            route = _route_label(scope)
+            metrics.http_duration.observe(elapsed, method, route)
+            metrics.http_responses.inc(method, route, str(status))
@@ -14,6 +14,32 @@ from .marketfiyat import (
     Category,
     CategoriesResponse,
 )
+from .basket import (
+    BasketItem,
+    BasketRequest,
+    BasketLine,
+    BasketPlan,
+    BasketResponse,
+)
+from .budget import BudgetedProduct, BudgetedSearchResponse, OmittedSummary
+from .category_tree import (
+    CategorySummary,
+    CategoryTreeResponse,
+    CategoryMatch,
+    CategoryLookupResponse,
+)
+from .compare import CheapestDepotOffer, MarketPriceStats, PriceComparisonResponse
+from .changes import ChangeFeedResponse, PriceChange
+from .history import PriceHistoryPoint, PriceHistoryResponse
+from .suggest import Suggestion, SuggestResponse
+from .views import (
+    SearchView,
+    OfferSummary,
+    ProductSummary,
+    CheapestOfferProduct,
+    SummarySearchResponse,
+    CheapestSearchResponse,
+)
 
 __all__ = [
     "SearchRequest",
@@ -28,4 +54,31 @@ __all__ = [
     "DepotLocation",
     "Category",
     "CategoriesResponse",
+    "BudgetedProduct",
+    "BudgetedSearchResponse",
+    "OmittedSummary",
+    "CategorySummary",
+    "CategoryTreeResponse",
+    "CategoryMatch",
+    "CategoryLookupResponse",
+    "BasketItem",
+    "BasketRequest",
+    "BasketLine",
+    "BasketPlan",
+    "BasketResponse",
+    "CheapestDepotOffer",
+    "MarketPriceStats",
+    "PriceComparisonResponse",
+    "PriceChange",
+    "ChangeFeedResponse",
+    "PriceHistoryPoint",
+    "PriceHistoryResponse",
+    "Suggestion",
+    "SuggestResponse",
+    "SearchView",
+    "OfferSummary",
+    "ProductSummary",
+    "CheapestOfferProduct",
+    "SummarySearchResponse",
+    "CheapestSearchResponse",
 ]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class BasketItem(BaseModel):
+    """Single shopping list entry"""
+
+    keywords: str = Field(..., description="Search keywords for the item")
+    quantity: int = Field(default=1, ge=1, description="Number of units to buy")
+
+
+class BasketRequest(BaseModel):
+    """Request model for the cheapest-basket optimizer"""
+
+    items: list[BasketItem] = Field(
+        ..., min_length=1, max_length=50, description="Shopping list"
+    )
+    latitude: float = Field(..., description="User latitude coordinate")
+    longitude: float = Field(..., description="User longitude coordinate")
+    distance: int = Field(default=1, ge=1, description="Search radius in kilometers")
+    maxStores: int = Field(
+        default=2,
+        ge=1,
+        le=3,
+        description="Maximum number of stores the basket may be split across",
+    )
+    candidates: int = Field(
+        default=5,
+        ge=1,
+        le=24,
+        description="Number of top search results considered for each item",
+    )
+
+
+class BasketLine(BaseModel):
+    """Chosen product and depot for one shopping list entry"""
+
+    keywords: str = Field(..., description="Search keywords of the item")
+    quantity: int = Field(..., description="Number of units")
+    productId: str = Field(..., description="Unique product identifier")
+    title: str = Field(..., description="Product title")
+    brand: str = Field(..., description="Product brand")
+    depotId: str = Field(..., description="Depot to buy the item from")
+    depotName: str = Field(..., description="Human-readable depot name")
+    marketAdi: str = Field(..., description="Market name (e.g., bim, a101, migros)")
+    price: float = Field(..., description="Unit price at the depot")
+    lineTotal: float = Field(..., description="Price multiplied by quantity")
+
+
+class BasketPlan(BaseModel):
+    """Assignment of every available item to one of a set of depots"""
+
+    depotIds: list[str] = Field(..., description="Depots visited by the plan")
+    total: float = Field(..., description="Total price of the basket")
+    lines: list[BasketLine] = Field(..., description="Chosen offer per item")
+    missingItems: list[str] = Field(
+        default_factory=list, description="Items none of the plan's depots offer"
+    )
+
+
+class BasketResponse(BaseModel):
+    """Response model for the cheapest-basket optimizer"""
+
+    singleStore: BasketPlan | None = Field(
+        default=None, description="Cheapest plan buying everything in one depot"
+    )
+    multiStore: BasketPlan | None = Field(
+        default=None,
+        description="Cheapest plan split across at most maxStores depots",
+    )
+    missingItems: list[str] = Field(
+        default_factory=list,
+        description="Items that no nearby depot offers",
+    )
+    depotCount: int = Field(..., description="Number of depots considered")
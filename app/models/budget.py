@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+from .views import CheapestOfferProduct
+
+
+class BudgetedProduct(CheapestOfferProduct):
+    """Product with its depot list collapsed to the cheapest offer"""
+
+    offerCount: int = Field(..., description="Number of depots offering the product")
+
+
+class OmittedSummary(BaseModel):
+    """What was left out to fit a response budget"""
+
+    products: int = Field(
+        ..., description="Fetched products still to come, available via nextCursor"
+    )
+    offers: int = Field(
+        ...,
+        description=(
+            "Depot offers not included, either collapsed into a product's "
+            "cheapest offer or belonging to products left out"
+        ),
+    )
+    facets: bool = Field(..., description="True when facets were dropped")
+    notFetched: int = Field(
+        ..., description="Products upstream reports beyond the fetched pages"
+    )
+
+
+class BudgetedSearchResponse(BaseModel):
+    """Search response trimmed to a size budget, cheapest products first"""
+
+    numberOfFound: int = Field(..., description="Total number of products found")
+    content: list[BudgetedProduct] = Field(..., description="List of products")
+    omitted: OmittedSummary = Field(..., description="What the budget left out")
+    nextCursor: str | None = Field(
+        default=None,
+        description="Pass as cursor with the same search to get the next products",
+    )
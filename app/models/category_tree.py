@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class CategorySummary(BaseModel):
+    """Main category without its subcategory list"""
+
+    name: str = Field(..., description="Main category name")
+    subcategoryCount: int = Field(..., description="Number of subcategories")
+
+
+class CategoryTreeResponse(BaseModel):
+    """Response model for the category tree endpoint"""
+
+    categories: list[CategorySummary] = Field(
+        ..., description="Main categories in upstream order"
+    )
+
+
+class CategoryMatch(BaseModel):
+    """Category resolved from a name"""
+
+    query: str = Field(..., description="Name that was looked up")
+    name: str = Field(..., description="Category name as spelled upstream")
+    mainCategory: str = Field(..., description="Main category the name belongs to")
+    isMainCategory: bool = Field(
+        ..., description="True when the name is a main category itself"
+    )
+
+
+class CategoryLookupResponse(BaseModel):
+    """Response model for the category lookup endpoint"""
+
+    matches: list[CategoryMatch] = Field(..., description="Resolved names")
+    unmatched: list[str] = Field(..., description="Names that are not a known category")
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class PriceChange(BaseModel):
+    """Price change of a product in one depot"""
+
+    sequence: int = Field(..., description="Position of the change in the feed")
+    productId: str = Field(..., description="Unique product identifier")
+    depotId: str = Field(..., description="Unique depot identifier")
+    marketAdi: str = Field(..., description="Market name (e.g., bim, a101, migros)")
+    previousPrice: float | None = Field(
+        default=None, description="Previously seen price, null for new offers"
+    )
+    price: float = Field(..., description="Current price")
+    percentage: float = Field(..., description="Discount percentage if any")
+    indexTime: str = Field(..., description="Upstream index time of the price")
+
+
+class ChangeFeedResponse(BaseModel):
+    """Response model for the change feed endpoint"""
+
+    changes: list[PriceChange] = Field(..., description="Changes after the token")
+    nextToken: str = Field(..., description="Token to pass on the next poll")
+    reset: bool = Field(
+        default=False,
+        description=(
+            "True when the token is unknown or too old; the client should "
+            "re-fetch full results and continue from nextToken"
+        ),
+    )
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class CheapestDepotOffer(BaseModel):
+    """Cheapest offer of a market and the depot selling it"""
+
+    productId: str = Field(..., description="Unique product identifier")
+    title: str = Field(..., description="Product title")
+    brand: str = Field(..., description="Product brand")
+    depotId: str = Field(..., description="Depot identifier")
+    depotName: str = Field(..., description="Human-readable depot name")
+    price: float = Field(..., description="Product price")
+    unitPrice: str = Field(..., description="Formatted unit price with currency")
+    distanceMeters: float = Field(
+        ..., description="Distance from the searched location in meters"
+    )
+
+
+class MarketPriceStats(BaseModel):
+    """Price statistics of one market's offers"""
+
+    marketAdi: str = Field(..., description="Market name (e.g., bim, a101, migros)")
+    offerCount: int = Field(..., description="Number of depot offers")
+    productCount: int = Field(..., description="Number of distinct products")
+    minPrice: float = Field(..., description="Lowest price")
+    medianPrice: float = Field(..., description="Median price")
+    maxPrice: float = Field(..., description="Highest price")
+    minUnitPrice: float | None = Field(
+        default=None, description="Lowest unit price in the response's unit"
+    )
+    medianUnitPrice: float | None = Field(
+        default=None, description="Median unit price in the response's unit"
+    )
+    maxUnitPrice: float | None = Field(
+        default=None, description="Highest unit price in the response's unit"
+    )
+    cheapest: CheapestDepotOffer = Field(..., description="Cheapest offer")
+
+
+class PriceComparisonResponse(BaseModel):
+    """Offers of a search grouped by market, cheapest market first"""
+
+    keywords: str = Field(..., description="Searched keywords")
+    numberOfFound: int = Field(..., description="Total number of products found")
+    productCount: int = Field(..., description="Number of products compared")
+    unit: str | None = Field(
+        default=None,
+        description=(
+            "Unit the unit price statistics refer to (e.g. 'kg'); only offers "
+            "priced in the most common unit are included"
+        ),
+    )
+    markets: list[MarketPriceStats] = Field(
+        ..., description="Per-market statistics ordered by lowest price"
+    )
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class PriceHistoryPoint(BaseModel):
+    """Daily price summary of a product in one market"""
+
+    date: str = Field(..., description="Day of the observations (YYYY-MM-DD)")
+    market: str = Field(..., description="Market the observations come from")
+    minPrice: float = Field(..., description="Lowest observed price")
+    maxPrice: float = Field(..., description="Highest observed price")
+    avgPrice: float = Field(..., description="Average observed price")
+    observations: int = Field(..., description="Number of depot observations")
+
+
+class PriceHistoryResponse(BaseModel):
+    """Response model for the price history endpoint"""
+
+    productId: str = Field(..., description="Unique product identifier")
+    market: str | None = Field(
+        default=None, description="Market the history is limited to, if any"
+    )
+    days: int = Field(..., description="Number of days covered")
+    points: list[PriceHistoryPoint] = Field(
+        ..., description="Daily price summaries per market, oldest first"
+    )
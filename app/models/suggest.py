@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class Suggestion(BaseModel):
+    """Autocomplete suggestion"""
+
+    text: str = Field(..., description="Suggested search text")
+    type: str = Field(
+        ..., description="Source of the suggestion: query, category, brand or product"
+    )
+    popularity: int = Field(..., description="Number of searches for exactly this text")
+
+
+class SuggestResponse(BaseModel):
+    """Response model for the suggest endpoint"""
+
+    query: str = Field(..., description="Prefix the suggestions complete")
+    suggestions: list[Suggestion] = Field(
+        ..., description="Suggestions, most popular first"
+    )
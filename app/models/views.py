@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class SearchView(str, Enum):  # noqa: UP042 - StrEnum requires Python 3.11
+    """Predefined response shapes for search endpoints"""
+
+    FULL = "full"
+    SUMMARY = "summary"
+    CHEAPEST = "cheapest"
+
+
+class OfferSummary(BaseModel):
+    """Compact description of a single depot offer"""
+
+    marketAdi: str = Field(..., description="Market name (e.g., bim, a101, migros)")
+    depotName: str = Field(..., description="Human-readable depot name")
+    price: float = Field(..., description="Product price")
+    unitPrice: str = Field(..., description="Formatted unit price with currency")
+
+
+class ProductSummary(BaseModel):
+    """Title, brand and lowest price of a product"""
+
+    id: str = Field(..., description="Unique product identifier")
+    title: str = Field(..., description="Product title")
+    brand: str = Field(..., description="Product brand")
+    minPrice: float | None = Field(
+        default=None, description="Lowest price across all depots"
+    )
+    offerCount: int = Field(..., description="Number of depots offering the product")
+
+
+class CheapestOfferProduct(BaseModel):
+    """Product together with its cheapest depot offer"""
+
+    id: str = Field(..., description="Unique product identifier")
+    title: str = Field(..., description="Product title")
+    brand: str = Field(..., description="Product brand")
+    refinedVolumeOrWeight: str | None = Field(
+        default=None, description="Volume or weight (e.g., '1 kg')"
+    )
+    cheapest: OfferSummary | None = Field(
+        default=None, description="Cheapest depot offer for the product"
+    )
+
+
+class SummarySearchResponse(BaseModel):
+    """Search response in the 'summary' view"""
+
+    numberOfFound: int = Field(..., description="Total number of products found")
+    content: list[ProductSummary] = Field(..., description="List of products")
+
+
+class CheapestSearchResponse(BaseModel):
+    """Search response in the 'cheapest' view"""
+
+    numberOfFound: int = Field(..., description="Total number of products found")
+    content: list[CheapestOfferProduct] = Field(..., description="List of products")
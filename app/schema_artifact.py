@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from .config import API_DESCRIPTION, API_TITLE, API_VERSION, SCHEMA_ARTIFACT_PATH
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT = 1
+
+_PACKAGE_DIR = Path(__file__).parent
+# Sources that shape the schemas besides the route modules
+_TOOL_SOURCES = [
+    _PACKAGE_DIR / "mcp.py",
+    _PACKAGE_DIR / "api" / "responses.py",
+    *sorted((_PACKAGE_DIR / "models").glob("*.py")),
+]
+# Packages whose version changes how the schemas are generated
+_SCHEMA_PACKAGES = ("fastapi", "pydantic", "fastmcp")
+
+
+def route_fingerprint(app: FastAPI) -> str:
+    """
+    Digest of everything the schemas are generated from.
+
+    Covers the API metadata, the installed FastAPI, Pydantic and FastMCP
+    versions, each route's path, methods and endpoint, and the source of the
+    modules defining endpoints, responses, tools and models, so any edit or
+    upgrade that could change a schema invalidates the artifact.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{ARTIFACT_FORMAT}|{API_TITLE}|{API_VERSION}".encode())
+    digest.update(API_DESCRIPTION.encode())
+    for package in _SCHEMA_PACKAGES:
+        digest.update(f"|{package}={_package_version(package)}".encode())
+
+    sources = set(_TOOL_SOURCES)
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        endpoint = route.endpoint
+        methods = ",".join(sorted(route.methods or ()))
+        target = f"{endpoint.__module__}.{endpoint.__qualname__}"
+        digest.update(f"{route.path}|{methods}|{target}".encode())
+        module = sys.modules.get(endpoint.__module__)
+        if module is not None and getattr(module, "__file__", None):
+            sources.add(Path(module.__file__))
+
+    for source in sorted(sources):
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def _package_version(package: str) -> str:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return "missing"
+
+
+def load_schema_artifact(
+    app: FastAPI, path: str | Path | None = None
+) -> dict[str, Any] | None:
+    """Return the artifact at ``path`` if it was built from the running code"""
+    if path is None:
+        path = SCHEMA_ARTIFACT_PATH
+    if not path:
+        return None
+    try:
+        artifact = json.loads(Path(path).read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable schema artifact %s: %s", path, exc)
+        return None
+
+    if artifact.get("fingerprint") != route_fingerprint(app):
+        logger.warning("Ignoring stale schema artifact %s", path)
+        return None
+    return artifact
+
+
+async def build_schema_artifact(app: FastAPI) -> dict[str, Any]:
+    """Generate the OpenAPI document and MCP tool list of an app"""
+    from .mcp_mount import get_mcp_server
+
+    server = get_mcp_server(app)
+    tools = await server.get_tools()
+    return {
+        "format": ARTIFACT_FORMAT,
+        "fingerprint": route_fingerprint(app),
+        "openapi": app.openapi(),
+        "mcpTools": [
+            tool.to_mcp_tool(name=name).model_dump(
+                mode="json", by_alias=True, exclude_none=True
+            )
+            for name, tool in sorted(tools.items())
+        ],
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Write the schema artifact, by default to SCHEMA_ARTIFACT_PATH.
+
+    Run ``python -m app.schema_artifact [path]`` at image build time so
+    workers load the OpenAPI document and MCP tool list instead of each
+    generating them.
+    """
+    from .main import create_app
+
+    args = sys.argv[1:] if argv is None else argv
+    path = Path(args[0] if args else SCHEMA_ARTIFACT_PATH)
+    artifact = asyncio.run(build_schema_artifact(create_app(use_artifact=False)))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(artifact, ensure_ascii=False, separators=(",", ":")))
+    print(
+        f"Wrote {len(artifact['mcpTools'])} MCP tools and the OpenAPI schema to {path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
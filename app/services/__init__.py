@@ -1,5 +1,21 @@
 from __future__ import annotations
 
 from .marketfiyat_service import MarketfiyatService, MarketfiyatServiceError
+from .basket import optimize_basket
+from .compare import compare_market_prices, compare_prices
+from .prewarm import CachePrewarmer
+from .price_history import PriceHistoryStore
+from .views import cheapest_offer, project_search_response, render_search_response
 
-__all__ = ["MarketfiyatService", "MarketfiyatServiceError"]
+__all__ = [
+    "CachePrewarmer",
+    "MarketfiyatService",
+    "MarketfiyatServiceError",
+    "PriceHistoryStore",
+    "cheapest_offer",
+    "compare_market_prices",
+    "compare_prices",
+    "optimize_basket",
+    "project_search_response",
+    "render_search_response",
+]
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..models import (
+    BasketLine,
+    BasketPlan,
+    BasketRequest,
+    BasketResponse,
+    Product,
+    ProductDepotInfo,
+    SearchRequest,
+    SearchResponse,
+)
+from .marketfiyat_service import MarketfiyatService
+from .progress import ProgressCallback, gather_with_progress
+
+# Cost of an item no selected depot offers; large enough that covering more
+# items always beats a cheaper but incomplete plan
+MISSING_PENALTY = 1e12
+
+# Number of depots processed per block when summing pairwise plans
+_PAIR_BLOCK = 64
+
+
+@dataclass
+class PriceMatrix:
+    """Item x depot matrix of the cheapest line total among the candidates"""
+
+    costs: np.ndarray
+    choices: np.ndarray
+    depot_ids: list[str]
+    candidates: list[list[Product]]
+
+    def offer(self, item: int, depot: int) -> tuple[Product, ProductDepotInfo]:
+        product = self.candidates[item][int(self.choices[item, depot])]
+        depot_id = self.depot_ids[depot]
+        for offer in product.productDepotInfoList:
+            if offer.depotId == depot_id:
+                return product, offer
+        raise LookupError(f"{product.id} is not offered in {depot_id}")
+
+
+def build_price_matrix(
+    candidates: list[list[Product]], quantities: list[int]
+) -> PriceMatrix:
+    """Build the item x depot cost matrix from the candidate products per item"""
+    depot_index: dict[str, int] = {}
+    rows: list[int] = []
+    columns: list[int] = []
+    prices: list[float] = []
+    products: list[int] = []
+    for item, item_candidates in enumerate(candidates):
+        for product_index, product in enumerate(item_candidates):
+            for offer in product.productDepotInfoList:
+                column = depot_index.setdefault(offer.depotId, len(depot_index))
+                rows.append(item)
+                columns.append(column)
+                prices.append(offer.price)
+                products.append(product_index)
+
+    costs = np.full((len(candidates), len(depot_index)), np.inf)
+    choices = np.full(costs.shape, -1, dtype=np.int64)
+    if prices:
+        price_array = np.asarray(prices)
+        row_array = np.asarray(rows)
+        column_array = np.asarray(columns)
+        # Sort offers by cell, cheapest first, and keep the first of each cell
+        order = np.lexsort((price_array, column_array, row_array))
+        cells = row_array[order] * len(depot_index) + column_array[order]
+        _, first = np.unique(cells, return_index=True)
+        cheapest = order[first]
+        row_array = row_array[cheapest]
+        column_array = column_array[cheapest]
+        weights = np.asarray(quantities, dtype=float)[row_array]
+        costs[row_array, column_array] = price_array[cheapest] * weights
+        choices[row_array, column_array] = np.asarray(products)[cheapest]
+
+    return PriceMatrix(
+        costs=costs,
+        choices=choices,
+        depot_ids=list(depot_index),
+        candidates=candidates,
+    )
+
+
+def _penalized(costs: np.ndarray) -> np.ndarray:
+    return np.where(np.isfinite(costs), costs, MISSING_PENALTY)
+
+
+def best_single_store(costs: np.ndarray) -> tuple[list[int], float]:
+    """Return the depot with the cheapest complete basket and its total"""
+    totals = _penalized(costs).sum(axis=0)
+    depot = int(np.argmin(totals))
+    return [depot], float(totals[depot])
+
+
+def _best_pair(costs: np.ndarray) -> tuple[list[int], float]:
+    best: tuple[list[int], float] = ([], np.inf)
+    depot_count = costs.shape[1]
+    for start in range(0, depot_count, _PAIR_BLOCK):
+        block = costs[:, start : start + _PAIR_BLOCK]
+        totals = np.minimum(block[:, :, None], costs[:, None, :]).sum(axis=0)
+        first, second = np.unravel_index(int(np.argmin(totals)), totals.shape)
+        total = float(totals[first, second])
+        if total < best[1]:
+            best = ([start + int(first), int(second)], total)
+    return best
+
+
+def best_multi_store(costs: np.ndarray, max_stores: int) -> tuple[list[int], float]:
+    """
+    Return the cheapest set of at most ``max_stores`` depots and its total.
+
+    Every item is bought at whichever selected depot is cheapest for it. Pairs
+    are evaluated exhaustively as one vectorized sum per block of depots;
+    three-store plans add each depot in turn on top of the pairwise search.
+    """
+    penalized = _penalized(costs)
+    if max_stores <= 1 or penalized.shape[1] == 1:
+        return best_single_store(costs)
+
+    if max_stores == 2:
+        depots, total = _best_pair(penalized)
+    else:
+        depots, total = [], np.inf
+        for third in range(penalized.shape[1]):
+            merged = np.minimum(penalized, penalized[:, third : third + 1])
+            pair, pair_total = _best_pair(merged)
+            if pair_total < total:
+                depots, total = [*pair, third], pair_total
+    return sorted(set(depots)), total
+
+
+def build_plan(
+    matrix: PriceMatrix,
+    depots: list[int],
+    keywords: list[str],
+    quantities: list[int],
+) -> BasketPlan:
+    selected = matrix.costs[:, depots]
+    lines = []
+    missing = []
+    total = 0.0
+    for item, row in enumerate(selected):
+        column = int(np.argmin(row))
+        if not np.isfinite(row[column]):
+            missing.append(keywords[item])
+            continue
+        product, offer = matrix.offer(item, depots[column])
+        line_total = float(row[column])
+        total += line_total
+        lines.append(
+            BasketLine(
+                keywords=keywords[item],
+                quantity=quantities[item],
+                productId=product.id,
+                title=product.title,
+                brand=product.brand,
+                depotId=offer.depotId,
+                depotName=offer.depotName,
+                marketAdi=offer.marketAdi,
+                price=offer.price,
+                lineTotal=line_total,
+            )
+        )
+
+    used = sorted({line.depotId for line in lines})
+    return BasketPlan(
+        depotIds=used,
+        total=round(total, 2),
+        lines=lines,
+        missingItems=missing,
+    )
+
+
+async def optimize_basket(
+    service: MarketfiyatService,
+    request: BasketRequest,
+    on_item: ProgressCallback[SearchResponse] | None = None,
+) -> BasketResponse:
+    """
+    Find the cheapest way to buy a shopping list near a location.
+
+    Candidates for every item are searched concurrently, then the single-store
+    and split-store plans are solved over the resulting price matrix.
+    ``on_item`` is awaited with each item's search result as it arrives.
+    """
+    responses = await gather_with_progress(
+        (
+            service.search(
+                SearchRequest(
+                    keywords=item.keywords,
+                    latitude=request.latitude,
+                    longitude=request.longitude,
+                    distance=request.distance,
+                    size=max(request.candidates, 1),
+                )
+            )
+            for item in request.items
+        ),
+        on_item,
+    )
+
+    keywords = [item.keywords for item in request.items]
+    quantities = [item.quantity for item in request.items]
+    candidates = [response.content[: request.candidates] for response in responses]
+    matrix = build_price_matrix(candidates, quantities)
+
+    available = np.isfinite(matrix.costs).any(axis=1)
+    missing = [keywords[item] for item in np.flatnonzero(~available)]
+    if not matrix.depot_ids or not available.any():
+        return BasketResponse(missingItems=missing, depotCount=0)
+
+    single, _ = best_single_store(matrix.costs)
+    multi, _ = best_multi_store(matrix.costs, request.maxStores)
+    return BasketResponse(
+        singleStore=build_plan(matrix, single, keywords, quantities),
+        multiStore=build_plan(matrix, multi, keywords, quantities),
+        missingItems=missing,
+        depotCount=len(matrix.depot_ids),
+    )
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+
+from pydantic import TypeAdapter
+
+from ..models import (
+    BudgetedProduct,
+    BudgetedSearchResponse,
+    OfferSummary,
+    OmittedSummary,
+    Product,
+    SearchResponse,
+)
+from .views import cheapest_offer
+
+# Rough size of a token in JSON with Turkish text; used to turn a token budget
+# into a byte budget without running a tokenizer
+APPROX_BYTES_PER_TOKEN = 4
+
+_PRODUCT_SERIALIZER = TypeAdapter(BudgetedProduct)
+_RESPONSE_SERIALIZER = TypeAdapter(BudgetedSearchResponse)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or belongs to a different search"""
+
+
+@dataclass(frozen=True)
+class ResponseBudget:
+    max_bytes: int | None = None
+    max_tokens: int | None = None
+    max_items: int | None = None
+
+    @property
+    def active(self) -> bool:
+        return any(
+            limit is not None
+            for limit in (self.max_bytes, self.max_tokens, self.max_items)
+        )
+
+    @property
+    def byte_limit(self) -> int | None:
+        limits = [
+            limit
+            for limit in (
+                self.max_bytes,
+                self.max_tokens * APPROX_BYTES_PER_TOKEN
+                if self.max_tokens is not None
+                else None,
+            )
+            if limit is not None
+        ]
+        return min(limits) if limits else None
+
+
+def search_fingerprint(*parts: object) -> str:
+    """Short digest identifying the search a cursor belongs to"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=6).hexdigest()
+
+
+def encode_cursor(offset: int, fingerprint: str) -> str:
+    payload = json.dumps({"o": offset, "s": fingerprint}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    """Return the offset stored in a cursor issued for the same search"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        offset, owner = int(payload["o"]), payload["s"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Malformed cursor") from exc
+    if owner != fingerprint or offset < 0:
+        raise InvalidCursorError("Cursor does not belong to this search")
+    return offset
+
+
+def _collapse(product: Product) -> BudgetedProduct:
+    offer = cheapest_offer(product)
+    return BudgetedProduct.model_construct(
+        id=product.id,
+        title=product.title,
+        brand=product.brand,
+        refinedVolumeOrWeight=product.refinedVolumeOrWeight,
+        cheapest=(
+            OfferSummary.model_construct(
+                marketAdi=offer.marketAdi,
+                depotName=offer.depotName,
+                price=offer.price,
+                unitPrice=offer.unitPrice,
+            )
+            if offer is not None
+            else None
+        ),
+        offerCount=len(product.productDepotInfoList),
+    )
+
+
+def fit_search_response(
+    response: SearchResponse,
+    budget: ResponseBudget,
+    fingerprint: str,
+    offset: int = 0,
+) -> BudgetedSearchResponse:
+    """
+    Trim a search response to a budget.
+
+    Products are ranked cheapest first and each one is collapsed to its
+    cheapest offer; facets are dropped. Starting at ``offset``, products are
+    added while the serialized response stays within the byte (or
+    approximate token) and item limits. At least one product is always
+    returned so paging with ``nextCursor`` makes progress.
+    """
+    ranked = sorted(
+        (_collapse(product) for product in response.content),
+        key=lambda product: (
+            product.cheapest is None,
+            product.cheapest.price if product.cheapest is not None else 0.0,
+        ),
+    )
+    remaining = ranked[offset:]
+    if budget.max_items is not None:
+        remaining = remaining[: budget.max_items]
+
+    byte_limit = budget.byte_limit
+    content: list[BudgetedProduct] = []
+    if byte_limit is None:
+        content = remaining
+    else:
+        # Envelope with a worst-case cursor, so adding it later cannot overflow
+        size = len(
+            _RESPONSE_SERIALIZER.dump_json(
+                _response(
+                    response,
+                    [],
+                    len(ranked),
+                    encode_cursor(len(ranked), fingerprint),
+                )
+            )
+        )
+        for product in remaining:
+            size += len(_PRODUCT_SERIALIZER.dump_json(product)) + 1
+            if content and size > byte_limit:
+                break
+            content.append(product)
+
+    end = offset + len(content)
+    next_cursor = encode_cursor(end, fingerprint) if end < len(ranked) else None
+    return _response(response, content, len(ranked) - end, next_cursor)
+
+
+def _response(
+    response: SearchResponse,
+    content: list[BudgetedProduct],
+    omitted_products: int,
+    next_cursor: str | None,
+) -> BudgetedSearchResponse:
+    offers = sum(len(product.productDepotInfoList) for product in response.content)
+    return BudgetedSearchResponse.model_construct(
+        numberOfFound=response.numberOfFound,
+        content=content,
+        omitted=OmittedSummary.model_construct(
+            products=max(omitted_products, 0),
+            offers=offers - sum(product.cheapest is not None for product in content),
+            facets=any(
+                getattr(response.facetMap, name)
+                for name in type(response.facetMap).model_fields
+            ),
+            notFetched=max(response.numberOfFound - len(response.content), 0),
+        ),
+        nextCursor=next_cursor,
+    )
+
+
+def render_budgeted_response(response: BudgetedSearchResponse) -> bytes:
+    return _RESPONSE_SERIALIZER.dump_json(response)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from ..models import (
+    CategoriesResponse,
+    Category,
+    CategoryLookupResponse,
+    CategoryMatch,
+    CategorySummary,
+    CategoryTreeResponse,
+)
+from .text import normalize
+
+
+class CategoryTree:
+    """
+    Indexed view of the upstream category taxonomy.
+
+    Built once per categories refresh. Main categories and subcategories are
+    keyed by their normalized name (case, Turkish diacritics, punctuation and
+    spacing ignored), so resolving a name or mapping a subcategory back to its
+    main category is a single dict lookup.
+    """
+
+    def __init__(self, categories: CategoriesResponse) -> None:
+        self.categories = categories
+        self._main: dict[str, Category] = {}
+        # normalized subcategory -> (upstream spelling, main category name)
+        self._sub: dict[str, tuple[str, str]] = {}
+        for category in categories.content:
+            self._main.setdefault(normalize(category.name), category)
+            for subcategory in category.subcategories:
+                self._sub.setdefault(
+                    normalize(subcategory), (subcategory, category.name)
+                )
+
+    def __len__(self) -> int:
+        return len(self._main)
+
+    def main_category(self, name: str) -> Category | None:
+        """Return the main category called ``name`` with its subcategories"""
+        return self._main.get(normalize(name))
+
+    def resolve(self, name: str) -> CategoryMatch | None:
+        """Resolve a main category or subcategory name"""
+        key = normalize(name)
+        category = self._main.get(key)
+        if category is not None:
+            return CategoryMatch(
+                query=name,
+                name=category.name,
+                mainCategory=category.name,
+                isMainCategory=True,
+            )
+        entry = self._sub.get(key)
+        if entry is None:
+            return None
+        return CategoryMatch(
+            query=name, name=entry[0], mainCategory=entry[1], isMainCategory=False
+        )
+
+    def lookup(self, names: Iterable[str]) -> CategoryLookupResponse:
+        matches = []
+        unmatched = []
+        for name in names:
+            match = self.resolve(name)
+            if match is None:
+                unmatched.append(name)
+            else:
+                matches.append(match)
+        return CategoryLookupResponse(matches=matches, unmatched=unmatched)
+
+    def summary(self) -> CategoryTreeResponse:
+        return CategoryTreeResponse(
+            categories=[
+                CategorySummary(
+                    name=category.name,
+                    subcategoryCount=len(category.subcategories),
+                )
+                for category in self.categories.content
+            ]
+        )
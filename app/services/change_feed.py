@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import secrets
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+
+from ..models import ChangeFeedResponse, PriceChange, SearchResponse
+from .price_history import parse_index_time
+
+OfferKey = tuple[str, str]
+# (sequence, product id, depot id, market, previous price, price, percentage,
+# indexTime); models are only built for the changes a client reads
+LoggedChange = tuple[int, str, str, str, float | None, float, float, str]
+
+
+class ChangeFeed:
+    """
+    In-process feed of price changes detected across search results.
+
+    The latest price and ``indexTime`` of every (product, depot) offer is kept
+    in a bounded LRU map. Each fresh upstream result is compared against it,
+    and new offers or price changes are appended to a bounded log with a
+    monotonically increasing sequence number. Offers whose ``indexTime`` is
+    older than the stored one are ignored as stale.
+
+    Tokens encode a per-process epoch and a sequence number, so a token from
+    another process or one older than the retained log triggers a reset.
+    """
+
+    def __init__(self, max_changes: int = 100_000, max_offers: int = 500_000) -> None:
+        self._max_offers = max(max_offers, 1)
+        self._offers: OrderedDict[OfferKey, tuple[float, float]] = OrderedDict()
+        self._log: deque[LoggedChange] = deque(maxlen=max(max_changes, 1))
+        self._sequence = 0
+        self._epoch = secrets.token_hex(4)
+
+    @property
+    def token(self) -> str:
+        return self._token(self._sequence)
+
+    def observe(self, response: SearchResponse) -> int:
+        """Record a fresh search result and return the number of changes found"""
+        now = time.time()
+        offers = self._offers
+        log = self._log
+        changes = 0
+        for product in response.content:
+            for offer in product.productDepotInfoList:
+                key = (product.id, offer.depotId)
+                indexed_at = parse_index_time(offer.indexTime, now)
+                previous = offers.get(key)
+                if previous is not None:
+                    previous_price, previous_indexed_at = previous
+                    if indexed_at < previous_indexed_at:
+                        continue
+                    offers.move_to_end(key)
+                    offers[key] = (offer.price, indexed_at)
+                    if offer.price == previous_price:
+                        continue
+                else:
+                    previous_price = None
+                    offers[key] = (offer.price, indexed_at)
+                    if len(offers) > self._max_offers:
+                        offers.popitem(last=False)
+
+                self._sequence += 1
+                changes += 1
+                log.append(
+                    (
+                        self._sequence,
+                        product.id,
+                        offer.depotId,
+                        offer.marketAdi,
+                        previous_price,
+                        offer.price,
+                        offer.percentage,
+                        offer.indexTime,
+                    )
+                )
+        return changes
+
+    def changes_since(
+        self, token: str | None, limit: int = 500, market: str | None = None
+    ) -> ChangeFeedResponse:
+        """Return the changes recorded after ``token``, oldest first"""
+        since = self._parse_token(token)
+        oldest = self._log[0][0] if self._log else self._sequence + 1
+        if since is None or since > self._sequence or since + 1 < oldest:
+            # Unknown, foreign or truncated position: start over from now
+            return ChangeFeedResponse(changes=[], nextToken=self.token, reset=True)
+
+        changes: list[PriceChange] = []
+        last = since
+        # The log is ordered by sequence, so skip straight to the first change
+        start = max(since + 1 - oldest, 0)
+        for change in islice(self._log, start, None):
+            last = change[0]
+            if market is None or change[3] == market:
+                changes.append(_price_change(change))
+                if len(changes) >= limit:
+                    break
+        else:
+            last = self._sequence
+        return ChangeFeedResponse(changes=changes, nextToken=self._token(last))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "tracked_offers": len(self._offers),
+            "retained_changes": len(self._log),
+            "sequence": self._sequence,
+        }
+
+    def _token(self, sequence: int) -> str:
+        return f"{self._epoch}-{sequence}"
+
+    def _parse_token(self, token: str | None) -> int | None:
+        if not token:
+            return None
+        epoch, _, sequence = token.partition("-")
+        if epoch != self._epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+
+def _price_change(change: LoggedChange) -> PriceChange:
+    sequence, product_id, depot_id, market, previous, price, percentage, index_time = (
+        change
+    )
+    return PriceChange(
+        sequence=sequence,
+        productId=product_id,
+        depotId=depot_id,
+        marketAdi=market,
+        previousPrice=previous,
+        price=price,
+        percentage=percentage,
+        indexTime=index_time,
+    )
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+
+import numpy as np
+
+from ..models import (
+    CheapestDepotOffer,
+    MarketPriceStats,
+    PriceComparisonResponse,
+    SearchRequest,
+    SearchResponse,
+)
+from .geo import haversine_meters
+from .marketfiyat_service import MarketfiyatService
+from .progress import ProgressCallback
+
+# "38,50 ₺/lt", "1.249,90 ₺/kg", "40,00 ₺"
+_UNIT_PRICE = re.compile(r"^\s*(\d[\d.]*(?:,\d+)?)\s*₺?\s*(?:/\s*(\S+))?\s*$")
+
+
+def parse_unit_price(text: str) -> tuple[float | None, str | None]:
+    """Split a formatted unit price into its amount and unit"""
+    match = _UNIT_PRICE.match(text)
+    if match is None:
+        return None, None
+    amount = float(match.group(1).replace(".", "").replace(",", "."))
+    unit = match.group(2)
+    return amount, unit.casefold() if unit else None
+
+
+def _sorted_groups(
+    keys: np.ndarray, values: np.ndarray, group_count: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Minimum, median, maximum, size and position of the minimum of every group.
+
+    One lexsort orders the values within each group, so every statistic is a
+    lookup at the group boundaries. Empty groups get NaN statistics.
+    """
+    order = np.lexsort((values, keys))
+    sorted_keys = keys[order]
+    sorted_values = values[order]
+    groups = np.arange(group_count)
+    starts = np.searchsorted(sorted_keys, groups, side="left")
+    counts = np.searchsorted(sorted_keys, groups, side="right") - starts
+
+    present = counts > 0
+    first = np.where(present, starts, 0)
+    last = np.where(present, starts + counts - 1, 0)
+    lower = np.where(present, starts + (counts - 1) // 2, 0)
+    upper = np.where(present, starts + counts // 2, 0)
+    if not len(sorted_values):
+        nan = np.full(group_count, np.nan)
+        return nan, nan, nan, counts, first
+    minimum = np.where(present, sorted_values[first], np.nan)
+    maximum = np.where(present, sorted_values[last], np.nan)
+    median = np.where(
+        present, (sorted_values[lower] + sorted_values[upper]) / 2, np.nan
+    )
+    return minimum, median, maximum, counts, np.where(present, order[first], -1)
+
+
+def _optional(value: float) -> float | None:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def compare_market_prices(
+    response: SearchResponse, request: SearchRequest
+) -> PriceComparisonResponse:
+    """
+    Group the offers of a search result by market.
+
+    Price and unit price statistics of every market are computed over flat
+    offer arrays in one pass. Unit prices are only compared in the most
+    common unit of the result, so per-kg and per-piece prices are not mixed.
+    """
+    offers = [
+        (product_index, offer)
+        for product_index, product in enumerate(response.content)
+        for offer in product.productDepotInfoList
+    ]
+    if not offers:
+        return PriceComparisonResponse(
+            keywords=request.keywords,
+            numberOfFound=response.numberOfFound,
+            productCount=len(response.content),
+            markets=[],
+        )
+
+    markets, market_codes = np.unique(
+        [offer.marketAdi for _, offer in offers], return_inverse=True
+    )
+    products = np.fromiter((index for index, _ in offers), np.int64, len(offers))
+    prices = np.fromiter((offer.price for _, offer in offers), float, len(offers))
+    parsed = [parse_unit_price(offer.unitPrice) for _, offer in offers]
+    units = Counter(unit for amount, unit in parsed if amount is not None)
+    unit = units.most_common(1)[0][0] if units else None
+    unit_prices = np.fromiter(
+        (
+            amount if amount is not None and offer_unit == unit else np.nan
+            for amount, offer_unit in parsed
+        ),
+        float,
+        len(parsed),
+    )
+
+    min_price, median_price, max_price, offer_counts, cheapest = _sorted_groups(
+        market_codes, prices, len(markets)
+    )
+    comparable = ~np.isnan(unit_prices)
+    min_unit, median_unit, max_unit, _, _ = _sorted_groups(
+        market_codes[comparable], unit_prices[comparable], len(markets)
+    )
+    pairs = np.unique(market_codes * len(response.content) + products)
+    product_counts = np.bincount(pairs // len(response.content), minlength=len(markets))
+    distances = haversine_meters(
+        request.latitude,
+        request.longitude,
+        np.fromiter((offers[i][1].latitude for i in cheapest), float, len(markets)),
+        np.fromiter((offers[i][1].longitude for i in cheapest), float, len(markets)),
+    )
+
+    stats = []
+    for market in range(len(markets)):
+        product_index, offer = offers[cheapest[market]]
+        product = response.content[product_index]
+        stats.append(
+            MarketPriceStats(
+                marketAdi=str(markets[market]),
+                offerCount=int(offer_counts[market]),
+                productCount=int(product_counts[market]),
+                minPrice=float(min_price[market]),
+                medianPrice=round(float(median_price[market]), 2),
+                maxPrice=float(max_price[market]),
+                minUnitPrice=_optional(min_unit[market]),
+                medianUnitPrice=_optional(median_unit[market]),
+                maxUnitPrice=_optional(max_unit[market]),
+                cheapest=CheapestDepotOffer(
+                    productId=product.id,
+                    title=product.title,
+                    brand=product.brand,
+                    depotId=offer.depotId,
+                    depotName=offer.depotName,
+                    price=offer.price,
+                    unitPrice=offer.unitPrice,
+                    distanceMeters=round(float(distances[market]), 1),
+                ),
+            )
+        )
+    stats.sort(key=lambda market: (market.minPrice, market.marketAdi))
+
+    return PriceComparisonResponse(
+        keywords=request.keywords,
+        numberOfFound=response.numberOfFound,
+        productCount=len(response.content),
+        unit=unit,
+        markets=stats,
+    )
+
+
+async def compare_prices(
+    service: MarketfiyatService,
+    request: SearchRequest,
+    page_count: int = 1,
+    on_page: ProgressCallback[SearchResponse] | None = None,
+) -> PriceComparisonResponse:
+    """Search near a location and compare the offers per market"""
+    if page_count > 1:
+        response = await service.search_pages(request, page_count, on_page)
+    else:
+        response = await service.search(request)
+    return compare_market_prices(response, request)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from ..models import NearestDepot
+from .geo import EARTH_RADIUS_METERS, CoverageMap, haversine_meters
+
+_METERS_PER_DEGREE = math.pi * EARTH_RADIUS_METERS / 180.0
+
+GridCell = tuple[int, int]
+
+
+class DepotIndex:
+    """
+    Grid index of depots seen in ``/api/v2/nearest`` responses.
+
+    Every upstream answer replaces the depots inside the circle it covered and
+    records that circle as fresh for ``ttl`` seconds. While a query circle
+    lies inside a fresh one, ``nearby`` answers it from the index: the grid
+    narrows the depots to the cells overlapping the circle's bounding box and
+    their haversine distances are computed in one vectorized pass. Once the
+    area expires the caller asks upstream again, which refreshes it.
+    """
+
+    def __init__(self, cell_degrees: float = 0.05, max_areas: int = 4096) -> None:
+        self._cell_degrees = cell_degrees
+        self._depots: dict[str, NearestDepot] = {}
+        self._coverage = CoverageMap(max_areas)
+        # Arrays and grid are rebuilt lazily after the depot set changes
+        self._ids: list[str] = []
+        self._latitudes = np.empty(0)
+        self._longitudes = np.empty(0)
+        self._grid: dict[GridCell, np.ndarray] = {}
+        self._dirty = False
+        self.local_hits = 0
+        self.local_misses = 0
+
+    def __len__(self) -> int:
+        return len(self._depots)
+
+    def add(
+        self,
+        depots: list[NearestDepot],
+        latitude: float,
+        longitude: float,
+        radius_meters: float,
+        ttl: float,
+    ) -> None:
+        """Replace the depots inside an upstream-answered circle"""
+        returned = {depot.id for depot in depots}
+        # Depots upstream no longer lists in this circle have closed or moved
+        for depot in self.nearby(latitude, longitude, radius_meters):
+            if depot.id not in returned:
+                del self._depots[depot.id]
+                self._dirty = True
+        for depot in depots:
+            self._depots[depot.id] = depot
+        self._dirty = self._dirty or bool(depots)
+        if ttl > 0:
+            self._coverage.record(latitude, longitude, radius_meters, ttl)
+
+    def covers(self, latitude: float, longitude: float, radius_meters: float) -> bool:
+        covered = self._coverage.covers(latitude, longitude, radius_meters)
+        if covered:
+            self.local_hits += 1
+        else:
+            self.local_misses += 1
+        return covered
+
+    def nearby(
+        self, latitude: float, longitude: float, radius_meters: float
+    ) -> list[NearestDepot]:
+        """Return the known depots within ``radius_meters``, nearest first"""
+        if self._dirty:
+            self._rebuild()
+        candidates = self._candidates(latitude, longitude, radius_meters)
+        if candidates.size == 0:
+            return []
+
+        distances = haversine_meters(
+            latitude,
+            longitude,
+            self._latitudes[candidates],
+            self._longitudes[candidates],
+        )
+        in_range = distances <= radius_meters
+        candidates = candidates[in_range]
+        distances = distances[in_range]
+        order = np.argsort(distances, kind="stable")
+        return [
+            self._depots[self._ids[candidates[position]]].model_copy(
+                update={"distance": float(distances[position])}
+            )
+            for position in order
+        ]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "depots": len(self._depots),
+            "covered_areas": len(self._coverage),
+            "local_hits": self.local_hits,
+            "local_misses": self.local_misses,
+        }
+
+    # Internal helpers -------------------------------------------------
+
+    def _cell(self, latitude: float, longitude: float) -> GridCell:
+        return (
+            math.floor(latitude / self._cell_degrees),
+            math.floor(longitude / self._cell_degrees),
+        )
+
+    def _rebuild(self) -> None:
+        self._ids = list(self._depots)
+        depots = self._depots.values()
+        self._latitudes = np.fromiter(
+            (depot.location.lat for depot in depots), float, len(self._ids)
+        )
+        self._longitudes = np.fromiter(
+            (depot.location.lon for depot in depots), float, len(self._ids)
+        )
+        cells: defaultdict[GridCell, list[int]] = defaultdict(list)
+        rows = np.floor(self._latitudes / self._cell_degrees).astype(np.int64)
+        columns = np.floor(self._longitudes / self._cell_degrees).astype(np.int64)
+        for position, cell in enumerate(
+            zip(rows.tolist(), columns.tolist(), strict=True)
+        ):
+            cells[cell].append(position)
+        self._grid = {
+            cell: np.asarray(positions, dtype=np.int64)
+            for cell, positions in cells.items()
+        }
+        self._dirty = False
+
+    def _candidates(
+        self, latitude: float, longitude: float, radius_meters: float
+    ) -> np.ndarray:
+        if not self._grid:
+            return np.empty(0, dtype=np.int64)
+        delta_latitude = radius_meters / _METERS_PER_DEGREE
+        # Longitude degrees shrink towards the poles
+        delta_longitude = delta_latitude / max(math.cos(math.radians(latitude)), 1e-6)
+        first_row, first_column = self._cell(
+            latitude - delta_latitude, longitude - delta_longitude
+        )
+        last_row, last_column = self._cell(
+            latitude + delta_latitude, longitude + delta_longitude
+        )
+        if (last_row - first_row + 1) * (last_column - first_column + 1) > len(
+            self._grid
+        ):
+            # Large radius: scanning the occupied cells is cheaper
+            return np.concatenate(list(self._grid.values()))
+        blocks = [
+            self._grid[(row, column)]
+            for row in range(first_row, last_row + 1)
+            for column in range(first_column, last_column + 1)
+            if (row, column) in self._grid
+        ]
+        if not blocks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(blocks)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable
+
+from ..models import FacetItem, FacetMap, Product
+
+
+def _facet_items(counts: Counter[str]) -> list[FacetItem] | None:
+    if not counts:
+        return None
+    return [
+        FacetItem(name=name, count=count)
+        for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+def aggregate_facets(products: Iterable[Product]) -> FacetMap:
+    """
+    Count facets over a result set in one pass.
+
+    Every facet counts products, not offers: a product sold by three BIM depots
+    adds one to ``bim``. The first category of a product is its main category
+    and the rest are subcategories. Items are ordered by count, then name.
+    """
+    main_categories: Counter[str] = Counter()
+    sub_categories: Counter[str] = Counter()
+    brands: Counter[str] = Counter()
+    markets: Counter[str] = Counter()
+    quantity_units: Counter[str] = Counter()
+    volumes: Counter[str] = Counter()
+
+    for product in products:
+        if product.categories:
+            main_categories[product.categories[0]] += 1
+            sub_categories.update(set(product.categories[1:]))
+        if product.brand:
+            brands[product.brand] += 1
+        markets.update({offer.marketAdi for offer in product.productDepotInfoList})
+        if product.refinedQuantityUnit:
+            quantity_units[product.refinedQuantityUnit] += 1
+        if product.refinedVolumeOrWeight:
+            volumes[product.refinedVolumeOrWeight] += 1
+
+    return FacetMap(
+        sub_category=_facet_items(sub_categories),
+        refined_quantity_unit=_facet_items(quantity_units),
+        main_category=_facet_items(main_categories),
+        refined_volume_weight=_facet_items(volumes),
+        brand=_facet_items(brands),
+        market_names=_facet_items(markets),
+    )
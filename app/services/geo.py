@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+EARTH_RADIUS_METERS = 6_371_000.0
+
+
+def haversine_meters(
+    latitude: float,
+    longitude: float,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+) -> np.ndarray:
+    """Great-circle distances in meters from one point to many, vectorized"""
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(latitudes)
+    dlat = lat2 - lat1
+    dlon = np.radians(longitudes) - np.radians(longitude)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+@dataclass(frozen=True)
+class CoveredArea:
+    latitude: float
+    longitude: float
+    radius_meters: float
+    expires_at: float
+    # What the owner fetched for this area, e.g. the page of a search result
+    detail: Any = None
+
+
+class CoverageMap:
+    """
+    Bounded set of circles that were recently fetched from upstream.
+
+    A query circle is covered when it lies entirely inside a recorded circle
+    that has not expired yet.
+    """
+
+    def __init__(self, max_areas: int = 1024) -> None:
+        self._max_areas = max(max_areas, 1)
+        self._areas: list[CoveredArea] = []
+
+    def __len__(self) -> int:
+        return len(self._areas)
+
+    def record(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_meters: float,
+        ttl: float,
+        detail: Any = None,
+    ) -> None:
+        now = time.monotonic()
+        self._areas = [area for area in self._areas if area.expires_at > now]
+        self._areas.append(
+            CoveredArea(latitude, longitude, radius_meters, now + max(ttl, 0.0), detail)
+        )
+        if len(self._areas) > self._max_areas:
+            del self._areas[: len(self._areas) - self._max_areas]
+
+    def covers(self, latitude: float, longitude: float, radius_meters: float) -> bool:
+        return bool(self.covering(latitude, longitude, radius_meters))
+
+    def covering(
+        self, latitude: float, longitude: float, radius_meters: float
+    ) -> list[CoveredArea]:
+        """Unexpired areas that contain the query circle, newest first"""
+        now = time.monotonic()
+        areas = [area for area in self._areas if area.expires_at > now]
+        if not areas:
+            return []
+        distances = haversine_meters(
+            latitude,
+            longitude,
+            np.fromiter((area.latitude for area in areas), float, len(areas)),
+            np.fromiter((area.longitude for area in areas), float, len(areas)),
+        )
+        radii = np.fromiter((area.radius_meters for area in areas), float, len(areas))
+        inside = distances + radius_meters <= radii
+        return [areas[i] for i in np.flatnonzero(inside)[::-1]]
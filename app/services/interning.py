@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import random
+import sys
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from ..models import SearchResponse
+
+# Low-cardinality fields of the raw upstream payloads
+OFFER_FIELDS = ("depotId", "depotName", "marketAdi", "indexTime")
+PRODUCT_FIELDS = ("brand", "refinedQuantityUnit", "refinedVolumeOrWeight")
+DEPOT_FIELDS = ("id", "sellerName", "marketName")
+
+# Cached responses walked by each ``measure`` call
+MEASURE_SAMPLE = 64
+
+
+class Vocabulary:
+    """
+    Bounded pool of shared string instances.
+
+    Repeated values such as market names, depot names, categories and index
+    times are replaced by a single shared instance while decoding upstream
+    payloads. Strings are kept in two generations of up to half of
+    ``max_size`` each: when the current one fills up it replaces the previous
+    one, so values that stopped recurring, such as old index times, age out
+    and new values keep being interned.
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        self._max_size = max(max_size, 0)
+        self._generation_size = self._max_size // 2 if self._max_size > 1 else 1
+        self._current: dict[str, str] = {}
+        self._previous: dict[str, str] = {}
+        self.hits = 0
+        self.rotations = 0
+
+    def __len__(self) -> int:
+        return len(self._current) + len(self._previous)
+
+    def intern(self, value: str) -> str:
+        existing = self._current.get(value)
+        if existing is not None:
+            self.hits += 1
+            return existing
+        if self._max_size == 0:
+            return value
+        existing = self._previous.pop(value, None)
+        if existing is not None:
+            # Still in use: carry it over to the current generation
+            self.hits += 1
+            value = existing
+        if len(self._current) >= self._generation_size:
+            self._previous = self._current
+            self._current = {}
+            self.rotations += 1
+        self._current[value] = value
+        return value
+
+    def is_interned(self, value: object) -> bool:
+        return isinstance(value, str) and (
+            self._current.get(value) is value or self._previous.get(value) is value
+        )
+
+    def intern_search_payload(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Intern the repeated strings of a raw ``/api/v2/search`` payload in place"""
+        for product in data.get("content") or ():
+            self._intern_fields(product, PRODUCT_FIELDS)
+            categories = product.get("categories")
+            if categories:
+                product["categories"] = [
+                    self.intern(category) if isinstance(category, str) else category
+                    for category in categories
+                ]
+            for offer in product.get("productDepotInfoList") or ():
+                self._intern_fields(offer, OFFER_FIELDS)
+
+        for items in (data.get("facetMap") or {}).values():
+            for item in items or ():
+                self._intern_fields(item, ("name",))
+        return data
+
+    def intern_depots_payload(
+        self, depots: Iterable[dict[str, Any]]
+    ) -> Iterable[dict[str, Any]]:
+        """Intern the repeated strings of a raw ``/api/v2/nearest`` payload in place"""
+        for depot in depots:
+            self._intern_fields(depot, DEPOT_FIELDS)
+        return depots
+
+    def measure(
+        self, responses: Sequence[SearchResponse], sample: int = MEASURE_SAMPLE
+    ) -> dict[str, int]:
+        """
+        Estimate how much memory interning saves across ``responses``.
+
+        Every reference to a shared instance beyond the first would otherwise
+        be a separate string object of the same size. At most ``sample``
+        responses are walked, so the report stays cheap with a full cache;
+        the referenced bytes of the sample are scaled up to all responses,
+        while the distinct strings are counted once as they are shared.
+        """
+        total = len(responses)
+        if total > sample:
+            responses = random.sample(responses, sample)
+        references = 0
+        distinct: set[int] = set()
+        referenced_bytes = 0
+        distinct_bytes = 0
+
+        def visit(value: object) -> None:
+            nonlocal references, referenced_bytes, distinct_bytes
+            if not self.is_interned(value):
+                return
+            size = sys.getsizeof(value)
+            references += 1
+            referenced_bytes += size
+            if id(value) not in distinct:
+                distinct.add(id(value))
+                distinct_bytes += size
+
+        for response in responses:
+            for product in response.content:
+                visit(product.brand)
+                visit(product.refinedQuantityUnit)
+                visit(product.refinedVolumeOrWeight)
+                for category in product.categories:
+                    visit(category)
+                for offer in product.productDepotInfoList:
+                    visit(offer.depotId)
+                    visit(offer.depotName)
+                    visit(offer.marketAdi)
+                    visit(offer.indexTime)
+
+        scale = total / len(responses) if responses else 0.0
+        return {
+            "responses": total,
+            "sampled_responses": len(responses),
+            "interned_references": references,
+            "distinct_strings": len(distinct),
+            "estimated_bytes_saved": max(
+                round(referenced_bytes * scale) - distinct_bytes, 0
+            ),
+        }
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "rotations": self.rotations,
+        }
+
+    def _intern_fields(self, item: dict[str, Any], fields: tuple[str, ...]) -> None:
+        for field in fields:
+            value = item.get(field)
+            if isinstance(value, str):
+                item[field] = self.intern(value)
@@ -1,13 +1,31 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+import heapq
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
 import httpx
-from httpx_socks import AsyncProxyTransport
 
-from ..config import DEFAULT_CACHE_SECONDS, MARKETFIYAT_BASE_URL, SOCKS_PROXY
+from ..config import (
+    CACHE_MAX_ENTRIES,
+    CATEGORIES_CACHE_SECONDS,
+    DEFAULT_CACHE_SECONDS,
+    DEPOT_INDEX_FRESHNESS_SECONDS,
+    LOCAL_INDEX_FRESHNESS_SECONDS,
+    LOCAL_INDEX_SIZE,
+    MARKETFIYAT_BASE_URL,
+    PRODUCT_REGISTRY_SIZE,
+    QUERY_TOP_K,
+    SOCKS_PROXY,
+    SUGGEST_INDEX_MAX_BYTES,
+    SUGGEST_REBUILD_SECONDS,
+    VOCABULARY_SIZE,
+)
+from ..metrics import Family, Metrics
 from ..models import (
     CategoriesResponse,
     NearestDepot,
@@ -16,6 +34,18 @@ from ..models import (
     SearchRequest,
     SearchResponse,
 )
+from ..timing import record_cache, record_phase, timed
+from ..tracing import Span, Tracer, inject_trace_context, set_attributes, traced
+from .category_tree import CategoryTree
+from .change_feed import ChangeFeed
+from .depot_index import DepotIndex
+from .interning import Vocabulary
+from .price_history import PriceHistoryStore
+from .product_registry import ProductRegistry, merge_search_responses
+from .progress import ProgressCallback, gather_with_progress
+from .query_stats import HeavyHitters, normalize_key
+from .search_index import ProductIndex
+from .suggest import QUERY, SuggestionIndex
 
 CacheKey = tuple[str, int, int, float, float, int]
 
@@ -24,6 +54,8 @@ CacheKey = tuple[str, int, int, float, float, int]
 class CacheEntry:
     response: SearchResponse
     expires_at: datetime
+    # Rendered (and compressed) bodies of the response, keyed by variant
+    payloads: dict[str, bytes] = field(default_factory=dict)
 
 
 class MarketfiyatServiceError(Exception):
@@ -34,11 +66,52 @@ class MarketfiyatServiceError(Exception):
 
 
 class MarketfiyatService:
-    def __init__(self, cache_seconds: int = DEFAULT_CACHE_SECONDS) -> None:
+    def __init__(
+        self,
+        cache_seconds: int = DEFAULT_CACHE_SECONDS,
+        product_registry_size: int = PRODUCT_REGISTRY_SIZE,
+        vocabulary_size: int = VOCABULARY_SIZE,
+        history: PriceHistoryStore | None = None,
+        local_index_size: int = LOCAL_INDEX_SIZE,
+        local_index_freshness: int = LOCAL_INDEX_FRESHNESS_SECONDS,
+        categories_cache_seconds: int = CATEGORIES_CACHE_SECONDS,
+        depot_index_freshness: int = DEPOT_INDEX_FRESHNESS_SECONDS,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+        query_top_k: int = QUERY_TOP_K,
+        suggest_max_bytes: int = SUGGEST_INDEX_MAX_BYTES,
+        suggest_rebuild_seconds: float = SUGGEST_REBUILD_SECONDS,
+        metrics: Metrics | None = None,
+        tracer: Tracer | None = None,
+    ) -> None:
         self._cache_seconds = max(cache_seconds, 0)
+        self._cache_max_entries = max(cache_max_entries, 1)
+        self.cache_evictions = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
         self._cache: dict[CacheKey, CacheEntry] = {}
         self._cache_lock = asyncio.Lock()
         self._client: httpx.AsyncClient | None = None
+        self.products = ProductRegistry(product_registry_size)
+        self.vocabulary = Vocabulary(vocabulary_size)
+        self.history = history
+        self.changes = ChangeFeed()
+        self._index_freshness = max(local_index_freshness, 0)
+        self.index = ProductIndex(local_index_size, freshness=self._index_freshness)
+        self.suggestions = SuggestionIndex(
+            max_bytes=suggest_max_bytes, rebuild_interval=suggest_rebuild_seconds
+        )
+        self._categories_cache_seconds = max(categories_cache_seconds, 0)
+        self._category_tree: CategoryTree | None = None
+        self._category_tree_expires_at = datetime.min
+        self._categories_lock = asyncio.Lock()
+        self.depots = DepotIndex()
+        self._depot_index_freshness = max(depot_index_freshness, 0)
+        # Upstream searches currently running; background work yields to them
+        self.in_flight = 0
+        self.queries: HeavyHitters[CacheKey, SearchRequest] = HeavyHitters(query_top_k)
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.metrics.add_collector(self._collect_metrics)
+        self.tracer = tracer if tracer is not None else Tracer()
 
     async def initialize(self) -> None:
         """Initialize the HTTP client with optional SOCKS proxy support"""
@@ -50,25 +123,48 @@ class MarketfiyatService:
                     "Content-Type": "application/json",
                     "Accept": "application/json",
                 },
+                # Upstream requests continue the caller's trace
+                "event_hooks": {"request": [inject_trace_context]},
             }
 
             # Configure SOCKS proxy if SOCKS_PROXY environment variable is set
             if SOCKS_PROXY:
+                # Imported here: httpx_socks is slow to import and rarely used
+                from httpx_socks import AsyncProxyTransport
+
                 transport = AsyncProxyTransport.from_url(SOCKS_PROXY)
                 client_kwargs["transport"] = transport
 
             self._client = httpx.AsyncClient(**client_kwargs)
 
+        if self.history is not None:
+            await self.history.start()
+        self.suggestions.start()
+
     async def close(self) -> None:
         """Close the HTTP client"""
         if self._client is not None:
             await self._client.aclose()
             self._client = None
+        if self.history is not None:
+            await self.history.close()
+        await self.suggestions.close()
 
     async def get_nearest_depots(
         self, latitude: float, longitude: float, distance: int = 1
     ) -> list[NearestDepot]:
-        """Get nearest depots within the specified distance"""
+        """
+        Get nearest depots within the specified distance.
+
+        Areas inside a recent upstream answer are served from the local depot
+        index instead of calling upstream.
+        """
+        radius = distance * 1000.0
+        if self._depot_index_freshness > 0 and self.depots.covers(
+            latitude, longitude, radius
+        ):
+            return self.depots.nearby(latitude, longitude, radius)
+
         if self._client is None:
             await self.initialize()
 
@@ -76,13 +172,20 @@ class MarketfiyatService:
             nearest_request = NearestDepotRequest(
                 latitude=latitude, longitude=longitude, distance=distance
             )
-            response = await self._client.post(
+            response = await self._upstream(
                 "/api/v2/nearest",
-                json=nearest_request.model_dump(),
+                self._client.post(
+                    "/api/v2/nearest",
+                    json=nearest_request.model_dump(),
+                ),
             )
             response.raise_for_status()
-            data = response.json()
-            return [NearestDepot(**depot) for depot in data]
+            data = self.vocabulary.intern_depots_payload(response.json())
+            depots = [NearestDepot(**depot) for depot in data]
+            self.depots.add(
+                depots, latitude, longitude, radius, ttl=self._depot_index_freshness
+            )
+            return depots
 
         except httpx.HTTPStatusError as exc:
             raise MarketfiyatServiceError(
@@ -97,27 +200,40 @@ class MarketfiyatService:
         except Exception as exc:
             raise MarketfiyatServiceError(f"Unexpected error: {str(exc)}") from exc
 
-    async def search(self, request: SearchRequest) -> SearchResponse:
+    @traced("search")
+    async def search(
+        self, request: SearchRequest, refresh: bool = False
+    ) -> SearchResponse:
         """
         Search products using a two-step process (without menuCategory):
         1. Get nearest depots based on location and distance
         2. Search products in those depots
+
+        ``refresh`` skips the cache read and does not count the search as user
+        traffic; the pre-warmer uses it to renew entries before they expire.
         """
         if self._client is None:
             await self.initialize()
 
+        set_attributes(keywords=request.keywords, page=request.pages, refresh=refresh)
         cache_key = self._build_cache_key(request)
-        cached = await self._read_cache(cache_key)
-        if cached is not None:
-            return cached
-
+        if not refresh:
+            if request.pages == 0:
+                self.suggestions.record_query(request.keywords)
+            self._record_request(cache_key, request)
+            cached = await self._read_cache(cache_key)
+            if cached is not None:
+                return cached
+
+        self.in_flight += 1
         try:
             # Step 1: Get nearest depots based on location and distance
-            nearest_depots = await self.get_nearest_depots(
-                latitude=request.latitude,
-                longitude=request.longitude,
-                distance=request.distance,
-            )
+            with self._phase("depot"):
+                nearest_depots = await self.get_nearest_depots(
+                    latitude=request.latitude,
+                    longitude=request.longitude,
+                    distance=request.distance,
+                )
             # Extract depot IDs from nearest depots
             depot_ids = [depot.id for depot in nearest_depots]
 
@@ -132,15 +248,20 @@ class MarketfiyatService:
                 "depots": depot_ids,
             }
 
-            response = await self._client.post(
-                "/api/v2/search",
-                json=search_payload,
-            )
+            with timed("upstream"):
+                response = await self._upstream(
+                    "/api/v2/search",
+                    self._client.post("/api/v2/search", json=search_payload),
+                )
             response.raise_for_status()
-            data = response.json()
-            search_response = SearchResponse(**data)
+            with self._phase("decode"):
+                data = self.vocabulary.intern_search_payload(response.json())
+                search_response = self.products.canonicalize_response(
+                    SearchResponse(**data)
+                )
 
             await self._write_cache(cache_key, search_response)
+            self._record_fresh_result(search_response, request)
             return search_response
 
         except httpx.HTTPStatusError as exc:
@@ -154,7 +275,10 @@ class MarketfiyatService:
             ) from exc
         except Exception as exc:
             raise MarketfiyatServiceError(f"Unexpected error: {str(exc)}") from exc
+        finally:
+            self.in_flight -= 1
 
+    @traced("search_by_categories")
     async def search_by_categories(
         self, request: SearchByCategoryRequest
     ) -> SearchResponse:
@@ -166,18 +290,24 @@ class MarketfiyatService:
         if self._client is None:
             await self.initialize()
 
+        set_attributes(keywords=request.keywords, page=request.pages)
+        if request.pages == 0:
+            self.suggestions.record_query(request.keywords)
         cache_key = self._build_cache_key_with_menu(request)
+        self._record_request(cache_key, request)
         cached = await self._read_cache(cache_key)
         if cached is not None:
             return cached
 
+        self.in_flight += 1
         try:
             # Step 1: Get nearest depots based on location and distance
-            nearest_depots = await self.get_nearest_depots(
-                latitude=request.latitude,
-                longitude=request.longitude,
-                distance=request.distance,
-            )
+            with self._phase("depot"):
+                nearest_depots = await self.get_nearest_depots(
+                    latitude=request.latitude,
+                    longitude=request.longitude,
+                    distance=request.distance,
+                )
             # Extract depot IDs from nearest depots
             depot_ids = [depot.id for depot in nearest_depots]
 
@@ -193,15 +323,20 @@ class MarketfiyatService:
                 "menuCategory": request.menuCategory,
             }
 
-            response = await self._client.post(
-                "/api/v2/search",
-                json=search_payload,
-            )
+            with timed("upstream"):
+                response = await self._upstream(
+                    "/api/v2/search",
+                    self._client.post("/api/v2/search", json=search_payload),
+                )
             response.raise_for_status()
-            data = response.json()
-            search_response = SearchResponse(**data)
+            with self._phase("decode"):
+                data = self.vocabulary.intern_search_payload(response.json())
+                search_response = self.products.canonicalize_response(
+                    SearchResponse(**data)
+                )
 
             await self._write_cache(cache_key, search_response)
+            self._record_fresh_result(search_response, request)
             return search_response
 
         except httpx.HTTPStatusError as exc:
@@ -215,29 +350,147 @@ class MarketfiyatService:
             ) from exc
         except Exception as exc:
             raise MarketfiyatServiceError(f"Unexpected error: {str(exc)}") from exc
+        finally:
+            self.in_flight -= 1
+
+    async def search_pages(
+        self,
+        request: SearchRequest,
+        page_count: int,
+        on_page: ProgressCallback[SearchResponse] | None = None,
+    ) -> SearchResponse:
+        """
+        Fetch ``page_count`` consecutive pages starting at ``request.pages``
+        concurrently and merge them, deduplicating products by id.
+
+        ``on_page`` is awaited with each page as soon as it arrives; a failed
+        or cancelled call cancels the pages still being fetched.
+        """
+
+        def fetch(offset: int) -> Awaitable[SearchResponse]:
+            page = request.model_copy(update={"pages": request.pages + offset})
+            if isinstance(page, SearchByCategoryRequest):
+                return self.search_by_categories(page)
+            return self.search(page)
+
+        pages = await gather_with_progress(
+            (fetch(offset) for offset in range(max(page_count, 1))), on_page
+        )
+        return merge_search_responses(pages, self.products)
+
+    def search_local(self, request: SearchRequest) -> SearchResponse | None:
+        """
+        Answer a keyword search from the local product index.
+
+        Returns None when no fresh enough upstream search covers the requested
+        keywords and area; callers then fall back to ``search``.
+        """
+        return self.index.search(request)
 
     async def get_categories(self) -> CategoriesResponse:
         """Get available product categories"""
-        if self._client is None:
-            await self.initialize()
+        return (await self.get_category_tree()).categories
 
-        try:
-            response = await self._client.get("/api/v1/info/categories")
-            response.raise_for_status()
-            data = response.json()
-            return CategoriesResponse(**data)
+    async def get_category_tree(self) -> CategoryTree:
+        """
+        Get the indexed category tree, re-fetching the categories from upstream
+        once ``categories_cache_seconds`` have passed
+        """
+        tree = self._category_tree
+        if tree is not None and self._category_tree_expires_at > datetime.utcnow():
+            return tree
+
+        async with self._categories_lock:
+            # Another request may have refreshed the tree while we waited
+            tree = self._category_tree
+            if tree is not None and self._category_tree_expires_at > datetime.utcnow():
+                return tree
+            categories = await self._fetch_categories()
+            tree = CategoryTree(categories)
+            self.suggestions.add_categories(categories)
+            self._category_tree = tree
+            self._category_tree_expires_at = datetime.utcnow() + timedelta(
+                seconds=self._categories_cache_seconds
+            )
+            return tree
 
-        except httpx.HTTPStatusError as exc:
-            raise MarketfiyatServiceError(
-                f"Categories API request failed with status {exc.response.status_code}",
-                status_code=exc.response.status_code,
-            ) from exc
-        except httpx.RequestError as exc:
-            raise MarketfiyatServiceError(
-                f"Failed to connect to Marketfiyat API: {str(exc)}"
-            ) from exc
-        except Exception as exc:
-            raise MarketfiyatServiceError(f"Unexpected error: {str(exc)}") from exc
+    def get_payload_cache(self, request: SearchRequest) -> dict[str, bytes] | None:
+        """
+        Return the encoded payload store of the live cache entry for a request.
+
+        Routes keep rendered and compressed bodies here so repeated hits on a
+        cached search are served without re-encoding.
+        """
+        if isinstance(request, SearchByCategoryRequest):
+            cache_key = self._build_cache_key_with_menu(request)
+        else:
+            cache_key = self._build_cache_key(request)
+
+        entry = self._cache.get(cache_key)
+        if entry is None or entry.expires_at <= datetime.utcnow():
+            return None
+        return entry.payloads
+
+    def cache_ttl(self, request: SearchRequest) -> float | None:
+        """Seconds until the cached result of a keyword search expires"""
+        entry = self._cache.get(self._build_cache_key(request))
+        if entry is None:
+            return None
+        remaining = (entry.expires_at - datetime.utcnow()).total_seconds()
+        return remaining if remaining > 0 else None
+
+    def popular_requests(self, limit: int) -> list[SearchRequest]:
+        """Most frequent recent keyword searches, as last requested"""
+        requests: list[SearchRequest] = []
+        for _, request, _ in self.queries.top():
+            if len(requests) >= limit:
+                break
+            if not isinstance(request, SearchByCategoryRequest):
+                requests.append(request)
+        return requests
+
+    def top_queries(self, limit: int = 20) -> list[dict]:
+        """Estimated request counts of the heaviest normalized cache keys"""
+        return [
+            {
+                "keywords": keywords,
+                "pages": pages,
+                "size": size,
+                "latitude": latitude,
+                "longitude": longitude,
+                "distance": distance,
+                "category": isinstance(request, SearchByCategoryRequest),
+                "count": count,
+            }
+            for (
+                (keywords, pages, size, latitude, longitude, distance),
+                request,
+                count,
+            ) in self.queries.top(limit)
+        ]
+
+    def cache_stats(self) -> dict:
+        """Report cache occupancy and the memory shared by deduplication"""
+        now = datetime.utcnow()
+        live = [entry for entry in self._cache.values() if entry.expires_at > now]
+        return {
+            "entries": len(self._cache),
+            "live_entries": len(live),
+            "cache_seconds": self._cache_seconds,
+            "max_entries": self._cache_max_entries,
+            "evictions": self.cache_evictions,
+            "tracked_requests": self.queries.total,
+            "products": self.products.stats(),
+            "changes": self.changes.stats(),
+            "index": self.index.stats(),
+            "depots": self.depots.stats(),
+            "suggestions": self.suggestions.stats(),
+            "categories": len(self._category_tree or ()),
+            "vocabulary": {
+                **self.vocabulary.stats(),
+                **self.vocabulary.measure([entry.response for entry in live]),
+            },
+        }
 
     # Internal helpers -------------------------------------------------
 
@@ -265,22 +518,204 @@ class MarketfiyatService:
             request.distance,
         )
 
+    def _record_request(self, cache_key: CacheKey, request: SearchRequest) -> None:
+        self.queries.add(normalize_key(cache_key), request)
+
+    def _record_fresh_result(
+        self, response: SearchResponse, request: SearchRequest
+    ) -> None:
+        """Feed a freshly fetched upstream result to the local stores"""
+        self.changes.observe(response)
+        # Category searches match differently, so they do not count as coverage
+        keyword_search = not isinstance(request, SearchByCategoryRequest)
+        self.index.add(
+            response,
+            request if keyword_search else None,
+            ttl=self._index_freshness,
+        )
+        self.suggestions.add_search_response(response)
+        if keyword_search and response.content:
+            self.suggestions.add(request.keywords, QUERY)
+        if self.history is not None:
+            self.history.record(response)
+
+    async def _upstream(
+        self, endpoint: str, request: Awaitable[httpx.Response]
+    ) -> httpx.Response:
+        """Await an upstream request, recording its latency and status code"""
+        metrics = self.metrics
+        metrics.upstream_in_flight.inc(endpoint)
+        status = "error"
+        started = time.perf_counter()
+        try:
+            with self.tracer.span(f"upstream {endpoint}", endpoint=endpoint) as span:
+                response = await request
+                status = str(response.status_code)
+                if span is not None:
+                    span.attributes["status"] = response.status_code
+            return response
+        finally:
+            metrics.upstream_duration.observe(time.perf_counter() - started, endpoint)
+            metrics.upstream_in_flight.dec(endpoint)
+            metrics.upstream_responses.inc(endpoint, status)
+
+    @contextmanager
+    def _phase(self, phase: str) -> Iterator[None]:
+        """Time a search phase for Server-Timing and trace it as a span"""
+        with self.tracer.span(phase), timed(phase):
+            yield
+
+    def _collect_metrics(self) -> list[Family]:
+        families: list[Family] = [
+            (
+                "marketfiyat_cache_hits_total",
+                "counter",
+                "Search cache hits",
+                [({}, self.cache_hits)],
+            ),
+            (
+                "marketfiyat_cache_misses_total",
+                "counter",
+                "Search cache misses",
+                [({}, self.cache_misses)],
+            ),
+            (
+                "marketfiyat_cache_evictions_total",
+                "counter",
+                "Search cache entries evicted to stay within the size limit",
+                [({}, self.cache_evictions)],
+            ),
+            (
+                "marketfiyat_cache_entries",
+                "gauge",
+                "Search cache entries",
+                [({}, len(self._cache))],
+            ),
+        ]
+        # httpcore keeps its connections on the transport's pool. These are
+        # private attributes, so the pool figures are left out when a newer
+        # httpx or httpcore no longer has them
+        transport = getattr(self._client, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        connections: object = getattr(pool, "connections", None)
+        if isinstance(connections, list):
+            idle = sum(
+                1
+                for connection in connections
+                if getattr(connection, "is_idle", lambda: False)()
+            )
+            families.append(
+                (
+                    "marketfiyat_upstream_pool_connections",
+                    "gauge",
+                    "Upstream HTTP connections by state",
+                    [
+                        ({"state": "active"}, len(connections) - idle),
+                        ({"state": "idle"}, idle),
+                    ],
+                )
+            )
+            limit = getattr(pool, "_max_connections", None)
+            if isinstance(limit, int):
+                families.append(
+                    (
+                        "marketfiyat_upstream_pool_max_connections",
+                        "gauge",
+                        "Upstream HTTP connection limit",
+                        [({}, limit)],
+                    )
+                )
+        return families
+
+    async def _fetch_categories(self) -> CategoriesResponse:
+        if self._client is None:
+            await self.initialize()
+
+        try:
+            response = await self._upstream(
+                "/api/v1/info/categories",
+                self._client.get("/api/v1/info/categories"),
+            )
+            response.raise_for_status()
+            data = response.json()
+            return CategoriesResponse(**data)
+
+        except httpx.HTTPStatusError as exc:
+            raise MarketfiyatServiceError(
+                f"Categories API request failed with status {exc.response.status_code}",
+                status_code=exc.response.status_code,
+            ) from exc
+        except httpx.RequestError as exc:
+            raise MarketfiyatServiceError(
+                f"Failed to connect to Marketfiyat API: {str(exc)}"
+            ) from exc
+        except Exception as exc:
+            raise MarketfiyatServiceError(f"Unexpected error: {str(exc)}") from exc
+
     async def _read_cache(self, cache_key: CacheKey) -> SearchResponse | None:
         if self._cache_seconds <= 0:
+            self.cache_misses += 1
+            record_cache("miss")
             return None
 
-        async with self._cache_lock:
-            entry = self._cache.get(cache_key)
-            if entry and entry.expires_at > datetime.utcnow():
-                return entry.response
+        with self.tracer.span("cache.read") as span:
+            started = time.perf_counter()
+            async with self._cache_lock:
+                self._record_lock_wait(span, time.perf_counter() - started)
+                entry = self._cache.get(cache_key)
+                if entry and entry.expires_at > datetime.utcnow():
+                    state = "hit"
+                else:
+                    state = "miss" if entry is None else "stale"
+            if span is not None:
+                span.attributes["state"] = state
+        record_cache(state)
+        if state == "hit":
+            self.cache_hits += 1
+            return entry.response
+        self.cache_misses += 1
         return None
 
     async def _write_cache(self, cache_key: CacheKey, response: SearchResponse) -> None:
         if self._cache_seconds <= 0:
             return
 
-        async with self._cache_lock:
-            self._cache[cache_key] = CacheEntry(
-                response=response,
-                expires_at=datetime.utcnow() + timedelta(seconds=self._cache_seconds),
-            )
+        with self.tracer.span("cache.write") as span:
+            started = time.perf_counter()
+            async with self._cache_lock:
+                self._record_lock_wait(span, time.perf_counter() - started)
+                self._cache[cache_key] = CacheEntry(
+                    response=response,
+                    expires_at=datetime.utcnow()
+                    + timedelta(seconds=self._cache_seconds),
+                )
+                if len(self._cache) > self._cache_max_entries:
+                    self._evict(keep=cache_key)
+
+    @staticmethod
+    def _record_lock_wait(span: Span | None, seconds: float) -> None:
+        record_phase("lock", seconds)
+        if span is not None:
+            span.attributes["lockWaitMs"] = round(seconds * 1000, 3)
+
+    def _evict(self, keep: CacheKey) -> None:
+        """Drop expired entries, then the least requested ones"""
+        now = datetime.utcnow()
+        for key in [
+            key for key, entry in self._cache.items() if entry.expires_at <= now
+        ]:
+            del self._cache[key]
+            self.cache_evictions += 1
+
+        excess = len(self._cache) - self._cache_max_entries
+        if excess <= 0:
+            return
+        # Free a tenth of the capacity at once so eviction runs rarely
+        victims = heapq.nsmallest(
+            max(excess, self._cache_max_entries // 10),
+            (key for key in self._cache if key != keep),
+            key=lambda key: self.queries.estimate(normalize_key(key)),
+        )
+        for key in victims:
+            del self._cache[key]
+        self.cache_evictions += len(victims)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+
+from ..models import SearchRequest
+from .marketfiyat_service import MarketfiyatService, MarketfiyatServiceError
+
+logger = logging.getLogger(__name__)
+
+
+def parse_targets(value: str) -> list[SearchRequest]:
+    """
+    Parse configured warm targets.
+
+    Targets are separated by ``;`` and written as
+    ``keywords@latitude,longitude[,distance]``, for example
+    ``ekmek@39.9366,32.5859;süt@39.9366,32.5859,2``.
+    """
+    targets = []
+    for entry in value.split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        keywords, _, location = entry.rpartition("@")
+        parts = location.split(",")
+        if not keywords.strip() or len(parts) not in (2, 3):
+            raise ValueError(f"Invalid pre-warm target: {entry!r}")
+        targets.append(
+            SearchRequest(
+                keywords=keywords.strip(),
+                latitude=float(parts[0]),
+                longitude=float(parts[1]),
+                distance=int(parts[2]) if len(parts) == 3 else 1,
+            )
+        )
+    return targets
+
+
+class TokenBucket:
+    """Allows ``rate`` operations per second with bursts of up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = max(rate, 0.0)
+        self._capacity = max(capacity, 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class CachePrewarmer:
+    """
+    Background task that renews cached searches shortly before they expire.
+
+    Targets are the configured (keyword, location) pairs plus the most
+    frequent recent searches. A target is refreshed when its cache entry is
+    missing or expires within ``lead_seconds``. Refreshes are spent from a
+    token bucket and only start while no upstream search is in flight, so
+    warming never competes with live traffic.
+    """
+
+    def __init__(
+        self,
+        service: MarketfiyatService,
+        targets: list[SearchRequest] | None = None,
+        learned: int = 20,
+        interval: float = 30.0,
+        lead_seconds: float = 60.0,
+        rate: float = 0.5,
+        burst: int = 5,
+    ) -> None:
+        self._service = service
+        self._targets = list(targets or ())
+        self._learned = max(learned, 0)
+        self._interval = max(interval, 0.1)
+        self._lead_seconds = max(lead_seconds, 0.0)
+        self._budget = TokenBucket(rate, burst)
+        self._task: asyncio.Task | None = None
+        self.refreshed = 0
+        self.failed = 0
+        self.deferred = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._targets or self._learned)
+
+    def start(self) -> None:
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def due(self) -> list[SearchRequest]:
+        """Targets whose cache entry is missing or about to expire"""
+        seen = set()
+        due = []
+        for request in [
+            *self._targets,
+            *self._service.popular_requests(self._learned),
+        ]:
+            # Same fields as the service's cache key
+            key = (
+                request.keywords.lower(),
+                request.pages,
+                request.size,
+                request.latitude,
+                request.longitude,
+                request.distance,
+            )
+            if key in seen:
+                continue
+            seen.add(key)
+            remaining = self._service.cache_ttl(request)
+            if remaining is None or remaining <= self._lead_seconds:
+                due.append(request)
+        return due
+
+    async def warm(self) -> int:
+        """Refresh due targets within the rate budget; returns how many ran"""
+        refreshed = 0
+        for request in self.due():
+            if self._service.in_flight > 0 or not self._budget.try_acquire():
+                self.deferred += 1
+                break
+            try:
+                await self._service.search(request, refresh=True)
+            except MarketfiyatServiceError:
+                self.failed += 1
+                continue
+            refreshed += 1
+        self.refreshed += refreshed
+        return refreshed
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "targets": len(self._targets),
+            "learned": self._learned,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "deferred": self.deferred,
+        }
+
+    # Internal helpers -------------------------------------------------
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.warm()
+            except Exception:
+                # Keep warming on the next round rather than dying silently
+                self.failed += 1
+                logger.exception("Cache pre-warming round failed")
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from ..models import PriceHistoryPoint, PriceHistoryResponse, SearchResponse
+
+INDEX_TIME_FORMAT = "%d.%m.%Y %H:%M"
+# Upstream index times are Turkish local time (UTC+3, no daylight saving)
+INDEX_TIME_ZONE = timezone(timedelta(hours=3))
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS price_observations (
+        product_id TEXT NOT NULL,
+        depot_id TEXT NOT NULL,
+        market TEXT NOT NULL,
+        price REAL NOT NULL,
+        percentage REAL NOT NULL,
+        index_time TEXT NOT NULL,
+        indexed_at REAL NOT NULL,
+        observed_at REAL NOT NULL,
+        PRIMARY KEY (product_id, depot_id, index_time)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_price_observations_product_market_time
+    ON price_observations (product_id, market, indexed_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_price_observations_product_time
+    ON price_observations (product_id, indexed_at)
+    """,
+)
+
+_INSERT = (
+    "INSERT OR IGNORE INTO price_observations "
+    "(product_id, depot_id, market, price, percentage, index_time, indexed_at, "
+    "observed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+Row = tuple[str, str, str, float, float, str, float, float]
+
+
+def parse_index_time(value: str, default: float) -> float:
+    """Convert an upstream ``indexTime`` (e.g. '21.10.2025 11:12') to a timestamp"""
+    timestamp = _index_timestamp(value)
+    return default if timestamp is None else timestamp
+
+
+# Index times repeat across the offers of a result and across results, so
+# the slow strptime runs once per distinct value
+@lru_cache(maxsize=4096)
+def _index_timestamp(value: str) -> float | None:
+    try:
+        parsed = datetime.strptime(value, INDEX_TIME_FORMAT)
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=INDEX_TIME_ZONE).timestamp()
+
+
+def observation_rows(response: SearchResponse, observed_at: float) -> list[Row]:
+    rows = []
+    for product in response.content:
+        for offer in product.productDepotInfoList:
+            rows.append(
+                (
+                    product.id,
+                    offer.depotId,
+                    offer.marketAdi,
+                    offer.price,
+                    offer.percentage,
+                    offer.indexTime,
+                    parse_index_time(offer.indexTime, observed_at),
+                    observed_at,
+                )
+            )
+    return rows
+
+
+class PriceHistoryStore:
+    """
+    Append-only SQLite store of every depot offer seen in search results.
+
+    ``record`` only enqueues the response; a background task converts queued
+    responses to rows and writes them in batches, so requests never wait on
+    disk I/O. Observations are keyed by product, depot and ``indexTime``, so
+    the same upstream snapshot is stored once however often it is seen.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 1000,
+        queue_size: int = 1000,
+    ) -> None:
+        self._path = path
+        self._batch_size = max(batch_size, 1)
+        self._queue: asyncio.Queue[tuple[SearchResponse, float]] = asyncio.Queue(
+            maxsize=queue_size
+        )
+        self._connection: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._writer: asyncio.Task | None = None
+        self.dropped = 0
+        self.written = 0
+
+    async def start(self) -> None:
+        if self._connection is None:
+            self._connection = await asyncio.to_thread(self._connect)
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+            self._writer = None
+        await self.flush()
+        if self._connection is not None:
+            await asyncio.to_thread(self._disconnect)
+
+    def record(self, response: SearchResponse) -> None:
+        """Queue a search response for writing without blocking the caller"""
+        try:
+            self._queue.put_nowait((response, time.time()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def flush(self) -> None:
+        """Write everything that is currently queued"""
+        while not self._queue.empty():
+            await self._write_batch(self._drain())
+
+    async def price_trend(
+        self, product_id: str, market: str | None = None, days: int = 30
+    ) -> PriceHistoryResponse:
+        """Daily price summary of a product per market over the last ``days`` days"""
+        since = time.time() - days * 86400
+        rows = await asyncio.to_thread(self._query_trend, product_id, market, since)
+        return PriceHistoryResponse(
+            productId=product_id,
+            market=market,
+            days=days,
+            points=[
+                PriceHistoryPoint(
+                    date=date,
+                    market=row_market,
+                    minPrice=min_price,
+                    maxPrice=max_price,
+                    avgPrice=round(avg_price, 2),
+                    observations=count,
+                )
+                for date, row_market, min_price, max_price, avg_price, count in rows
+            ],
+        )
+
+    # Internal helpers -------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        connection.commit()
+        return connection
+
+    def _disconnect(self) -> None:
+        with self._db_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _drain(self) -> list[tuple[SearchResponse, float]]:
+        items: list[tuple[SearchResponse, float]] = []
+        while len(items) < self._batch_size and not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        return items
+
+    async def _write_loop(self) -> None:
+        while True:
+            first = await self._queue.get()
+            await self._write_batch([first, *self._drain()])
+
+    async def _write_batch(self, items: list[tuple[SearchResponse, float]]) -> None:
+        if items:
+            await asyncio.to_thread(self._insert, items)
+
+    def _insert(self, items: list[tuple[SearchResponse, float]]) -> None:
+        rows = [
+            row
+            for response, observed_at in items
+            for row in observation_rows(response, observed_at)
+        ]
+        with self._db_lock:
+            if self._connection is None:
+                self.dropped += len(items)
+                return
+            with self._connection:
+                self._connection.executemany(_INSERT, rows)
+        self.written += len(rows)
+
+    def _query_trend(
+        self, product_id: str, market: str | None, since: float
+    ) -> list[tuple[str, str, float, float, float, int]]:
+        query = (
+            "SELECT date(indexed_at, 'unixepoch', '+3 hours'), market, MIN(price), "
+            "MAX(price), AVG(price), COUNT(*) FROM price_observations "
+            "WHERE product_id = ? AND indexed_at >= ?"
+        )
+        params: list[object] = [product_id, since]
+        if market is not None:
+            query += " AND market = ?"
+            params.append(market)
+        query += " GROUP BY 1, 2 ORDER BY 1, 2"
+        with self._db_lock:
+            if self._connection is None:
+                return []
+            return self._connection.execute(query, params).fetchall()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from ..models import Product, ProductDepotInfo, SearchResponse
+from .facets import aggregate_facets
+
+
+@dataclass(frozen=True)
+class ProductInfo:
+    """Static attributes of a product, shared by every copy of it"""
+
+    id: str
+    title: str
+    brand: str
+    imageUrl: str
+    refinedQuantityUnit: str | None
+    refinedVolumeOrWeight: str | None
+    categories: list[str]
+
+
+class ProductRegistry:
+    """
+    Bounded, per-process index of products keyed by ``Product.id``.
+
+    Decoded products are rebound to the registered static attributes so the
+    same title, brand, image URL and category list objects are shared by every
+    page and cache entry that contains the product. The least recently seen
+    products are evicted once ``max_size`` is reached.
+    """
+
+    def __init__(self, max_size: int = 50_000) -> None:
+        self._max_size = max(max_size, 0)
+        self._products: OrderedDict[str, ProductInfo] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._products
+
+    def get(self, product_id: str) -> ProductInfo | None:
+        return self._products.get(product_id)
+
+    def register(self, product: Product) -> ProductInfo:
+        """Register a product and return its canonical static attributes"""
+        info = self._products.get(product.id)
+        if info is not None and self._matches(info, product):
+            self._products.move_to_end(product.id)
+            self.hits += 1
+            return info
+
+        self.misses += 1
+        info = ProductInfo(
+            id=product.id,
+            title=product.title,
+            brand=product.brand,
+            imageUrl=product.imageUrl,
+            refinedQuantityUnit=product.refinedQuantityUnit,
+            refinedVolumeOrWeight=product.refinedVolumeOrWeight,
+            categories=product.categories,
+        )
+        if self._max_size == 0:
+            return info
+
+        self._products[product.id] = info
+        self._products.move_to_end(product.id)
+        while len(self._products) > self._max_size:
+            self._products.popitem(last=False)
+            self.evictions += 1
+        return info
+
+    def canonicalize(self, product: Product) -> Product:
+        """Rebind a product's static attributes to the registered instances"""
+        info = self.register(product)
+        product.id = info.id
+        product.title = info.title
+        product.brand = info.brand
+        product.imageUrl = info.imageUrl
+        product.refinedQuantityUnit = info.refinedQuantityUnit
+        product.refinedVolumeOrWeight = info.refinedVolumeOrWeight
+        product.categories = info.categories
+        return product
+
+    def canonicalize_response(self, response: SearchResponse) -> SearchResponse:
+        for product in response.content:
+            self.canonicalize(product)
+        return response
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._products),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def _matches(info: ProductInfo, product: Product) -> bool:
+        return (
+            info.title == product.title
+            and info.brand == product.brand
+            and info.imageUrl == product.imageUrl
+            and info.refinedQuantityUnit == product.refinedQuantityUnit
+            and info.refinedVolumeOrWeight == product.refinedVolumeOrWeight
+            and info.categories == product.categories
+        )
+
+
+def merge_search_responses(
+    responses: Iterable[SearchResponse], registry: ProductRegistry | None = None
+) -> SearchResponse:
+    """
+    Merge several search pages into one response.
+
+    Products are deduplicated by ``Product.id`` in first-seen order and their
+    depot offers are merged by ``depotId``. When a registry is given, merged
+    products reference its canonical static attributes. Facets are recounted
+    over the merged products, since each page's facets describe only itself.
+    """
+    responses = list(responses)
+    if not responses:
+        raise ValueError("At least one response is required")
+
+    products: dict[str, Product] = {}
+    offers: dict[str, dict[str, ProductDepotInfo]] = {}
+    for response in responses:
+        for product in response.content:
+            seen = offers.get(product.id)
+            if seen is None:
+                products[product.id] = product
+                offers[product.id] = {
+                    offer.depotId: offer for offer in product.productDepotInfoList
+                }
+                continue
+            for offer in product.productDepotInfoList:
+                seen.setdefault(offer.depotId, offer)
+
+    content = []
+    for product_id, product in products.items():
+        merged = product.model_copy(
+            update={"productDepotInfoList": list(offers[product_id].values())}
+        )
+        if registry is not None:
+            registry.canonicalize(merged)
+        content.append(merged)
+
+    first = responses[0]
+    return SearchResponse.model_construct(
+        numberOfFound=max(response.numberOfFound for response in responses),
+        searchResultType=first.searchResultType,
+        content=content,
+        facetMap=aggregate_facets(content),
+    )
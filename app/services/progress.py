@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Called with the position and result of each awaitable as soon as it finishes
+ProgressCallback = Callable[[int, T], Awaitable[None]]
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    # Mark late failures of abandoned tasks as seen
+    if not task.cancelled():
+        task.exception()
+
+
+async def gather_with_progress(  # noqa: UP047 - type parameters require Python 3.12
+    awaitables: Iterable[Awaitable[T]],
+    on_result: ProgressCallback[T] | None = None,
+) -> list[T]:
+    """
+    Run awaitables concurrently and return their results in order.
+
+    Unlike ``asyncio.gather``, ``on_result`` is awaited as soon as each one
+    finishes, and the first failure or a cancellation of the caller cancels
+    every awaitable still running, so no upstream request outlives the
+    operation that started it.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    positions = {task: position for position, task in enumerate(tasks)}
+    results: list[T] = [None] * len(tasks)  # type: ignore[list-item]
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in sorted(done, key=positions.__getitem__):
+                position = positions[task]
+                results[position] = task.result()
+                if on_result is not None:
+                    await on_result(position, results[position])
+        return results
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            task.add_done_callback(_retrieve)
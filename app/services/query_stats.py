@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import heapq
+import random
+from collections.abc import Hashable
+from typing import Generic, TypeVar, cast
+
+import numpy as np
+
+from .text import fold_text
+
+# Coordinates are rounded to about 100 m so nearby users count as one location
+_COORDINATE_DECIMALS = 3
+
+QueryKey = tuple[str, int, int, float, float, int]
+
+K = TypeVar("K", bound=Hashable)
+S = TypeVar("S")
+
+# Mersenne prime modulus of the per-row hash functions
+_HASH_PRIME = (1 << 61) - 1
+
+
+def normalize_key(cache_key: QueryKey) -> QueryKey:
+    """Fold keywords and round coordinates so equivalent searches count together"""
+    keywords, pages, size, latitude, longitude, distance = cache_key
+    return (
+        " ".join(fold_text(keywords).split()),
+        pages,
+        size,
+        round(latitude, _COORDINATE_DECIMALS),
+        round(longitude, _COORDINATE_DECIMALS),
+        distance,
+    )
+
+
+class CountMinSketch:
+    """
+    Fixed-size frequency sketch.
+
+    Estimates never undercount; with ``width`` counters per row they overcount
+    by at most ``e / width`` of the total with probability
+    ``1 - exp(-depth)``.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4) -> None:
+        self._width = max(width, 1)
+        self._depth = max(depth, 1)
+        self._table = np.zeros((self._depth, self._width), dtype=np.int64)
+        self._rows = np.arange(self._depth)
+        # Independent hash per row: keys colliding in one row rarely collide
+        # in the others, which hashing (row, key) tuples does not guarantee
+        seeds = random.Random()
+        self._hashes = [
+            (seeds.randrange(1, _HASH_PRIME), seeds.randrange(_HASH_PRIME))
+            for _ in range(self._depth)
+        ]
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """Count ``key`` and return its new estimate"""
+        columns = self._columns(key)
+        self._table[self._rows, columns] += count
+        return int(self._table[self._rows, columns].min())
+
+    def estimate(self, key: Hashable) -> int:
+        return int(self._table[self._rows, self._columns(key)].min())
+
+    def halve(self) -> None:
+        self._table >>= 1
+
+    def _columns(self, key: Hashable) -> list[int]:
+        value = hash(key)
+        return [(a * value + b) % _HASH_PRIME % self._width for a, b in self._hashes]
+
+
+class HeavyHitters(Generic[K, S]):  # noqa: UP046 - type parameters require Python 3.12
+    """
+    Bounded-memory tracker of the most frequent keys.
+
+    Frequencies live in a Count-Min sketch; only the current ``k`` heaviest
+    keys are kept exactly, in a min-heap keyed by their estimate, together
+    with the last sample (by default the key itself) seen for each. Every
+    ``window`` observations all counts are halved so the ranking follows
+    recent traffic.
+    """
+
+    def __init__(
+        self,
+        k: int = 100,
+        width: int = 4096,
+        depth: int = 4,
+        window: int = 100_000,
+    ) -> None:
+        self._k = max(k, 1)
+        self._window = max(window, 1)
+        self._sketch = CountMinSketch(width, depth)
+        self._counts: dict[K, int] = {}
+        self._samples: dict[K, S] = {}
+        # Entries go stale when a count changes; stale ones are skipped on pop
+        self._heap: list[tuple[int, K]] = []
+        self._observed = 0
+        self.total = 0
+
+    def add(self, key: K, sample: S | None = None) -> int:
+        """Count an observation of ``key`` and return its estimated frequency"""
+        self._observed += 1
+        self.total += 1
+        if self._observed >= self._window:
+            self._decay()
+
+        estimate = self._sketch.add(key)
+        if key not in self._counts and len(self._counts) >= self._k:
+            if estimate <= self._floor():
+                return estimate
+            self._pop_min()
+        self._counts[key] = estimate
+        self._samples[key] = cast(S, key) if sample is None else sample
+        self._push(estimate, key)
+        return estimate
+
+    def estimate(self, key: K) -> int:
+        return self._sketch.estimate(key)
+
+    def top(self, limit: int | None = None) -> list[tuple[K, S, int]]:
+        """Return (key, last sample, estimate) triples, most frequent first"""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return [(key, self._samples[key], count) for key, count in ranked[:limit]]
+
+    # Internal helpers -------------------------------------------------
+
+    def _push(self, count: int, key: K) -> None:
+        heapq.heappush(self._heap, (count, key))
+        if len(self._heap) > 4 * self._k:
+            self._heap = [(value, item) for item, value in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def _floor(self) -> int:
+        while self._heap:
+            count, key = self._heap[0]
+            if self._counts.get(key) == count:
+                return count
+            heapq.heappop(self._heap)
+        return 0
+
+    def _pop_min(self) -> None:
+        self._floor()
+        _, key = heapq.heappop(self._heap)
+        del self._counts[key]
+        del self._samples[key]
+
+    def _decay(self) -> None:
+        self._observed = 0
+        self._sketch.halve()
+        self._counts = {key: count >> 1 for key, count in self._counts.items()}
+        self._heap = [(count, key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
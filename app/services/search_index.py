@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import combinations
+
+import numpy as np
+
+from ..models import Product, SearchRequest, SearchResponse
+from .facets import aggregate_facets
+from .geo import CoverageMap, haversine_meters
+from .text import tokenize
+
+# searchResultType reported for responses answered from the local index
+LOCAL_SEARCH_RESULT_TYPE = 0
+
+# Queries with more tokens than this are only matched against identical queries
+_MAX_SUBSET_TOKENS = 6
+
+QueryKey = frozenset[str]
+
+
+def query_key(keywords: str) -> QueryKey:
+    return frozenset(tokenize(keywords))
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedPage:
+    """First page of an upstream keyword search, in upstream order"""
+
+    distance: int
+    size: int
+    product_ids: tuple[str, ...]
+    found: int
+
+
+class ProductIndex:
+    """
+    In-process inverted index over products seen in search results.
+
+    Products are indexed by the Turkish-folded tokens of their title, brand
+    and categories, and their depot offers are merged across searches. Every
+    upstream keyword search also records the circle it covered, so a later
+    query can be answered locally when the same (normalized) query was
+    searched recently around an enclosing area, or when a broader query that
+    returned its complete result set was. Each offer remembers when it was
+    last seen upstream, and offers older than ``freshness`` seconds are left
+    out of local answers and dropped on the next merge.
+    """
+
+    def __init__(
+        self,
+        max_products: int = 50_000,
+        max_queries: int = 10_000,
+        freshness: float = 900.0,
+    ) -> None:
+        self._max_products = max(max_products, 1)
+        self._max_queries = max(max_queries, 1)
+        self._freshness = max(freshness, 0.0)
+        self._products: OrderedDict[str, Product] = OrderedDict()
+        # Product id -> depot id -> monotonic time the offer was last seen
+        self._seen: dict[str, dict[str, float]] = {}
+        self._product_tokens: dict[str, frozenset[str]] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._coverage: OrderedDict[QueryKey, CoverageMap] = OrderedDict()
+        self._complete: OrderedDict[QueryKey, CoverageMap] = OrderedDict()
+        self.local_hits = 0
+        self.local_misses = 0
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def add(
+        self,
+        response: SearchResponse,
+        request: SearchRequest | None = None,
+        ttl: float = 0.0,
+    ) -> None:
+        """Index a search result; ``request`` records the area it covers"""
+        now = time.monotonic()
+        for product in response.content:
+            self._add_product(product, now)
+
+        if request is None or ttl <= 0:
+            return
+        key = query_key(request.keywords)
+        if not key:
+            return
+        # Later pages of a partial result were never fetched, so only first
+        # pages are recorded
+        if request.pages != 0:
+            return
+        radius = request.distance * 1000.0
+        page = IndexedPage(
+            distance=request.distance,
+            size=request.size,
+            product_ids=tuple(product.id for product in response.content),
+            found=response.numberOfFound,
+        )
+        self._coverage_for(self._coverage, key).record(
+            request.latitude, request.longitude, radius, ttl, page
+        )
+        if len(response.content) >= response.numberOfFound:
+            self._coverage_for(self._complete, key).record(
+                request.latitude, request.longitude, radius, ttl
+            )
+
+    def is_covered(self, request: SearchRequest) -> bool:
+        return self._covered_page(request) is not None or self._covered_completely(
+            request
+        )
+
+    def lookup(self, keywords: str) -> set[str]:
+        """Return the ids of indexed products matching every keyword token"""
+        postings = [self._postings.get(token, set()) for token in tokenize(keywords)]
+        if not postings:
+            return set()
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches &= posting
+            if not matches:
+                break
+        return matches
+
+    def search(self, request: SearchRequest) -> SearchResponse | None:
+        """
+        Answer a keyword search locally, or return None when the area is not
+        covered by a fresh enough upstream search.
+
+        A recent first page of the same query at the same place and distance,
+        at least as large as the one requested, is replayed in upstream order
+        with its upstream ``numberOfFound``. Otherwise a complete result of
+        the same or a broader query is filtered locally: only offers within
+        the requested distance are kept, products are ordered by their
+        cheapest remaining offer and facets are counted over the whole
+        filtered result set.
+        """
+        cutoff = time.monotonic() - self._freshness
+        page = self._covered_page(request)
+        if page is not None:
+            self.local_hits += 1
+            products = [
+                product
+                for product_id in page.product_ids[: request.size]
+                if product_id in self._products
+                and (product := self._fresh_offers(product_id, cutoff)) is not None
+            ]
+            content = self._within_distance(products, request)
+            return SearchResponse.model_construct(
+                numberOfFound=page.found,
+                searchResultType=LOCAL_SEARCH_RESULT_TYPE,
+                content=content,
+                facetMap=aggregate_facets(content),
+            )
+
+        if not self._covered_completely(request):
+            self.local_misses += 1
+            return None
+        self.local_hits += 1
+
+        products = [
+            product
+            for product_id in self.lookup(request.keywords)
+            if (product := self._fresh_offers(product_id, cutoff)) is not None
+        ]
+        content = self._within_distance(products, request)
+        content.sort(
+            key=lambda product: min(
+                offer.price for offer in product.productDepotInfoList
+            )
+        )
+        start = request.pages * request.size
+        return SearchResponse.model_construct(
+            numberOfFound=len(content),
+            searchResultType=LOCAL_SEARCH_RESULT_TYPE,
+            content=content[start : start + request.size],
+            facetMap=aggregate_facets(content),
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "products": len(self._products),
+            "tokens": len(self._postings),
+            "covered_queries": len(self._coverage),
+            "local_hits": self.local_hits,
+            "local_misses": self.local_misses,
+        }
+
+    # Internal helpers -------------------------------------------------
+
+    def _covered_page(self, request: SearchRequest) -> IndexedPage | None:
+        """A recorded first page that can stand in for the requested one"""
+        key = query_key(request.keywords)
+        areas = self._coverage.get(key) if key and request.pages == 0 else None
+        if areas is None:
+            return None
+        circle = (request.latitude, request.longitude, request.distance * 1000.0)
+        for area in areas.covering(*circle):
+            page = area.detail
+            # A wider search ranks and counts different products, and a
+            # smaller page lacks the rows a larger one would add
+            if page.distance == request.distance and page.size >= request.size:
+                return page
+        return None
+
+    def _covered_completely(self, request: SearchRequest) -> bool:
+        """Whether a complete result of this or a broader query covers the area"""
+        key = query_key(request.keywords)
+        if not key or len(key) > _MAX_SUBSET_TOKENS:
+            return False
+        circle = (request.latitude, request.longitude, request.distance * 1000.0)
+        # A complete result for a broader query contains every narrower match
+        for size in range(1, len(key) + 1):
+            for subset in combinations(sorted(key), size):
+                complete = self._complete.get(frozenset(subset))
+                if complete is not None and complete.covers(*circle):
+                    return True
+        return False
+
+    def _add_product(self, product: Product, now: float) -> None:
+        seen = self._seen.setdefault(product.id, {})
+        for offer in product.productDepotInfoList:
+            seen[offer.depotId] = now
+        existing = self._products.get(product.id)
+        if existing is not None:
+            cutoff = now - self._freshness
+            offers = {
+                offer.depotId: offer
+                for offer in existing.productDepotInfoList
+                if seen[offer.depotId] >= cutoff
+            }
+            offers.update(
+                (offer.depotId, offer) for offer in product.productDepotInfoList
+            )
+            product = product.model_copy(
+                update={"productDepotInfoList": list(offers.values())}
+            )
+            for depot_id in seen.keys() - offers.keys():
+                del seen[depot_id]
+            self._remove_postings(product.id)
+
+        tokens = frozenset(
+            tokenize(" ".join([product.title, product.brand, *product.categories]))
+        )
+        self._products[product.id] = product
+        self._products.move_to_end(product.id)
+        self._product_tokens[product.id] = tokens
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(product.id)
+
+        while len(self._products) > self._max_products:
+            evicted, _ = self._products.popitem(last=False)
+            self._remove_postings(evicted)
+            del self._product_tokens[evicted]
+            del self._seen[evicted]
+
+    def _fresh_offers(self, product_id: str, cutoff: float) -> Product | None:
+        """Return the product with only the offers seen since ``cutoff``"""
+        product = self._products[product_id]
+        seen = self._seen[product_id]
+        offers = [
+            offer
+            for offer in product.productDepotInfoList
+            if seen[offer.depotId] >= cutoff
+        ]
+        if len(offers) == len(product.productDepotInfoList):
+            return product
+        if not offers:
+            return None
+        return product.model_copy(update={"productDepotInfoList": offers})
+
+    def _remove_postings(self, product_id: str) -> None:
+        for token in self._product_tokens.get(product_id, ()):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(product_id)
+            if not posting:
+                del self._postings[token]
+
+    def _coverage_for(
+        self, coverage: OrderedDict[QueryKey, CoverageMap], key: QueryKey
+    ) -> CoverageMap:
+        areas = coverage.get(key)
+        if areas is None:
+            areas = coverage[key] = CoverageMap()
+            if len(coverage) > self._max_queries:
+                coverage.popitem(last=False)
+        coverage.move_to_end(key)
+        return areas
+
+    @staticmethod
+    def _within_distance(
+        products: list[Product], request: SearchRequest
+    ) -> list[Product]:
+        offers = [
+            offer for product in products for offer in product.productDepotInfoList
+        ]
+        if not offers:
+            return []
+        distances = haversine_meters(
+            request.latitude,
+            request.longitude,
+            np.fromiter((offer.latitude for offer in offers), float, len(offers)),
+            np.fromiter((offer.longitude for offer in offers), float, len(offers)),
+        )
+        in_range = distances <= request.distance * 1000.0
+
+        content = []
+        position = 0
+        for product in products:
+            count = len(product.productDepotInfoList)
+            mask = in_range[position : position + count]
+            position += count
+            if not mask.any():
+                continue
+            if mask.all():
+                content.append(product)
+                continue
+            content.append(
+                product.model_copy(
+                    update={
+                        "productDepotInfoList": [
+                            offer
+                            for offer, keep in zip(
+                                product.productDepotInfoList, mask, strict=True
+                            )
+                            if keep
+                        ]
+                    }
+                )
+            )
+        return content
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import logging
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import chain
+
+from ..models import CategoriesResponse, SearchResponse, Suggestion
+from .text import normalize
+
+# Suggestion sources, ranked for ties in popularity
+QUERY = "query"
+CATEGORY = "category"
+BRAND = "brand"
+PRODUCT = "product"
+_KIND_RANK = {QUERY: 0, CATEGORY: 1, BRAND: 2, PRODUCT: 3}
+
+# Terms are also reachable from this many later words ("süt" finds "Pınar Süt")
+_MAX_WORD_STARTS = 6
+
+# Entries per block of the sorted key array whose best terms are precomputed;
+# blocks of blocks are summarized the same way, so a prefix covering most of
+# the array still only merges a few hundred candidates
+_BLOCK_SIZE = 64
+_BLOCK_LEVELS = 2
+
+# Estimated bytes per term and per indexed key beyond the strings themselves
+# (objects, dict entries and array slots), used to bound the index in bytes
+_TERM_OVERHEAD = 200
+_KEY_OVERHEAD = 12
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Term:
+    text: str
+    kind: str
+    size: int
+
+
+class _Snapshot:
+    """
+    Immutable lookup structure built from a copy of the terms.
+
+    ``keys`` holds every indexed word start in sorted order, so the keys with
+    a given prefix form one contiguous range found with ``bisect``.
+    ``positions`` holds the rank of the key's term (0 is best) and ``ranked``
+    maps ranks back to term keys. ``levels`` holds, per block size, the best
+    ``top_k`` ranks of every block.
+    """
+
+    __slots__ = ("keys", "levels", "positions", "ranked")
+
+    def __init__(
+        self,
+        keys: list[str],
+        positions: array,
+        ranked: list[str],
+        levels: list[tuple[int, list[list[int]]]],
+    ) -> None:
+        self.keys = keys
+        self.positions = positions
+        self.ranked = ranked
+        self.levels = levels
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def prefix_range(self, prefix: str) -> tuple[int, int]:
+        return (
+            bisect_left(self.keys, prefix),
+            bisect_left(self.keys, prefix + "\U0010ffff"),
+        )
+
+    def candidates(self, start: int, stop: int, level: int) -> Iterator[int]:
+        """Ranks that may be among the best ``top_k`` of ``[start, stop)``"""
+        if level < 0:
+            yield from self.positions[start:stop]
+            return
+        size, tops = self.levels[level]
+        first, last = -(-start // size), stop // size
+        if first >= last:
+            yield from self.candidates(start, stop, level - 1)
+            return
+        yield from self.candidates(start, first * size, level - 1)
+        for top in tops[first:last]:
+            yield from top
+        yield from self.candidates(last * size, stop, level - 1)
+
+
+def _word_starts(key: str) -> Iterator[str]:
+    yield key
+    position = key.find(" ")
+    count = 1
+    while position != -1 and count < _MAX_WORD_STARTS:
+        yield key[position + 1 :]
+        position = key.find(" ", position + 1)
+        count += 1
+
+
+def _indexed_keys(key: str, max_key_length: int) -> set[str]:
+    return {start[:max_key_length] for start in _word_starts(key)}
+
+
+def _build_snapshot(
+    terms: list[tuple[str, _Term]],
+    popularity: dict[str, int],
+    top_k: int,
+    max_key_length: int,
+) -> _Snapshot:
+    ranked = [
+        key
+        for _, _, _, key in sorted(
+            (-popularity.get(key, 0), _KIND_RANK[term.kind], len(key), key)
+            for key, term in terms
+        )
+    ]
+    entries = sorted(
+        (indexed, rank)
+        for rank, key in enumerate(ranked)
+        for indexed in _indexed_keys(key, max_key_length)
+    )
+    positions = array("I", (rank for _, rank in entries))
+
+    levels: list[tuple[int, list[list[int]]]] = []
+    blocks: list[Iterable[int]] = [
+        positions[i : i + _BLOCK_SIZE] for i in range(0, len(positions), _BLOCK_SIZE)
+    ]
+    for level in range(1, _BLOCK_LEVELS + 1):
+        tops = [heapq.nsmallest(top_k, set(block)) for block in blocks]
+        levels.append((_BLOCK_SIZE**level, tops))
+        blocks = [
+            chain.from_iterable(tops[i : i + _BLOCK_SIZE])
+            for i in range(0, len(tops), _BLOCK_SIZE)
+        ]
+    return _Snapshot([indexed for indexed, _ in entries], positions, ranked, levels)
+
+
+class SuggestionIndex:
+    """
+    Sorted prefix index of search terms for typeahead suggestions.
+
+    Terms come from category names, brands and titles seen in search results,
+    and from searched keywords that returned products. Keys are normalized
+    with Turkish folding and are indexed from each word start, so a prefix
+    matches anywhere a word begins.
+
+    Adding a term or counting a query only updates the term table. Lookups
+    are answered from a compact snapshot (see ``_Snapshot``) that ``refresh``
+    rebuilds in a worker thread every ``rebuild_interval`` seconds while
+    something changed, so new terms and popularity show up after the next
+    rebuild. The term table is bounded by ``max_terms`` and by an estimate of
+    its size in ``max_bytes``; the least recently seen terms are evicted.
+    """
+
+    def __init__(
+        self,
+        max_terms: int = 100_000,
+        top_k: int = 10,
+        max_key_length: int = 32,
+        max_bytes: int = 64 * 1024 * 1024,
+        rebuild_interval: float = 10.0,
+    ) -> None:
+        self._max_terms = max(max_terms, 1)
+        self._top_k = max(top_k, 1)
+        self._max_key_length = max(max_key_length, 1)
+        self._max_bytes = max(max_bytes, 1)
+        self._rebuild_interval = max(rebuild_interval, 0.1)
+        self._terms: OrderedDict[str, _Term] = OrderedDict()
+        self._popularity: OrderedDict[str, int] = OrderedDict()
+        self._snapshot = _build_snapshot([], {}, self._top_k, self._max_key_length)
+        self._dirty = False
+        self._task: asyncio.Task | None = None
+        self._bytes = 0
+        self.evictions = 0
+        self.rebuilds = 0
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def add(self, text: str, kind: str) -> None:
+        key = normalize(text)
+        if not key:
+            return
+        term = self._terms.get(key)
+        if term is not None:
+            self._terms.move_to_end(key)
+            if _KIND_RANK[kind] < _KIND_RANK[term.kind]:
+                term.kind = kind
+                self._dirty = True
+            return
+
+        text = " ".join(text.split())
+        size = self._term_size(key, text)
+        self._terms[key] = _Term(text=text, kind=kind, size=size)
+        self._bytes += size
+        self._dirty = True
+
+        while len(self._terms) > self._max_terms or (
+            self._bytes > self._max_bytes and len(self._terms) > 1
+        ):
+            _, evicted = self._terms.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def add_search_response(self, response: SearchResponse) -> None:
+        """Add the brands and titles of a search result"""
+        for product in response.content:
+            self.add(product.brand, BRAND)
+            self.add(product.title, PRODUCT)
+
+    def add_categories(self, categories: CategoriesResponse) -> None:
+        """Add main category and subcategory names"""
+        for category in categories.content:
+            self.add(category.name, CATEGORY)
+            for subcategory in category.subcategories:
+                self.add(subcategory, CATEGORY)
+
+    def record_query(self, keywords: str) -> None:
+        """Count a search for ``keywords`` towards its popularity"""
+        key = normalize(keywords)
+        if not key:
+            return
+        self._popularity[key] = self._popularity.get(key, 0) + 1
+        self._popularity.move_to_end(key)
+        while len(self._popularity) > self._max_terms:
+            self._popularity.popitem(last=False)
+        if key in self._terms:
+            self._dirty = True
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[Suggestion]:
+        """Return up to ``limit`` terms with a word starting with ``prefix``"""
+        key = normalize(prefix)
+        limit = min(limit, self._top_k)
+        if not key or limit <= 0:
+            return []
+
+        snapshot = self._snapshot
+        start, stop = snapshot.prefix_range(key[: self._max_key_length])
+        if start == stop:
+            return []
+        if len(key) > self._max_key_length:
+            # Keys are truncated, so check the full prefix on the few terms left
+            ranks = sorted(
+                rank
+                for rank in set(snapshot.positions[start:stop])
+                if any(
+                    word.startswith(key) for word in _word_starts(snapshot.ranked[rank])
+                )
+            )
+        else:
+            candidates = snapshot.candidates(start, stop, len(snapshot.levels) - 1)
+            ranks = heapq.nsmallest(limit, set(candidates))
+
+        suggestions = []
+        for rank in ranks:
+            term_key = snapshot.ranked[rank]
+            term = self._terms.get(term_key)
+            if term is None:
+                # Evicted since the snapshot was built
+                continue
+            suggestions.append(
+                Suggestion(
+                    text=term.text,
+                    type=term.kind,
+                    popularity=self._popularity.get(term_key, 0),
+                )
+            )
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    def rebuild(self) -> None:
+        """Rebuild the lookup snapshot in the calling thread"""
+        self._dirty = False
+        self._snapshot = _build_snapshot(*self._capture())
+        self.rebuilds += 1
+
+    async def refresh(self) -> bool:
+        """Rebuild the snapshot in a worker thread if anything changed"""
+        if not self._dirty:
+            return False
+        self._dirty = False
+        self._snapshot = await asyncio.to_thread(_build_snapshot, *self._capture())
+        self.rebuilds += 1
+        return True
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "terms": len(self._terms),
+            "queries": len(self._popularity),
+            "bytes": self._bytes,
+            "indexed_keys": len(self._snapshot),
+            "evictions": self.evictions,
+            "rebuilds": self.rebuilds,
+        }
+
+    # Internal helpers -------------------------------------------------
+
+    def _capture(self) -> tuple[list[tuple[str, _Term]], dict[str, int], int, int]:
+        # Plain copies taken on the event loop; the build only reads these
+        return (
+            list(self._terms.items()),
+            dict(self._popularity),
+            self._top_k,
+            self._max_key_length,
+        )
+
+    def _term_size(self, key: str, text: str) -> int:
+        size = _TERM_OVERHEAD + sys.getsizeof(key) + sys.getsizeof(text)
+        for indexed in _indexed_keys(key, self._max_key_length):
+            size += _KEY_OVERHEAD
+            if indexed is not key:
+                size += sys.getsizeof(indexed)
+        return size
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Rebuilding the suggestion index failed")
+            await asyncio.sleep(self._rebuild_interval)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+
+# str.lower() maps "I" to "i" and "İ" to "i" plus a combining dot; Turkish
+# expects "ı" and "i"
+_TURKISH_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+# Fold Turkish letters to their ASCII base so "sut" matches "süt"
+_TURKISH_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def turkish_lower(text: str) -> str:
+    """Lower-case text using Turkish casing rules"""
+    return text.translate(_TURKISH_LOWER).lower()
+
+
+def fold_text(text: str) -> str:
+    """Lower-case and strip diacritics so spelling variants compare equal"""
+    folded = turkish_lower(text).translate(_TURKISH_FOLD)
+    if folded.isascii():
+        return folded
+    decomposed = unicodedata.normalize("NFKD", folded)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into folded word tokens"""
+    return _TOKEN_PATTERN.findall(fold_text(text))
+
+
+def normalize(text: str) -> str:
+    """Fold text and collapse punctuation and whitespace into single spaces"""
+    return " ".join(tokenize(text))
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from pydantic import BaseModel, TypeAdapter
+
+from ..models import (
+    CheapestOfferProduct,
+    CheapestSearchResponse,
+    OfferSummary,
+    Product,
+    ProductDepotInfo,
+    ProductSummary,
+    SearchResponse,
+    SearchView,
+    SummarySearchResponse,
+)
+
+
+def cheapest_offer(product: Product) -> ProductDepotInfo | None:
+    """Return the lowest priced depot offer of a product, if any"""
+    offers = product.productDepotInfoList
+    if not offers:
+        return None
+    return min(offers, key=lambda offer: offer.price)
+
+
+def _summarize(response: SearchResponse) -> SummarySearchResponse:
+    content = []
+    for product in response.content:
+        offer = cheapest_offer(product)
+        content.append(
+            ProductSummary.model_construct(
+                id=product.id,
+                title=product.title,
+                brand=product.brand,
+                minPrice=offer.price if offer is not None else None,
+                offerCount=len(product.productDepotInfoList),
+            )
+        )
+    return SummarySearchResponse.model_construct(
+        numberOfFound=response.numberOfFound, content=content
+    )
+
+
+def _cheapest(response: SearchResponse) -> CheapestSearchResponse:
+    content = []
+    for product in response.content:
+        offer = cheapest_offer(product)
+        content.append(
+            CheapestOfferProduct.model_construct(
+                id=product.id,
+                title=product.title,
+                brand=product.brand,
+                refinedVolumeOrWeight=product.refinedVolumeOrWeight,
+                cheapest=(
+                    OfferSummary.model_construct(
+                        marketAdi=offer.marketAdi,
+                        depotName=offer.depotName,
+                        price=offer.price,
+                        unitPrice=offer.unitPrice,
+                    )
+                    if offer is not None
+                    else None
+                ),
+            )
+        )
+    return CheapestSearchResponse.model_construct(
+        numberOfFound=response.numberOfFound, content=content
+    )
+
+
+_PROJECTIONS: dict[SearchView, Callable[[SearchResponse], BaseModel]] = {
+    SearchView.FULL: lambda response: response,
+    SearchView.SUMMARY: _summarize,
+    SearchView.CHEAPEST: _cheapest,
+}
+
+# Serializers are compiled once per view so rendering a page only walks the data
+_SERIALIZERS: dict[SearchView, TypeAdapter] = {
+    SearchView.FULL: TypeAdapter(SearchResponse),
+    SearchView.SUMMARY: TypeAdapter(SummarySearchResponse),
+    SearchView.CHEAPEST: TypeAdapter(CheapestSearchResponse),
+}
+
+
+def project_search_response(response: SearchResponse, view: SearchView) -> BaseModel:
+    """Project a full search response onto the requested view"""
+    return _PROJECTIONS[view](response)
+
+
+def render_search_response(response: SearchResponse, view: SearchView) -> bytes:
+    """Project and serialize a search response to JSON bytes"""
+    return _SERIALIZERS[view].dump_json(_PROJECTIONS[view](response))
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Cache outcomes from best to worst; merged pages report the worst one.
+# "stale" means an expired entry was found and re-fetched.
+CACHE_STATES = ("local", "hit", "stale", "miss")
+
+
+class ServerTiming:
+    """
+    Phase durations of one request, rendered as a Server-Timing header.
+
+    Durations of a phase that runs more than once, such as the upstream
+    search of each merged page, are summed.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.cache: str | None = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def mark_cache(self, state: str) -> None:
+        if self.cache is None or CACHE_STATES.index(state) > CACHE_STATES.index(
+            self.cache
+        ):
+            self.cache = state
+
+    def durations(self) -> dict[str, float]:
+        """Phase durations and the total so far, in milliseconds"""
+        durations = {
+            phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()
+        }
+        durations["total"] = round((time.perf_counter() - self.started) * 1000, 3)
+        return durations
+
+    def header(self) -> str:
+        metrics = [f"{phase};dur={ms}" for phase, ms in self.durations().items()]
+        if self.cache is not None:
+            metrics.insert(0, f'cache;desc="{self.cache}"')
+        return ", ".join(metrics)
+
+    def meta(self) -> dict:
+        """Timing as MCP result metadata"""
+        return {"cache": self.cache, "durations": self.durations()}
+
+
+_current: ContextVar[ServerTiming | None] = ContextVar("server_timing", default=None)
+
+
+@contextmanager
+def record_timing() -> Iterator[ServerTiming]:
+    """Collect the phase timings of everything awaited inside the block"""
+    timing = ServerTiming()
+    token = _current.set(timing)
+    try:
+        yield timing
+    finally:
+        _current.reset(token)
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    timing = _current.get()
+    if timing is not None:
+        timing.add(phase, seconds)
+
+
+def record_cache(state: str) -> None:
+    timing = _current.get()
+    if timing is not None:
+        timing.mark_cache(state)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the time spent in the block to ``phase`` of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started)
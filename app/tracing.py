@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import functools
+import importlib
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+if TYPE_CHECKING:
+    import httpx
+
+JSONL_EXPORTER = "jsonl"
+
+logger = logging.getLogger(__name__)
+
+# W3C trace context: version-traceid-parentid-flags
+_TRACEPARENT = re.compile(
+    r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+
+# (trace id, parent span id, trace flags) received from a caller
+SpanContext = tuple[str, str, str]
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class Span:
+    """One timed operation of a trace"""
+
+    __slots__ = (
+        "_started",
+        "attributes",
+        "duration",
+        "flags",
+        "name",
+        "parent_id",
+        "span_id",
+        "start",
+        "status",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None,
+        flags: str,
+        attributes: dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64) or 1:016x}"
+        self.parent_id = parent_id
+        self.flags = flags
+        self.attributes = attributes
+        self.status = "ok"
+        # Wall clock for the export, monotonic clock for the duration
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = 0.0
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{self.flags}"
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "durationMs": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class JsonlSpanExporter:
+    """
+    Append finished spans to a JSON Lines file.
+
+    Spans are buffered and handed ``batch_size`` at a time to a writer
+    thread that encodes and appends them, so neither JSON encoding nor disk
+    I/O runs on the event loop. Spans never wait longer than about
+    ``flush_interval`` seconds: the writer also takes whatever is buffered
+    when no batch arrived for that long. ``close`` hands over what is left
+    and waits until everything is written.
+    """
+
+    def __init__(
+        self, path: str | Path, batch_size: int = 64, flush_interval: float = 5.0
+    ) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = max(flush_interval, 0.01)
+        # The buffer, its age and the writer are shared with the writer thread
+        self._lock = threading.Lock()
+        self._buffer: list[Span] = []
+        self._oldest = 0.0
+        self._writer: threading.Thread | None = None
+        # Batches for the writer thread; None tells it to stop
+        self._batches: queue.SimpleQueue[list[Span] | None] = queue.SimpleQueue()
+
+    def export(self, span: Span) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not self._buffer:
+                self._oldest = now
+            self._buffer.append(span)
+            self._start_writer()
+            if (
+                len(self._buffer) >= self.batch_size
+                or now - self._oldest >= self.flush_interval
+            ):
+                self._batches.put(self._take())
+
+    def flush(self) -> None:
+        """Hand the buffered spans to the writer thread without waiting"""
+        with self._lock:
+            if self._buffer:
+                self._start_writer()
+                self._batches.put(self._take())
+
+    def close(self) -> None:
+        """Write the remaining spans and stop the writer thread"""
+        self.flush()
+        with self._lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._batches.put(None)
+        if writer is not None:
+            writer.join()
+
+    # Internal helpers -------------------------------------------------
+
+    def _take(self) -> list[Span]:
+        batch, self._buffer = self._buffer, []
+        return batch
+
+    def _start_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_loop, name="span-writer", daemon=True
+            )
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                batch = self._batches.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Traffic is too light to fill a batch; write what is buffered
+                with self._lock:
+                    batch = self._take()
+                if not batch:
+                    continue
+            if batch is None:
+                return
+            try:
+                self._write(batch)
+            except OSError:
+                logger.exception("Writing %d spans to %s failed", len(batch), self.path)
+
+    def _write(self, batch: list[Span]) -> None:
+        lines = [
+            json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+            for span in batch
+        ]
+        with self.path.open("a", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Create spans and hand them to an exporter when they end.
+
+    Without an exporter tracing is off and ``span`` yields None without
+    recording anything.
+    """
+
+    def __init__(self, exporter: SpanExporter | None = None) -> None:
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(
+        self, name: str, parent: SpanContext | None = None, **attributes: Any
+    ) -> Iterator[Span | None]:
+        """
+        Run the block in a child of the current span.
+
+        ``parent`` continues a trace received from a caller instead; with
+        neither, the span starts a new trace.
+        """
+        if self.exporter is None:
+            yield None
+            return
+
+        current = _current_span.get()
+        if parent is not None:
+            trace_id, parent_id, flags = parent
+        elif current is not None:
+            trace_id, parent_id = current.trace_id, current.span_id
+            flags = current.flags
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128) or 1:032x}", None
+            flags = "01"  # sampled
+
+        span = Span(name, trace_id, parent_id, flags, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.status = "error"
+            span.attributes["error"] = type(exc).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self.exporter.export(span)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Run an async method in a span of its object's ``tracer``"""
+
+    def decorate(method: F) -> F:
+        @functools.wraps(method)
+        async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            with self.tracer.span(name):
+                return await method(self, *args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Annotate the current span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def parse_traceparent(header: str | None) -> SpanContext | None:
+    """Return the trace context of a W3C ``traceparent`` header if it is valid"""
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, flags
+
+
+async def inject_trace_context(request: httpx.Request) -> None:
+    """httpx request hook adding the current span as ``traceparent``"""
+    span = _current_span.get()
+    if span is not None:
+        request.headers["traceparent"] = span.traceparent
+
+
+def load_span_exporter(spec: str, path: str) -> SpanExporter | None:
+    """
+    Build the span exporter named by ``TRACE_EXPORTER``.
+
+    An empty value disables tracing, ``jsonl`` appends spans to ``path`` and
+    ``package.module:factory`` calls a factory that returns an exporter, for
+    example one forwarding spans to a collector.
+    """
+    spec = spec.strip()
+    if not spec:
+        return None
+    if spec == JSONL_EXPORTER:
+        return JsonlSpanExporter(path)
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(
+            f"TRACE_EXPORTER must be '{JSONL_EXPORTER}' or 'module:factory', "
+            f"got {spec!r}"
+        )
+    return getattr(importlib.import_module(module_name), attribute)()
+
+
+class TracingMiddleware:
+    """
+    Run every HTTP request in a span, continuing the caller's trace.
+
+    MCP requests are skipped: a session outlives the request that opened it,
+    so tool calls are traced when they are dispatched instead.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer) -> None:
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.tracer.enabled
+            or scope["path"].startswith("/mcp")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+
+        with self.tracer.span(
+            f"{scope['method']} {scope['path']}", parent, method=scope["method"]
+        ) as span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.attributes["status"] = message["status"]
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+            # Name the span after the route template once routing has run
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                span.name = f"{scope['method']} {route}"
+                span.attributes["route"] = route
@@ -0,0 +1 @@
+"""Micro-benchmarks for marketfiyati_mcp"""
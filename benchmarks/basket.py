@@ -0,0 +1,43 @@
+"""
+Time the basket solver on a 50-item x 100-depot price matrix.
+
+Exits with status 1 when solving the single- and two-store plans exceeds
+its budget. Run with ``python -m benchmarks.basket``.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from app.services.basket import best_multi_store, best_single_store
+
+# Seconds; override with BASKET_SOLVE_BUDGET
+SOLVE_BUDGET = float(os.environ.get("BASKET_SOLVE_BUDGET", "0.5"))
+ROUNDS = 5
+
+
+def main() -> None:
+    rng = np.random.default_rng(42)
+    costs = rng.uniform(5, 100, size=(50, 100))
+    costs[rng.random(costs.shape) < 0.3] = np.inf
+
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        best_single_store(costs)
+        best_multi_store(costs, 2)
+        timings.append(time.perf_counter() - started)
+    elapsed = min(timings)
+    print(f"  50 items x 100 depots  {elapsed * 1000:8.1f} ms")
+
+    if elapsed > SOLVE_BUDGET:
+        print(f"over budget: solving exceeds {SOLVE_BUDGET:.2f} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
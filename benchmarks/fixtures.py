@@ -0,0 +1,57 @@
+"""Synthetic upstream payloads shared by the benchmarks"""
+
+from __future__ import annotations
+
+from app.models import (
+    FacetItem,
+    FacetMap,
+    Product,
+    ProductDepotInfo,
+    SearchResponse,
+)
+
+MARKETS = ("bim", "a101", "migros", "sok", "carrefour")
+
+
+def build_search_response(products: int, depots: int = 8) -> SearchResponse:
+    """Build a search page with ``products`` items offered in ``depots`` depots"""
+    content = []
+    for index in range(products):
+        offers = []
+        for depot in range(depots):
+            market = MARKETS[depot % len(MARKETS)]
+            price = 20.0 + (index * 7 + depot * 3) % 50
+            offers.append(
+                ProductDepotInfo(
+                    depotId=f"{market}-D{depot:03d}",
+                    depotName=f"{market.upper()} Şube {depot}",
+                    price=price,
+                    unitPrice=f"{price:.2f} ₺/kg".replace(".", ","),
+                    marketAdi=market,
+                    percentage=0.0,
+                    longitude=32.58 + depot * 0.001,
+                    latitude=39.94 + depot * 0.001,
+                    indexTime="21.10.2025 11:12",
+                )
+            )
+        content.append(
+            Product(
+                id=f"{index:013d}",
+                title=f"Tam Yağlı Süt {index} 1 Lt",
+                brand=("Dost", "Pınar", "Sütaş")[index % 3],
+                imageUrl=f"https://cdn.marketfiyati.org.tr/images/{index}.png",
+                refinedQuantityUnit=None,
+                refinedVolumeOrWeight="1 lt",
+                categories=["Süt Ürünleri ve Kahvaltılık", "Süt"],
+                productDepotInfoList=offers,
+            )
+        )
+    return SearchResponse(
+        numberOfFound=products,
+        searchResultType=2,
+        content=content,
+        facetMap=FacetMap(
+            brand=[FacetItem(name="Dost", count=products)],
+            market_names=[FacetItem(name=market, count=products) for market in MARKETS],
+        ),
+    )
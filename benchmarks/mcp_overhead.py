@@ -0,0 +1,72 @@
+"""
+Compare per-call overhead of MCP tools generated from the REST routes with
+the native tools that call the service directly.
+
+Upstream is replaced by a fixed search page, so the numbers are the cost of
+the MCP layer alone. Run with ``python -m benchmarks.mcp_overhead``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import patch
+
+from fastmcp import Client, FastMCP
+
+from app.main import create_app
+from app.mcp_mount import get_mcp_server
+
+from .fixtures import build_search_response
+
+ROUNDS = 200
+ARGUMENTS = {"keywords": "süt", "latitude": 39.9366, "longitude": 32.5859}
+
+
+async def _measure(label: str, server: FastMCP, tool: str, rounds: int) -> float:
+    async with Client(server) as client:
+        await client.call_tool(tool, ARGUMENTS)  # warm up
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await client.call_tool(tool, ARGUMENTS)
+        elapsed = (time.perf_counter() - started) / rounds * 1000
+    print(f"  {label:<28} {elapsed:8.3f} ms")
+    return elapsed
+
+
+def _without_output_schema(route, component) -> None:
+    # The search routes document a union of views, which the generated tools
+    # cannot validate their structured output against
+    component.output_schema = None
+
+
+async def _run() -> None:
+    app = create_app()
+    loopback = FastMCP.from_fastapi(
+        app=app, name="Loopback", mcp_component_fn=_without_output_schema
+    )
+    native = get_mcp_server(app)
+
+    for size in (24, 100):
+        response = build_search_response(size)
+
+        async def search(*args, response=response, **kwargs):
+            return response
+
+        with patch(
+            "app.services.marketfiyat_service.MarketfiyatService.search", new=search
+        ):
+            print(f"{size}-item page")
+            before = await _measure(
+                "from_fastapi loopback", loopback, "search_get_search_get", ROUNDS
+            )
+            after = await _measure("native tool", native, "search_products", ROUNDS)
+            print(f"  speed-up: {before / after:.1f}x")
+
+
+def main() -> None:
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,30 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.main import create_app
+from app.models import FacetMap, Product, ProductDepotInfo, SearchResponse
+
+INDEX_TIME = "21.10.2025 11:12"
+
+# Streamable HTTP headers and handshake of an MCP client, also used by
+# benchmarks.startup
+MCP_HEADERS = {"Accept": "application/json, text/event-stream"}
+MCP_INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1.0"},
+    },
+}
 
 
 @pytest.fixture
@@ -19,3 +38,63 @@ def app() -> FastAPI:
 def client(app: FastAPI) -> TestClient:
     """Create a test client"""
     return TestClient(app)
+
+
+def make_offer(
+    depot_id: str,
+    price: float,
+    *,
+    market: str | None = None,
+    depot_name: str | None = None,
+    unit_price: str | None = None,
+    latitude: float = 39.9,
+    longitude: float = 32.5,
+    index_time: str = INDEX_TIME,
+) -> ProductDepotInfo:
+    """Build a depot offer; the market defaults to the depot id's prefix"""
+    return ProductDepotInfo(
+        depotId=depot_id,
+        depotName=depot_name or depot_id,
+        price=price,
+        unitPrice=unit_price or f"{price} ₺",
+        marketAdi=market or depot_id.split("-")[0],
+        percentage=0.0,
+        longitude=longitude,
+        latitude=latitude,
+        indexTime=index_time,
+    )
+
+
+def make_product(
+    product_id: str,
+    *offers: ProductDepotInfo,
+    title: str | None = None,
+    brand: str = "Marka",
+    categories: list[str] | None = None,
+    **fields: Any,
+) -> Product:
+    """Build a product offered by ``offers``; other fields go in ``fields``"""
+    return Product(
+        id=product_id,
+        title=title or f"Ürün {product_id}",
+        brand=brand,
+        imageUrl=fields.pop("imageUrl", "https://example.com/image.png"),
+        categories=categories or ["Süt"],
+        productDepotInfoList=list(offers),
+        **fields,
+    )
+
+
+def make_response(
+    *products: Product,
+    found: int | None = None,
+    result_type: int = 2,
+    facets: FacetMap | None = None,
+) -> SearchResponse:
+    """Build a search page; ``found`` defaults to the number of products"""
+    return SearchResponse(
+        numberOfFound=len(products) if found is None else found,
+        searchResultType=result_type,
+        content=list(products),
+        facetMap=facets or FacetMap(),
+    )
@@ -0,0 +1,173 @@
+"""Tests for the cheapest-basket optimizer"""
+
+from __future__ import annotations
+
+import itertools
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import Product
+from app.services.basket import (
+    MISSING_PENALTY,
+    best_multi_store,
+    best_single_store,
+    build_price_matrix,
+)
+from tests.conftest import make_offer, make_product, make_response
+
+
+def _product(product_id: str, offers: dict[str, float]) -> Product:
+    return make_product(
+        product_id,
+        *(
+            make_offer(depot_id, price, depot_name=f"Depo {depot_id}")
+            for depot_id, price in offers.items()
+        ),
+        categories=["Temel Gıda"],
+    )
+
+
+# süt is cheapest at a101, ekmek at bim; only bim sells yumurta
+SEARCH_RESULTS = {
+    "süt": make_response(
+        _product("sut-1", {"bim-1": 40.0, "a101-1": 30.0}),
+        _product("sut-2", {"bim-1": 38.0}),
+    ),
+    "ekmek": make_response(_product("ekmek-1", {"bim-1": 10.0, "a101-1": 15.0})),
+    "yumurta": make_response(_product("yumurta-1", {"bim-1": 80.0})),
+    "havyar": make_response(),
+}
+
+
+def test_build_price_matrix_keeps_cheapest_candidate():
+    """Test each cell holds the cheapest candidate weighted by quantity"""
+    matrix = build_price_matrix(
+        [SEARCH_RESULTS["süt"].content, SEARCH_RESULTS["ekmek"].content], [2, 1]
+    )
+
+    bim = matrix.depot_ids.index("bim-1")
+    a101 = matrix.depot_ids.index("a101-1")
+    assert matrix.costs[0, bim] == 76.0
+    assert matrix.costs[0, a101] == 60.0
+    assert matrix.offer(0, bim)[0].id == "sut-2"
+    assert matrix.costs[1, a101] == 15.0
+
+
+def test_single_and_multi_store_plans():
+    """Test splitting across stores beats the best single store"""
+    costs = np.array(
+        [
+            [10.0, 4.0, np.inf],
+            [3.0, 9.0, 8.0],
+            [5.0, 5.0, 1.0],
+        ]
+    )
+
+    assert best_single_store(costs) == ([0], 18.0)
+    assert best_multi_store(costs, 2) == ([0, 1], 12.0)
+    assert best_multi_store(costs, 3) == ([0, 1, 2], 8.0)
+
+
+def test_multi_store_prefers_complete_baskets():
+    """Test a plan covering every item wins over a cheaper partial one"""
+    costs = np.array([[1.0, np.inf], [np.inf, 100.0]])
+
+    depots, total = best_multi_store(costs, 2)
+
+    assert depots == [0, 1]
+    assert total == 101.0
+
+
+def test_build_price_matrix_many_duplicate_offers():
+    """Test every cell holds the minimum when many candidates share depots"""
+    rng = np.random.default_rng(7)
+    depots = [f"depot-{number}" for number in range(5)]
+    candidates = [
+        [
+            _product(
+                f"item{item}-{candidate}",
+                {depot: float(rng.integers(1, 50)) for depot in depots},
+            )
+            for candidate in range(6)
+        ]
+        for item in range(3)
+    ]
+
+    matrix = build_price_matrix(candidates, [1, 2, 3])
+
+    for item, products in enumerate(candidates):
+        for depot in depots:
+            column = matrix.depot_ids.index(depot)
+            cheapest = min(
+                offer.price
+                for product in products
+                for offer in product.productDepotInfoList
+                if offer.depotId == depot
+            )
+            assert matrix.costs[item, column] == cheapest * (item + 1)
+            assert matrix.offer(item, column)[1].price == cheapest
+
+
+def test_multi_store_matches_exhaustive_search():
+    """Test the blocked pairwise search finds the best pair"""
+    rng = np.random.default_rng(42)
+    costs = rng.uniform(5, 100, size=(12, 70))
+    costs[rng.random(costs.shape) < 0.3] = np.inf
+    penalized = np.where(np.isfinite(costs), costs, MISSING_PENALTY)
+
+    best = min(
+        np.minimum(penalized[:, first], penalized[:, second]).sum()
+        for first, second in itertools.combinations(range(costs.shape[1]), 2)
+    )
+
+    _, total = best_multi_store(costs, 2)
+    assert total == pytest.approx(best)
+
+
+def test_basket_endpoint(client: TestClient):
+    """Test the basket endpoint returns single and split plans"""
+
+    async def mock_search(request):
+        return SEARCH_RESULTS[request.keywords]
+
+    with patch(
+        "app.services.marketfiyat_service.MarketfiyatService.search",
+        side_effect=mock_search,
+    ):
+        response = client.post(
+            "/basket",
+            json={
+                "items": [
+                    {"keywords": "süt", "quantity": 2},
+                    {"keywords": "ekmek"},
+                    {"keywords": "yumurta"},
+                    {"keywords": "havyar"},
+                ],
+                "latitude": 39.9366,
+                "longitude": 32.5859,
+            },
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["missingItems"] == ["havyar"]
+    assert data["depotCount"] == 2
+    assert data["singleStore"]["depotIds"] == ["bim-1"]
+    assert data["singleStore"]["total"] == 166.0
+    assert data["multiStore"]["depotIds"] == ["a101-1", "bim-1"]
+    assert data["multiStore"]["total"] == 150.0
+    assert data["multiStore"]["missingItems"] == ["havyar"]
+
+
+@pytest.mark.parametrize("items", [[], [{"keywords": "süt"}] * 51])
+def test_basket_validation(client: TestClient, items):
+    """Test the shopping list size is validated"""
+    response = client.post(
+        "/basket",
+        json={"items": items, "latitude": 39.9366, "longitude": 32.5859},
+    )
+
+    assert response.status_code == 422
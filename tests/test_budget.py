@@ -0,0 +1,149 @@
+"""Tests for size-budgeted MCP search results"""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+
+from app.mcp_mount import get_mcp_server
+from app.models import FacetItem, FacetMap
+from app.services.budget import (
+    InvalidCursorError,
+    ResponseBudget,
+    decode_cursor,
+    encode_cursor,
+    fit_search_response,
+    render_budgeted_response,
+)
+from tests.conftest import make_offer, make_product, make_response
+
+SEARCH = "app.services.marketfiyat_service.MarketfiyatService.search"
+
+
+@pytest.fixture
+def search_response():
+    """Create a response with 20 products of three offers each"""
+    return make_response(
+        *(
+            make_product(
+                f"p{index}",
+                *(
+                    make_offer(
+                        f"d{index}-{depot}",
+                        100.0 - index + depot,
+                        market="bim",
+                        depot_name=f"d{index}-{depot} depot",
+                        unit_price=f"{100.0 - index + depot:.2f} ₺",
+                    )
+                    for depot in range(3)
+                ),
+                title=f"Süt {index}",
+                brand="Pınar",
+                imageUrl="https://example.com/image.jpg",
+            )
+            for index in range(20)
+        ),
+        found=50,
+        result_type=1,
+        facets=FacetMap(brand=[FacetItem(name="Pınar", count=20)]),
+    )
+
+
+def test_fit_by_items_ranks_cheapest_first(search_response):
+    """Test products are collapsed and ranked by their cheapest offer"""
+    fitted = fit_search_response(search_response, ResponseBudget(max_items=3), "s")
+
+    assert [product.id for product in fitted.content] == ["p19", "p18", "p17"]
+    assert fitted.content[0].cheapest.price == 81.0
+    assert fitted.content[0].offerCount == 3
+    assert fitted.omitted.products == 17
+    assert fitted.omitted.offers == 60 - 3
+    assert fitted.omitted.facets is True
+    assert fitted.omitted.notFetched == 30
+    assert fitted.nextCursor is not None
+
+
+@pytest.mark.parametrize(
+    "budget",
+    [ResponseBudget(max_bytes=1200), ResponseBudget(max_tokens=300)],
+)
+def test_fit_by_bytes_and_tokens(search_response, budget):
+    """Test the rendered response stays within the byte or token budget"""
+    fitted = fit_search_response(search_response, budget, "s")
+    body = render_budgeted_response(fitted)
+
+    assert len(body) <= 1200
+    assert 0 < len(fitted.content) < 20
+    assert json.loads(body)["omitted"]["products"] == 20 - len(fitted.content)
+
+
+def test_fit_returns_one_product_over_budget(search_response):
+    """Test a budget smaller than one product still makes progress"""
+    fitted = fit_search_response(search_response, ResponseBudget(max_bytes=1), "s")
+
+    assert len(fitted.content) == 1
+
+
+def test_cursor_pages_through_all_products(search_response):
+    """Test following nextCursor returns every product exactly once"""
+    budget = ResponseBudget(max_bytes=1000)
+    seen: list[str] = []
+    offset = 0
+    while True:
+        fitted = fit_search_response(search_response, budget, "s", offset)
+        seen.extend(product.id for product in fitted.content)
+        if fitted.nextCursor is None:
+            break
+        offset = decode_cursor(fitted.nextCursor, "s")
+
+    assert sorted(seen) == sorted(product.id for product in search_response.content)
+    assert len(seen) == len(set(seen))
+
+
+def test_cursor_rejects_other_searches():
+    """Test cursors are tied to the search they were issued for"""
+    cursor = encode_cursor(5, "a")
+
+    assert decode_cursor(cursor, "a") == 5
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "b")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not a cursor", "a")
+
+
+@pytest.mark.asyncio
+async def test_search_tool_budget_and_cursor(app: FastAPI, search_response):
+    """Test the MCP search tool honours budgets and continues with a cursor"""
+    arguments = {"keywords": "süt", "latitude": 39.9, "longitude": 32.5}
+    with patch(SEARCH, new=AsyncMock(return_value=search_response)):
+        async with Client(get_mcp_server(app)) as client:
+            first = await client.call_tool(
+                "search_products", {**arguments, "max_items": 15}
+            )
+            second = await client.call_tool(
+                "search_products",
+                {**arguments, "cursor": first.structured_content["nextCursor"]},
+            )
+            with pytest.raises(ToolError, match="does not belong"):
+                await client.call_tool(
+                    "search_products",
+                    {
+                        **arguments,
+                        "keywords": "ekmek",
+                        "cursor": first.structured_content["nextCursor"],
+                    },
+                )
+            with pytest.raises(ToolError, match="view 'summary' cannot be combined"):
+                await client.call_tool(
+                    "search_products", {**arguments, "view": "summary", "max_items": 5}
+                )
+
+    assert len(first.structured_content["content"]) == 15
+    assert "facetMap" not in first.structured_content
+    assert len(second.structured_content["content"]) == 5
+    assert second.structured_content["nextCursor"] is None
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+import json
 from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
 
+from app.api.responses import PydanticJSONResponse
 from app.models import CategoriesResponse, Category
 
 
@@ -44,3 +46,12 @@ def test_get_categories(client: TestClient, mock_categories_response):
         assert len(data["content"][0]["subcategories"]) == 2
         assert data["content"][1]["name"] == "Süt Ürünleri ve Kahvaltılık"
         assert len(data["content"][1]["subcategories"]) == 4
+
+
+def test_pydantic_json_response_matches_model_dump(mock_categories_response):
+    """Test the pydantic-core encoded body matches the default serialization"""
+    response = PydanticJSONResponse(mock_categories_response)
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == mock_categories_response.model_dump()
+    assert PydanticJSONResponse(b'{"ok":true}').body == b'{"ok":true}'
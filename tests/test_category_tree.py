@@ -0,0 +1,96 @@
+"""Tests for the indexed category tree"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import CategoriesResponse, Category
+from app.services import MarketfiyatService
+from app.services.category_tree import CategoryTree
+
+CATEGORIES = CategoriesResponse(
+    content=[
+        Category(name="Meyve ve Sebze", subcategories=["Meyve", "Sebze"]),
+        Category(
+            name="Süt Ürünleri ve Kahvaltılık",
+            subcategories=["Süt", "Yoğurt", "Peynir", "Zeytin"],
+        ),
+    ]
+)
+
+
+@pytest.fixture
+def tree():
+    """Create a tree over two main categories"""
+    return CategoryTree(CATEGORIES)
+
+
+def test_lookup_ignores_case_and_diacritics(tree):
+    """Test names resolve whatever their casing or Turkish spelling"""
+    assert tree.resolve("YOGURT").mainCategory == "Süt Ürünleri ve Kahvaltılık"
+    assert tree.resolve("sebze").mainCategory == "Meyve ve Sebze"
+    assert tree.resolve("Ekmek") is None
+    assert tree.main_category("süt  ürünleri ve kahvaltilik").name == (
+        "Süt Ürünleri ve Kahvaltılık"
+    )
+
+    lookup = tree.lookup(["PEYNİR", "meyve ve sebze", "Ekmek"])
+
+    assert [(m.name, m.mainCategory, m.isMainCategory) for m in lookup.matches] == [
+        ("Peynir", "Süt Ürünleri ve Kahvaltılık", False),
+        ("Meyve ve Sebze", "Meyve ve Sebze", True),
+    ]
+    assert lookup.unmatched == ["Ekmek"]
+
+
+@pytest.mark.asyncio
+async def test_service_refreshes_tree_once_per_ttl():
+    """Test categories are fetched once and reused until they expire"""
+    mock_response = MagicMock()
+    mock_response.json.return_value = CATEGORIES.model_dump()
+    service = MarketfiyatService(categories_cache_seconds=60)
+    service._client = AsyncMock()
+    service._client.get = AsyncMock(return_value=mock_response)
+
+    first = await service.get_category_tree()
+    categories = await service.get_categories()
+
+    assert categories is first.categories
+    assert service._client.get.call_count == 1
+    service.suggestions.rebuild()
+    assert service.suggestions.suggest("yog")[0].text == "Yoğurt"
+
+    expired = MarketfiyatService(categories_cache_seconds=0)
+    expired._client = service._client
+    await expired.get_category_tree()
+    await expired.get_category_tree()
+    assert service._client.get.call_count == 3
+
+
+def test_category_browse_endpoints(client: TestClient):
+    """Test browsing the tree without downloading the whole taxonomy"""
+    with patch(
+        "app.services.marketfiyat_service.MarketfiyatService.get_category_tree",
+        new=AsyncMock(return_value=CategoryTree(CATEGORIES)),
+    ):
+        tree = client.get("/categories/tree").json()
+        assert tree["categories"][1] == {
+            "name": "Süt Ürünleri ve Kahvaltılık",
+            "subcategoryCount": 4,
+        }
+
+        category = client.get("/categories/meyve ve sebze")
+        assert category.json() == {
+            "name": "Meyve ve Sebze",
+            "subcategories": ["Meyve", "Sebze"],
+        }
+        assert client.get("/categories/Ekmek").status_code == 404
+
+        lookup = client.get("/categories/lookup", params={"name": ["zeytin", "x"]})
+        assert lookup.json()["matches"][0]["mainCategory"] == (
+            "Süt Ürünleri ve Kahvaltılık"
+        )
+        assert lookup.json()["unmatched"] == ["x"]
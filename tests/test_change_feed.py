@@ -0,0 +1,127 @@
+"""Tests for the price change feed"""
+
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import SearchResponse
+from app.services.change_feed import ChangeFeed
+from tests.conftest import make_offer, make_product, make_response
+
+
+def _response(*offers: tuple[str, str, float, str]) -> SearchResponse:
+    return make_response(
+        *(
+            make_product(
+                product_id,
+                make_offer(depot_id, price, index_time=index_time),
+                title=product_id,
+            )
+            for product_id, depot_id, price, index_time in offers
+        )
+    )
+
+
+@pytest.fixture
+def feed():
+    """Create a change feed that has seen two offers"""
+    change_feed = ChangeFeed()
+    change_feed.observe(
+        _response(
+            ("sut", "bim-1", 40.0, "21.10.2025 11:12"),
+            ("sut", "a101-1", 38.0, "21.10.2025 11:12"),
+        )
+    )
+    return change_feed
+
+
+def test_first_poll_resets(feed):
+    """Test polling without a token returns a starting token"""
+    response = feed.changes_since(None)
+
+    assert response.reset is True
+    assert response.changes == []
+    assert feed.changes_since(response.nextToken).changes == []
+
+
+def test_only_price_changes_are_reported(feed):
+    """Test unchanged and stale offers produce no changes"""
+    token = feed.token
+    feed.observe(
+        _response(
+            ("sut", "bim-1", 40.0, "22.10.2025 09:00"),  # same price
+            ("sut", "a101-1", 30.0, "20.10.2025 09:00"),  # stale snapshot
+        )
+    )
+    assert feed.changes_since(token).changes == []
+
+    feed.observe(_response(("sut", "bim-1", 36.5, "22.10.2025 10:00")))
+    response = feed.changes_since(token)
+
+    assert response.reset is False
+    assert len(response.changes) == 1
+    change = response.changes[0]
+    assert (change.depotId, change.previousPrice, change.price) == (
+        "bim-1",
+        40.0,
+        36.5,
+    )
+    assert feed.changes_since(response.nextToken).changes == []
+
+
+def test_new_offers_are_reported(feed):
+    """Test an offer seen for the first time is a change without a previous price"""
+    token = feed.token
+    feed.observe(_response(("ekmek", "sok-1", 10.0, "22.10.2025 10:00")))
+
+    change = feed.changes_since(token).changes[0]
+    assert change.productId == "ekmek"
+    assert change.previousPrice is None
+
+
+def test_limit_and_market_filter(feed):
+    """Test paging through the feed with a limit and a market filter"""
+    token = feed.token
+    for price in (30.0, 31.0, 32.0):
+        feed.observe(
+            _response(
+                ("sut", "bim-1", price, "23.10.2025 10:00"),
+                ("sut", "a101-1", price, "23.10.2025 10:00"),
+            )
+        )
+
+    first = feed.changes_since(token, limit=2, market="bim")
+    second = feed.changes_since(first.nextToken, limit=2, market="bim")
+
+    assert [change.price for change in first.changes] == [30.0, 31.0]
+    assert [change.price for change in second.changes] == [32.0]
+    assert second.nextToken == feed.token
+
+
+def test_truncated_or_foreign_tokens_reset():
+    """Test tokens older than the retained log or from another process reset"""
+    feed = ChangeFeed(max_changes=2)
+    token = feed.token
+    for price in (1.0, 2.0, 3.0):
+        feed.observe(_response(("sut", "bim-1", price, "21.10.2025 11:12")))
+
+    assert feed.changes_since(token).reset is True
+    assert feed.changes_since("other-0").reset is True
+    assert feed.changes_since("garbage").reset is True
+
+
+def test_changes_endpoint(client: TestClient):
+    """Test the changes endpoint hands out a token to start polling"""
+    response = client.get("/changes")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["reset"] is True
+
+    response = client.get("/changes", params={"since": data["nextToken"]})
+    assert response.json() == {
+        "changes": [],
+        "nextToken": data["nextToken"],
+        "reset": False,
+    }
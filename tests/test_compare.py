@@ -0,0 +1,131 @@
+"""Tests for per-market price comparison"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastmcp import Client
+
+from app.mcp_mount import get_mcp_server
+from app.models import (
+    Product,
+    SearchRequest,
+)
+from app.services import compare_market_prices
+from app.services.compare import parse_unit_price
+from tests.conftest import make_offer, make_product, make_response
+
+SEARCH = "app.services.marketfiyat_service.MarketfiyatService.search"
+
+
+def _product(product_id: str, offers: list[tuple[str, float, str]]) -> Product:
+    return make_product(
+        product_id,
+        *(
+            make_offer(
+                depot_id,
+                price,
+                depot_name=f"Depo {depot_id}",
+                unit_price=unit_price,
+                latitude=39.9 + index * 0.01,
+            )
+            for index, (depot_id, price, unit_price) in enumerate(offers)
+        ),
+        title=f"Süt {product_id}",
+        brand="Pınar",
+    )
+
+
+@pytest.fixture
+def search_response():
+    """Create a response with bim and a101 offers"""
+    return make_response(
+        _product(
+            "p1",
+            [
+                ("bim-1", 40.0, "40,00 ₺/lt"),
+                ("bim-2", 42.0, "42,00 ₺/lt"),
+                ("a101-1", 35.0, "35,00 ₺/lt"),
+            ],
+        ),
+        _product(
+            "p2",
+            [("bim-1", 60.0, "30,00 ₺/LT"), ("bim-3", 1250.0, "1.250,00 ₺")],
+        ),
+        _product("p3", [("a101-1", 20.0, "fiyat yok")]),
+        result_type=1,
+    )
+
+
+REQUEST = SearchRequest(keywords="süt", latitude=39.9, longitude=32.5)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("38,50 ₺/lt", (38.5, "lt")),
+        ("1.249,90 ₺/KG", (1249.9, "kg")),
+        ("40,00 ₺", (40.0, None)),
+        ("-", (None, None)),
+    ],
+)
+def test_parse_unit_price(text, expected):
+    """Test formatted unit prices are split into amount and unit"""
+    assert parse_unit_price(text) == expected
+
+
+def test_compare_groups_offers_by_market(search_response):
+    """Test statistics are computed per market, cheapest market first"""
+    comparison = compare_market_prices(search_response, REQUEST)
+
+    assert comparison.unit == "lt"
+    assert [market.marketAdi for market in comparison.markets] == ["a101", "bim"]
+    a101, bim = comparison.markets
+    assert (a101.minPrice, a101.medianPrice, a101.maxPrice) == (20.0, 27.5, 35.0)
+    assert a101.cheapest.productId == "p3"
+    assert (a101.minUnitPrice, a101.maxUnitPrice) == (35.0, 35.0)
+    assert (bim.offerCount, bim.productCount) == (4, 2)
+    assert (bim.minPrice, bim.medianPrice, bim.maxPrice) == (40.0, 51.0, 1250.0)
+    assert (bim.minUnitPrice, bim.medianUnitPrice, bim.maxUnitPrice) == (
+        30.0,
+        40.0,
+        42.0,
+    )
+    assert bim.cheapest.depotId == "bim-1"
+    assert bim.cheapest.distanceMeters == 0.0
+
+
+def test_compare_empty_response():
+    """Test an empty search result has no markets"""
+    empty = make_response(result_type=1)
+
+    assert compare_market_prices(empty, REQUEST).markets == []
+
+
+def test_compare_endpoint(client: TestClient, search_response):
+    """Test the compare endpoint searches once and aggregates"""
+    with patch(SEARCH, new=AsyncMock(return_value=search_response)) as mock_search:
+        response = client.get(
+            "/compare",
+            params={"keywords": "süt", "latitude": 39.9, "longitude": 32.5},
+        )
+
+    assert response.status_code == 200
+    assert mock_search.await_count == 1
+    assert response.json()["markets"][0]["cheapest"]["depotId"] == "a101-1"
+
+
+@pytest.mark.asyncio
+async def test_compare_prices_tool(app: FastAPI, search_response):
+    """Test the MCP tool returns the comparison as structured content"""
+    with patch(SEARCH, new=AsyncMock(return_value=search_response)):
+        async with Client(get_mcp_server(app)) as client:
+            result = await client.call_tool(
+                "compare_prices",
+                {"keywords": "süt", "latitude": 39.9, "longitude": 32.5},
+            )
+
+    assert result.structured_content["markets"][1]["marketAdi"] == "bim"
@@ -0,0 +1,163 @@
+"""Tests for response compression"""
+
+from __future__ import annotations
+
+import gzip
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.compression import build_compressors, negotiate_encoding
+from app.models import (
+    CategoriesResponse,
+    Category,
+    FacetMap,
+    SearchRequest,
+    SearchResponse,
+)
+from app.services import MarketfiyatService
+from tests.conftest import make_offer, make_product, make_response
+
+SUPPORTED = ("zstd", "br", "gzip")
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("gzip, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, gzip;q=0.1", "gzip"),
+        ("*", "zstd"),
+        ("*;q=0.5, gzip", "gzip"),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    """Test Accept-Encoding negotiation honours quality values"""
+    assert negotiate_encoding(header, SUPPORTED) == expected
+
+
+def test_negotiate_encoding_only_supported():
+    """Test encodings that are not installed are never selected"""
+    assert negotiate_encoding("zstd, br", ("gzip",)) is None
+
+
+@pytest.fixture
+def large_categories_response():
+    """Create a categories response well above the compression threshold"""
+    return CategoriesResponse(
+        content=[
+            Category(name=f"Kategori {index}", subcategories=["Süt", "Peynir"] * 20)
+            for index in range(20)
+        ]
+    )
+
+
+def test_middleware_compresses_large_responses(
+    client: TestClient, large_categories_response
+):
+    """Test large responses are gzip encoded when the client accepts it"""
+    with patch(
+        "app.services.marketfiyat_service.MarketfiyatService.get_categories"
+    ) as mock_get_categories:
+        mock_get_categories.return_value = large_categories_response
+
+        response = client.get("/categories", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert len(response.json()["content"]) == 20
+
+
+def test_middleware_skips_small_responses(client: TestClient):
+    """Test responses below the size threshold are sent as they are"""
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_middleware_without_accept_encoding(
+    client: TestClient, large_categories_response
+):
+    """Test nothing is compressed when the client does not ask for it"""
+    with patch(
+        "app.services.marketfiyat_service.MarketfiyatService.get_categories"
+    ) as mock_get_categories:
+        mock_get_categories.return_value = large_categories_response
+
+        response = client.get("/categories", headers={"Accept-Encoding": "identity"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        # The body could have been compressed, so caches must key on the header
+        assert "accept-encoding" in response.headers["vary"].lower()
+
+
+def test_middleware_skips_vary_on_small_responses(client: TestClient):
+    """Test responses too small to compress do not vary on Accept-Encoding"""
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert "vary" not in response.headers
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+def test_search_varies_on_accept_encoding_once(client: TestClient, encoding):
+    """Test large search responses name Accept-Encoding in Vary exactly once"""
+    response = make_response(
+        *(
+            make_product(f"p{index}", make_offer(f"bim-{index}", 10.0 + index))
+            for index in range(20)
+        )
+    )
+    with patch(
+        "app.services.marketfiyat_service.MarketfiyatService.search",
+        new=AsyncMock(return_value=response),
+    ):
+        result = client.post(
+            "/search",
+            json={"keywords": "süt", "latitude": 39.9, "longitude": 32.5},
+            headers={"Accept-Encoding": encoding},
+        )
+
+    assert result.status_code == 200
+    assert result.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("encoding", list(build_compressors(5)))
+def test_compressors_round_trip(encoding):
+    """Test every installed codec produces a smaller payload"""
+    body = b'{"marketAdi": "bim", "depotName": "Merkez"}' * 200
+
+    compressed = build_compressors(5)[encoding](body)
+
+    assert len(compressed) < len(body)
+    if encoding == "gzip":
+        assert gzip.decompress(compressed) == body
+
+
+@pytest.mark.asyncio
+async def test_compressed_payload_cached_on_entry():
+    """Test rendered and compressed bodies are stored on the cache entry"""
+    service = MarketfiyatService(cache_seconds=60)
+    request = SearchRequest(keywords="Süt", latitude=39.9, longitude=32.8)
+
+    assert service.get_payload_cache(request) is None
+
+    response = SearchResponse(
+        numberOfFound=0, searchResultType=1, content=[], facetMap=FacetMap()
+    )
+    await service._write_cache(service._build_cache_key(request), response)
+
+    payloads = service.get_payload_cache(request)
+    assert payloads == {}
+    payloads["full:gzip"] = b"compressed"
+
+    same_key = SearchRequest(keywords="süt", latitude=39.9, longitude=32.8)
+    assert service.get_payload_cache(same_key) == {"full:gzip": b"compressed"}
@@ -0,0 +1,91 @@
+"""Tests for the local depot spatial index"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from app.models import DepotLocation, NearestDepot
+from app.services import MarketfiyatService
+from app.services.depot_index import DepotIndex
+from app.services.geo import haversine_meters
+
+HOME = (39.9366, 32.5859)
+
+
+def _depot(depot_id: str, north_km: float, east_km: float = 0.0) -> NearestDepot:
+    latitude = HOME[0] + north_km / 111.195
+    longitude = HOME[1] + east_km / (111.195 * np.cos(np.radians(HOME[0])))
+    return NearestDepot(
+        id=depot_id,
+        sellerName=depot_id,
+        location=DepotLocation(lat=latitude, lon=longitude),
+        marketName=depot_id.split("-")[0],
+        distance=0.0,
+    )
+
+
+def test_haversine_is_vectorized():
+    """Test one call computes distances to many points"""
+    distances = haversine_meters(0.0, 0.0, np.array([0.0, 1.0]), np.array([1.0, 0.0]))
+
+    assert distances == pytest.approx([111_195, 111_195], rel=1e-3)
+
+
+def test_nearby_filters_and_sorts_by_distance():
+    """Test radius queries return depots in range, nearest first"""
+    index = DepotIndex(cell_degrees=0.01)
+    index.add(
+        [_depot("bim-1", 2.0), _depot("a101-1", 0.5, 0.5), _depot("sok-1", 0, -8)],
+        *HOME,
+        radius_meters=10_000,
+        ttl=60,
+    )
+
+    nearby = index.nearby(*HOME, radius_meters=3_000)
+
+    assert [depot.id for depot in nearby] == ["a101-1", "bim-1"]
+    assert nearby[0].distance == pytest.approx(707, rel=0.01)
+    assert [depot.id for depot in index.nearby(*HOME, 100_000)][-1] == "sok-1"
+
+
+def test_coverage_and_refresh():
+    """Test only covered areas are answered and refreshes drop closed depots"""
+    index = DepotIndex()
+    index.add([_depot("bim-1", 0.5), _depot("a101-1", 1.5)], *HOME, 2_000, ttl=60)
+
+    assert index.covers(*HOME, 1_000)
+    assert not index.covers(*HOME, 5_000)
+    assert not index.covers(HOME[0] + 1, HOME[1], 1_000)
+
+    index.add([_depot("bim-1", 0.5)], *HOME, 2_000, ttl=60)
+
+    assert [depot.id for depot in index.nearby(*HOME, 2_000)] == ["bim-1"]
+    assert index.stats()["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_service_answers_covered_areas_locally():
+    """Test a narrower nearest-depot query inside a fresh area skips upstream"""
+    mock_response = MagicMock()
+    mock_response.json.return_value = [
+        _depot("bim-1", 0.5).model_dump(),
+        _depot("a101-1", 3.0).model_dump(),
+    ]
+    service = MarketfiyatService(depot_index_freshness=60)
+    service._client = AsyncMock()
+    service._client.post = AsyncMock(return_value=mock_response)
+
+    await service.get_nearest_depots(*HOME, distance=5)
+    nearby = await service.get_nearest_depots(*HOME, distance=1)
+
+    assert service._client.post.call_count == 1
+    assert [depot.id for depot in nearby] == ["bim-1"]
+
+    disabled = MarketfiyatService(depot_index_freshness=0)
+    disabled._client = service._client
+    await disabled.get_nearest_depots(*HOME, distance=1)
+    await disabled.get_nearest_depots(*HOME, distance=1)
+    assert service._client.post.call_count == 3
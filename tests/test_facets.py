@@ -0,0 +1,62 @@
+"""Tests for locally aggregated facets"""
+
+from __future__ import annotations
+
+from app.models import FacetMap
+from app.services.facets import aggregate_facets
+from app.services.product_registry import merge_search_responses
+from tests.conftest import make_offer, make_product, make_response
+
+
+def _product(product_id: str, brand: str, volume: str | None, *markets: str):
+    return make_product(
+        product_id,
+        *(
+            make_offer(f"{market}-{number}", 10.0, depot_name=market)
+            for number, market in enumerate(markets)
+        ),
+        title=product_id,
+        brand=brand,
+        categories=["Süt Ürünleri ve Kahvaltılık", "Süt"],
+        refinedQuantityUnit="L" if volume else None,
+        refinedVolumeOrWeight=volume,
+    )
+
+
+def _names(items):
+    return [(item.name, item.count) for item in items]
+
+
+def test_aggregate_facets_counts_products():
+    """Test each facet counts matching products once"""
+    facets = aggregate_facets(
+        [
+            _product("p1", "Pınar", "1 L", "bim", "bim", "a101"),
+            _product("p2", "Sütaş", "1 L", "bim"),
+            _product("p3", "Pınar", None, "migros"),
+        ]
+    )
+
+    assert _names(facets.brand) == [("Pınar", 2), ("Sütaş", 1)]
+    assert _names(facets.market_names) == [("bim", 2), ("a101", 1), ("migros", 1)]
+    assert _names(facets.refined_volume_weight) == [("1 L", 2)]
+    assert _names(facets.main_category) == [("Süt Ürünleri ve Kahvaltılık", 3)]
+    assert _names(facets.sub_category) == [("Süt", 3)]
+    assert aggregate_facets([]) == FacetMap()
+
+
+def test_merged_pages_recount_facets():
+    """Test merging pages replaces per-page facets with counts over the result"""
+    pages = [
+        make_response(_product("p1", "Pınar", "1 L", "bim"), found=3),
+        make_response(
+            _product("p1", "Pınar", "1 L", "a101"),
+            _product("p2", "Sütaş", "1 L", "bim"),
+            found=3,
+        ),
+    ]
+
+    merged = merge_search_responses(pages)
+
+    assert _names(merged.facetMap.brand) == [("Pınar", 1), ("Sütaş", 1)]
+    assert _names(merged.facetMap.market_names) == [("bim", 2), ("a101", 1)]
@@ -0,0 +1,177 @@
+"""Tests for string interning of decoded responses"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.mcp_mount import get_mcp_server
+from app.models import SearchRequest, SearchResponse
+from app.services import MarketfiyatService
+from app.services.interning import Vocabulary
+
+
+def _fresh(value: str) -> str:
+    """Return an equal but distinct string object, like a JSON decoder would"""
+    return value.encode().decode()
+
+
+def _search_payload(product_ids: list[str]) -> dict:
+    return {
+        "numberOfFound": len(product_ids),
+        "searchResultType": 2,
+        "content": [
+            {
+                "id": product_id,
+                "title": f"Ürün {product_id}",
+                "brand": _fresh("Pınar"),
+                "imageUrl": f"https://example.com/{product_id}.png",
+                "refinedQuantityUnit": None,
+                "refinedVolumeOrWeight": "1 lt",
+                "categories": [_fresh("Süt")],
+                "productDepotInfoList": [
+                    {
+                        "depotId": _fresh("bim-U751"),
+                        "depotName": _fresh("Saraycık Camisincan"),
+                        "price": 38.5,
+                        "unitPrice": "38,50 ₺/lt",
+                        "marketAdi": _fresh("bim"),
+                        "percentage": 0.0,
+                        "longitude": 32.588585,
+                        "latitude": 39.941654,
+                        "indexTime": _fresh("21.10.2025 11:12"),
+                    }
+                ],
+            }
+            for product_id in product_ids
+        ],
+        "facetMap": {"market_names": [{"name": _fresh("bim"), "count": 1}]},
+    }
+
+
+def test_vocabulary_shares_instances():
+    """Test equal strings are replaced by one shared instance"""
+    vocabulary = Vocabulary()
+    first = vocabulary.intern(_fresh("migros"))
+    second = vocabulary.intern(_fresh("migros"))
+
+    assert first is second
+    assert vocabulary.is_interned(second)
+    assert vocabulary.stats()["hits"] == 1
+
+
+def test_vocabulary_is_bounded():
+    """Test old strings age out so new ones are still interned when full"""
+    vocabulary = Vocabulary(max_size=4)
+    kept = vocabulary.intern(_fresh("bim"))
+    for number in range(20):
+        vocabulary.intern(f"2025-01-01 10:{number:02d}")
+        # A value that keeps recurring survives every rotation
+        assert vocabulary.intern(_fresh("bim")) is kept
+
+    value = _fresh("a101")
+    assert vocabulary.intern(value) is value
+    assert vocabulary.is_interned(value)
+    assert len(vocabulary) <= 4
+    assert not vocabulary.is_interned("2025-01-01 10:00")
+    assert vocabulary.stats()["rotations"] > 0
+
+
+def test_measure_samples_responses():
+    """Test savings are estimated from a bounded sample of responses"""
+    vocabulary = Vocabulary()
+    response = SearchResponse(
+        **vocabulary.intern_search_payload(_search_payload(["p1", "p2"]))
+    )
+
+    report = vocabulary.measure([response] * 10, sample=3)
+    exact = vocabulary.measure([response] * 10, sample=10)
+
+    assert report["sampled_responses"] == 3
+    assert report["responses"] == 10
+    assert report["estimated_bytes_saved"] == exact["estimated_bytes_saved"] > 0
+
+
+def test_intern_search_payload():
+    """Test low-cardinality fields of a raw payload are interned"""
+    vocabulary = Vocabulary()
+    data = vocabulary.intern_search_payload(_search_payload(["p1", "p2"]))
+
+    first, second = data["content"]
+    first_offer = first["productDepotInfoList"][0]
+    second_offer = second["productDepotInfoList"][0]
+    assert first["brand"] is second["brand"]
+    assert first["categories"][0] is second["categories"][0]
+    assert first_offer["marketAdi"] is second_offer["marketAdi"]
+    assert first_offer["indexTime"] is second_offer["indexTime"]
+    assert data["facetMap"]["market_names"][0]["name"] is first_offer["marketAdi"]
+
+
+@pytest.fixture
+def cached_service():
+    """Create a service whose client serves two different search pages"""
+    service = MarketfiyatService(cache_seconds=300)
+
+    nearest_response = MagicMock()
+    nearest_response.json.return_value = []
+
+    async def mock_post(url, **kwargs):
+        if url == "/api/v2/nearest":
+            return nearest_response
+        search_response = MagicMock()
+        search_response.json.return_value = _search_payload(
+            [f"{kwargs['json']['keywords']}-{index}" for index in range(3)]
+        )
+        return search_response
+
+    service._client = AsyncMock()
+    service._client.post = AsyncMock(side_effect=mock_post)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_report_savings(cached_service):
+    """Test cache stats report the memory saved across cached responses"""
+    for keywords in ("süt", "ayran"):
+        await cached_service.search(
+            SearchRequest(keywords=keywords, latitude=39.9, longitude=32.8)
+        )
+
+    first = (
+        await cached_service.search(
+            SearchRequest(keywords="süt", latitude=39.9, longitude=32.8)
+        )
+    ).content[0]
+    stats = cached_service.cache_stats()
+
+    assert stats["live_entries"] == 2
+    assert stats["vocabulary"]["estimated_bytes_saved"] > 0
+    assert (
+        stats["vocabulary"]["interned_references"]
+        > stats["vocabulary"]["distinct_strings"]
+    )
+    assert cached_service.vocabulary.is_interned(
+        first.productDepotInfoList[0].marketAdi
+    )
+
+
+def test_admin_cache_endpoint(client: TestClient):
+    """Test the cache stats admin endpoint"""
+    response = client.get("/admin/cache")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["entries"] == 0
+    assert "estimated_bytes_saved" in data["vocabulary"]
+    assert "evictions" in data["products"]
+
+
+@pytest.mark.asyncio
+async def test_admin_routes_not_exposed_as_mcp_tools(app: FastAPI):
+    """Test operational endpoints are excluded from the MCP tools"""
+    tools = await get_mcp_server(app).get_tools()
+
+    assert not any("cache" in name for name in tools)
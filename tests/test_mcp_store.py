@@ -0,0 +1,120 @@
+"""Tests for the MCP HTTP transport modes and event store"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from mcp.server.streamable_http import EventMessage
+from mcp.types import JSONRPCMessage, JSONRPCNotification
+
+from app.main import create_app
+from app.mcp_store import MemoryEventStore, load_event_store
+from app.models import FacetMap, SearchResponse
+from tests.conftest import MCP_HEADERS, MCP_INITIALIZE
+
+
+def _message(index: int) -> JSONRPCMessage:
+    return JSONRPCMessage(
+        JSONRPCNotification(
+            jsonrpc="2.0", method="notifications/progress", params={"n": index}
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_memory_event_store_replays_one_stream():
+    """Test events after the last seen id are replayed for its stream only"""
+    store = MemoryEventStore()
+    first = await store.store_event("a", _message(1))
+    await store.store_event("b", _message(2))
+    await store.store_event("a", _message(3))
+    replayed: list[EventMessage] = []
+
+    async def send(event: EventMessage) -> None:
+        replayed.append(event)
+
+    assert await store.replay_events_after(first, send) == "a"
+    assert [event.message.root.params["n"] for event in replayed] == [3]
+    assert await store.replay_events_after("unknown", send) is None
+
+
+@pytest.mark.asyncio
+async def test_memory_event_store_is_bounded():
+    """Test the oldest events are dropped beyond max_events"""
+    store = MemoryEventStore(max_events=2)
+    for index in range(5):
+        await store.store_event("a", _message(index))
+
+    assert len(store) == 2
+
+
+def test_empty_memory_event_store_is_truthy():
+    """Test an empty store still counts as configured for the MCP SDK"""
+    store = MemoryEventStore()
+
+    assert len(store) == 0
+    assert store
+
+
+def test_load_event_store():
+    """Test event stores are selected by name or factory path"""
+    assert load_event_store("") is None
+    assert isinstance(load_event_store("memory"), MemoryEventStore)
+    assert isinstance(
+        load_event_store("app.mcp_store:MemoryEventStore"), MemoryEventStore
+    )
+    with pytest.raises(ValueError):
+        load_event_store("redis")
+
+
+def test_stateless_json_mode_needs_no_session():
+    """Test stateless mode answers tool calls without a session handshake"""
+    empty = SearchResponse(
+        numberOfFound=0, searchResultType=1, content=[], facetMap=FacetMap()
+    )
+    call = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {
+            "name": "search_products",
+            "arguments": {"keywords": "süt", "latitude": 39.9, "longitude": 32.5},
+        },
+    }
+
+    with (
+        patch("app.mcp.MCP_STATELESS_HTTP", True),
+        patch("app.mcp.MCP_JSON_RESPONSE", True),
+        patch(
+            "app.services.marketfiyat_service.MarketfiyatService.search",
+            new=AsyncMock(return_value=empty),
+        ),
+        TestClient(create_app()) as client,
+    ):
+        responses = [
+            client.post("/mcp/", json=call, headers=MCP_HEADERS) for _ in range(2)
+        ]
+
+    for response in responses:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/json")
+        assert "mcp-session-id" not in response.headers
+        assert response.json()["result"]["structuredContent"]["numberOfFound"] == 0
+
+
+def test_stateful_mode_uses_configured_event_store():
+    """Test MCP_EVENT_STORE gives stateful streams resumable event ids"""
+    app = create_app()
+
+    with (
+        patch("app.mcp.MCP_EVENT_STORE", "memory"),
+        TestClient(app) as client,
+    ):
+        response = client.post("/mcp/", json=MCP_INITIALIZE, headers=MCP_HEADERS)
+
+    assert response.status_code == 200
+    assert "mcp-session-id" in response.headers
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "\nid: " in f"\n{response.text}"
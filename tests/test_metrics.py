@@ -0,0 +1,145 @@
+"""Tests for the Prometheus metrics"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+
+from app.mcp_mount import get_mcp_server
+from app.metrics import Histogram, Metrics
+from app.models import FacetMap, SearchRequest, SearchResponse
+from app.services import MarketfiyatService, MarketfiyatServiceError
+
+SEARCH = "app.services.marketfiyat_service.MarketfiyatService.search"
+ARGUMENTS = {"keywords": "süt", "latitude": 39.9, "longitude": 32.5}
+
+EMPTY = SearchResponse(
+    numberOfFound=0, searchResultType=2, content=[], facetMap=FacetMap()
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test bucket counts accumulate and end with +Inf, sum and count"""
+    histogram = Histogram("latency", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, "/search")
+
+    assert list(histogram.lines()) == [
+        'latency_bucket{route="/search",le="0.1"} 1',
+        'latency_bucket{route="/search",le="1"} 3',
+        'latency_bucket{route="/search",le="+Inf"} 4',
+        'latency_sum{route="/search"} 4.25',
+        'latency_count{route="/search"} 4',
+    ]
+    assert histogram.count("/search") == 4
+
+
+def test_collectors_are_read_at_scrape_time():
+    """Test collector families are rendered with their labels escaped"""
+    metrics = Metrics()
+    entries = [0]
+    metrics.add_collector(
+        lambda: [("entries", "gauge", "Entries", [({"name": 'a"b'}, entries[0])])]
+    )
+    entries[0] = 3
+
+    text = metrics.render()
+
+    assert "# TYPE entries gauge" in text
+    assert 'entries{name="a\\"b"} 3' in text
+
+
+def test_metrics_endpoint(client: TestClient, app: FastAPI):
+    """Test requests are counted per route template and status code"""
+    with patch(SEARCH, new=AsyncMock(return_value=EMPTY)):
+        assert client.get("/search", params=ARGUMENTS).status_code == 200
+    client.get("/history/p1", params={"depot": "d1"})
+    client.get("/does-not-exist")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert (
+        'marketfiyat_http_responses_total{method="GET",route="/search",status="200"} 1'
+        in text
+    )
+    assert 'route="/history/{product_id}"' in text
+    assert 'route="unmatched",status="404"' in text
+    assert (
+        "marketfiyat_http_request_duration_seconds_count"
+        '{method="GET",route="/search"} 1' in text
+    )
+    assert "marketfiyat_cache_misses_total 0" in text
+    assert app.state.metrics is app.state.marketfiyat_service.metrics
+
+
+@pytest.mark.asyncio
+async def test_upstream_and_cache_metrics():
+    """Test Marketfiyati API calls are timed and cache lookups counted"""
+    service = MarketfiyatService(cache_seconds=300)
+    service.get_nearest_depots = AsyncMock(return_value=[])
+    response = MagicMock(status_code=200)
+    response.json.return_value = EMPTY.model_dump()
+    service._client = AsyncMock()
+    service._client.post = AsyncMock(return_value=response)
+
+    request = SearchRequest(keywords="ekmek", latitude=39.9, longitude=32.8)
+    await service.search(request)
+    await service.search(request)
+
+    metrics = service.metrics
+    assert metrics.upstream_duration.count("/api/v2/search") == 1
+    assert metrics.upstream_responses.value("/api/v2/search", "200") == 1
+    assert metrics.upstream_in_flight.value("/api/v2/search") == 0
+    assert (service.cache_hits, service.cache_misses) == (1, 1)
+
+    service._client.post = AsyncMock(side_effect=OSError("connection reset"))
+    with pytest.raises(MarketfiyatServiceError):
+        await service.search(request.model_copy(update={"keywords": "un"}))
+
+    assert metrics.upstream_responses.value("/api/v2/search", "error") == 1
+    assert "marketfiyat_cache_hits_total 1" in metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_tool_call_metrics(app: FastAPI):
+    """Test MCP tool calls are timed and counted by outcome"""
+    failure = MarketfiyatServiceError("API request failed with status 503", 503)
+    async with Client(get_mcp_server(app)) as client:
+        with patch(SEARCH, new=AsyncMock(return_value=EMPTY)):
+            await client.call_tool("search_products", ARGUMENTS)
+        with (
+            patch(SEARCH, new=AsyncMock(side_effect=failure)),
+            pytest.raises(ToolError),
+        ):
+            await client.call_tool("search_products", ARGUMENTS)
+
+    metrics = app.state.metrics
+    assert metrics.tool_calls.value("search_products", "ok") == 1
+    assert metrics.tool_calls.value("search_products", "error") == 1
+    assert metrics.tool_duration.count("search_products") == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_survive_missing_pool_attributes():
+    """Test /metrics still renders when httpx no longer exposes its pool"""
+    service = MarketfiyatService()
+    await service.initialize()
+    try:
+        assert "marketfiyat_upstream_pool_connections" in service.metrics.render()
+
+        transport, service._client._transport = service._client._transport, object()
+        rendered = service.metrics.render()
+        service._client._transport = transport
+    finally:
+        await service.close()
+
+    assert "marketfiyat_upstream_pool_connections" not in rendered
+    assert "marketfiyat_cache_entries 0" in rendered
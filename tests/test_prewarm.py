@@ -0,0 +1,143 @@
+"""Tests for the cache pre-warmer"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models import SearchRequest
+from app.services import CachePrewarmer, MarketfiyatService
+from app.services.prewarm import TokenBucket, parse_targets
+
+
+@pytest.fixture
+def service():
+    """Create a caching service whose upstream returns empty results"""
+    nearest = MagicMock()
+    nearest.json.return_value = []
+    search = MagicMock()
+    search.json.return_value = {
+        "numberOfFound": 0,
+        "searchResultType": 2,
+        "content": [],
+        "facetMap": {},
+    }
+
+    async def post(url, **kwargs):
+        return nearest if url == "/api/v2/nearest" else search
+
+    marketfiyat_service = MarketfiyatService(cache_seconds=300)
+    marketfiyat_service._client = AsyncMock()
+    marketfiyat_service._client.post = AsyncMock(side_effect=post)
+    return marketfiyat_service
+
+
+def _search_calls(service: MarketfiyatService) -> int:
+    return sum(
+        call.args[0] == "/api/v2/search" for call in service._client.post.call_args_list
+    )
+
+
+def test_parse_targets():
+    """Test configured targets parse into search requests"""
+    targets = parse_targets("ekmek@39.9,32.8; süt kakao@39.9,32.8,3;")
+
+    assert [(t.keywords, t.latitude, t.longitude, t.distance) for t in targets] == [
+        ("ekmek", 39.9, 32.8, 1),
+        ("süt kakao", 39.9, 32.8, 3),
+    ]
+    assert parse_targets("") == []
+    with pytest.raises(ValueError):
+        parse_targets("ekmek")
+
+
+def test_token_bucket():
+    """Test the bucket allows bursts up to its capacity"""
+    bucket = TokenBucket(rate=0.0, capacity=2)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_warm_refreshes_due_targets(service):
+    """Test missing and soon-expiring entries are refreshed, fresh ones are not"""
+    targets = parse_targets("ekmek@39.9,32.8;süt@39.9,32.8")
+    prewarmer = CachePrewarmer(service, targets, learned=0, lead_seconds=60)
+
+    assert await prewarmer.warm() == 2
+    assert service.cache_ttl(targets[0]) == pytest.approx(300, abs=1)
+    assert await prewarmer.warm() == 0
+
+    short = CachePrewarmer(service, targets, learned=0, lead_seconds=600)
+    assert await short.warm() == 2
+    assert _search_calls(service) == 4
+
+
+@pytest.mark.asyncio
+async def test_warm_learns_popular_searches(service):
+    """Test frequent searches are warmed and refreshes are not counted"""
+    request = SearchRequest(keywords="Yumurta", latitude=39.9, longitude=32.8)
+    await service.search(request)
+    await service.search(request)
+    await service.search(request.model_copy(update={"keywords": "un"}))
+
+    assert [r.keywords for r in service.popular_requests(1)] == ["Yumurta"]
+
+    prewarmer = CachePrewarmer(service, learned=1, lead_seconds=600)
+    assert await prewarmer.warm() == 1
+    assert service.popular_requests(5)[0].keywords == "Yumurta"
+    assert service.top_queries(1)[0]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_warm_yields_to_live_traffic_and_budget(service):
+    """Test warming stops while searches are in flight or the budget is spent"""
+    targets = parse_targets("a@39.9,32.8;b@39.9,32.8;c@39.9,32.8")
+    prewarmer = CachePrewarmer(service, targets, learned=0, rate=0.0, burst=2)
+
+    service.in_flight = 1
+    assert await prewarmer.warm() == 0
+    service.in_flight = 0
+
+    assert await prewarmer.warm() == 2
+    assert await prewarmer.warm() == 0
+    assert prewarmer.stats()["deferred"] == 3
+
+
+@pytest.mark.asyncio
+async def test_start_and_stop(service):
+    """Test the background task only runs when there is something to warm"""
+    idle = CachePrewarmer(service, learned=0)
+    idle.start()
+    assert idle._task is None
+
+    prewarmer = CachePrewarmer(service, interval=60)
+    prewarmer.start()
+    assert prewarmer._task is not None
+    await prewarmer.stop()
+    assert prewarmer._task is None
+
+
+def test_due_keeps_pages_apart(service):
+    """Test targets differing only in page are all kept warm"""
+    first = SearchRequest(keywords="ekmek", latitude=39.9, longitude=32.8)
+    second = first.model_copy(update={"pages": 1})
+    prewarmer = CachePrewarmer(service, [first, first, second], learned=0)
+
+    assert prewarmer.due() == [first, second]
+
+
+@pytest.mark.asyncio
+async def test_failed_round_keeps_running(service, caplog):
+    """Test an unexpected error is logged and the next round still runs"""
+    prewarmer = CachePrewarmer(service, interval=0.1)
+    prewarmer.warm = AsyncMock(side_effect=[RuntimeError("boom"), 1, 1])
+    prewarmer.start()
+    while prewarmer.warm.await_count < 2:
+        await asyncio.sleep(0.05)
+    await prewarmer.stop()
+
+    assert prewarmer.stats()["failed"] == 1
+    assert "Cache pre-warming round failed" in caplog.text
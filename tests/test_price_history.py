@@ -0,0 +1,140 @@
+"""Tests for the local price history store"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import (
+    SearchRequest,
+    SearchResponse,
+)
+from app.services import MarketfiyatService, PriceHistoryStore
+from app.services.price_history import INDEX_TIME_FORMAT, INDEX_TIME_ZONE
+from tests.conftest import make_offer, make_product, make_response
+
+
+def _index_time(days_ago: int) -> str:
+    moment = datetime.now(INDEX_TIME_ZONE) - timedelta(days=days_ago)
+    return moment.strftime(INDEX_TIME_FORMAT)
+
+
+def _response(*offers: tuple[str, str, float, str]) -> SearchResponse:
+    return make_response(
+        make_product(
+            "sut-1",
+            *(
+                make_offer(depot_id, price, market=market, index_time=index_time)
+                for depot_id, market, price, index_time in offers
+            ),
+            title="Süt 1 Lt",
+            brand="Dost",
+            imageUrl="https://example.com/sut.png",
+        )
+    )
+
+
+@pytest.fixture
+async def store(tmp_path):
+    """Create a started price history store in a temporary directory"""
+    history = PriceHistoryStore(str(tmp_path / "history.sqlite3"))
+    await history.start()
+    yield history
+    await history.close()
+
+
+@pytest.mark.asyncio
+async def test_price_trend_groups_by_day_and_market(store):
+    """Test observations are summarized per day and market, and filtered"""
+    store.record(
+        _response(
+            ("bim-1", "bim", 40.0, _index_time(2)),
+            ("bim-2", "bim", 38.0, _index_time(2)),
+            ("a101-1", "a101", 35.0, _index_time(2)),
+        )
+    )
+    store.record(_response(("bim-1", "bim", 42.0, _index_time(0))))
+    await store.flush()
+
+    trend = await store.price_trend("sut-1", market="bim", days=7)
+
+    assert [point.observations for point in trend.points] == [2, 1]
+    assert trend.points[0].minPrice == 38.0
+    assert trend.points[0].maxPrice == 40.0
+    assert trend.points[1].avgPrice == 42.0
+
+    everything = await store.price_trend("sut-1", days=7)
+    assert [(point.market, point.observations) for point in everything.points] == [
+        ("a101", 1),
+        ("bim", 2),
+        ("bim", 1),
+    ]
+    assert everything.points[0].minPrice == 35.0
+    assert everything.points[1].minPrice == 38.0
+
+
+@pytest.mark.asyncio
+async def test_same_snapshot_is_stored_once(store):
+    """Test the same indexTime observed twice is appended only once"""
+    snapshot = _response(("bim-1", "bim", 40.0, _index_time(0)))
+    store.record(snapshot)
+    store.record(snapshot)
+    await store.flush()
+
+    trend = await store.price_trend("sut-1")
+
+    assert trend.points[0].observations == 1
+
+
+@pytest.mark.asyncio
+async def test_old_observations_are_excluded(store):
+    """Test the look-back window is honoured"""
+    store.record(_response(("bim-1", "bim", 40.0, _index_time(10))))
+    await store.flush()
+
+    assert (await store.price_trend("sut-1", days=3)).points == []
+    assert len((await store.price_trend("sut-1", days=30)).points) == 1
+
+
+@pytest.mark.asyncio
+async def test_background_writer_persists_search_results(tmp_path):
+    """Test fresh search results reach the store through the background writer"""
+    history = PriceHistoryStore(str(tmp_path / "history.sqlite3"))
+    service = MarketfiyatService(cache_seconds=0, history=history)
+    await history.start()
+
+    nearest_response = MagicMock()
+    nearest_response.json.return_value = []
+    search_response = MagicMock()
+    search_response.json.return_value = _response(
+        ("bim-1", "bim", 40.0, _index_time(0))
+    ).model_dump()
+
+    async def mock_post(url, **kwargs):
+        return nearest_response if url == "/api/v2/nearest" else search_response
+
+    service._client = AsyncMock()
+    service._client.post = AsyncMock(side_effect=mock_post)
+
+    await service.search(SearchRequest(keywords="süt", latitude=39.9, longitude=32.8))
+
+    deadline = time.monotonic() + 2
+    while history.written == 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+    assert history.written == 1
+    trend = await history.price_trend("sut-1", market="bim")
+    assert trend.points[0].minPrice == 40.0
+    await history.close()
+
+
+def test_history_endpoint_disabled(client: TestClient):
+    """Test the history endpoint reports when no store is configured"""
+    response = client.get("/history/sut-1")
+
+    assert response.status_code == 503
@@ -0,0 +1,127 @@
+"""Tests for the product registry and multi-page merging"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models import (
+    Product,
+    SearchRequest,
+    SearchResponse,
+)
+from app.services import MarketfiyatService
+from app.services.product_registry import ProductRegistry, merge_search_responses
+from tests.conftest import make_offer, make_product, make_response
+
+
+def _product(product_id: str, *depots: tuple[str, float]) -> Product:
+    return make_product(
+        product_id,
+        *(make_offer(depot_id, price) for depot_id, price in depots),
+        imageUrl=f"https://example.com/{product_id}.png",
+        refinedVolumeOrWeight="1 kg",
+        categories=["Temel Gıda", "Un"],
+    )
+
+
+def _page(*products: Product, found: int = 3) -> SearchResponse:
+    return make_response(*products, found=found)
+
+
+def test_registry_shares_static_attributes():
+    """Test copies of a product reference the same static attribute objects"""
+    registry = ProductRegistry()
+    first = registry.canonicalize(_product("p1", ("bim-1", 10.0)))
+    second = registry.canonicalize(_product("p1", ("a101-1", 12.0)))
+
+    assert first.title is second.title
+    assert first.categories is second.categories
+    assert second.productDepotInfoList[0].depotId == "a101-1"
+    assert registry.stats()["hits"] == 1
+    assert len(registry) == 1
+
+
+def test_registry_updates_changed_products():
+    """Test a product whose static attributes changed is re-registered"""
+    registry = ProductRegistry()
+    registry.register(_product("p1"))
+    changed = _product("p1")
+    changed.title = "Yeni Başlık"
+
+    assert registry.register(changed).title == "Yeni Başlık"
+    assert registry.get("p1").title == "Yeni Başlık"
+
+
+def test_registry_evicts_least_recently_seen():
+    """Test the registry stays within its size bound"""
+    registry = ProductRegistry(max_size=2)
+    registry.register(_product("p1"))
+    registry.register(_product("p2"))
+    registry.register(_product("p1"))
+    registry.register(_product("p3"))
+
+    assert "p1" in registry
+    assert "p2" not in registry
+    assert "p3" in registry
+    assert registry.stats()["evictions"] == 1
+
+
+def test_merge_deduplicates_products_and_offers():
+    """Test merging pages removes duplicate products and depot offers"""
+    registry = ProductRegistry()
+    merged = merge_search_responses(
+        [
+            _page(_product("p1", ("bim-1", 10.0)), _product("p2", ("bim-1", 5.0))),
+            _page(
+                _product("p2", ("bim-1", 5.0), ("a101-1", 4.5)),
+                _product("p3", ("sok-1", 7.0)),
+                found=4,
+            ),
+        ],
+        registry,
+    )
+
+    assert [product.id for product in merged.content] == ["p1", "p2", "p3"]
+    assert [offer.depotId for offer in merged.content[1].productDepotInfoList] == [
+        "bim-1",
+        "a101-1",
+    ]
+    assert merged.numberOfFound == 4
+    assert len(registry) == 3
+
+
+def test_merge_requires_a_response():
+    """Test merging nothing is rejected"""
+    with pytest.raises(ValueError):
+        merge_search_responses([])
+
+
+@pytest.mark.asyncio
+async def test_search_pages_fetches_and_merges():
+    """Test search_pages requests consecutive pages and merges them"""
+    service = MarketfiyatService(cache_seconds=0)
+
+    nearest_response = MagicMock()
+    nearest_response.json.return_value = []
+    pages = {
+        1: _page(_product("p1", ("bim-1", 10.0)), _product("p2", ("bim-1", 5.0))),
+        2: _page(_product("p2", ("bim-1", 5.0)), _product("p3", ("sok-1", 7.0))),
+    }
+
+    async def mock_post(url, **kwargs):
+        if url == "/api/v2/nearest":
+            return nearest_response
+        search_response = MagicMock()
+        search_response.json.return_value = pages[kwargs["json"]["pages"]].model_dump()
+        return search_response
+
+    service._client = AsyncMock()
+    service._client.post = AsyncMock(side_effect=mock_post)
+
+    request = SearchRequest(keywords="un", latitude=39.9, longitude=32.8, pages=1)
+    merged = await service.search_pages(request, 2)
+
+    assert [product.id for product in merged.content] == ["p1", "p2", "p3"]
+    assert merged.content[1].title is service.products.get("p2").title
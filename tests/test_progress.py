@@ -0,0 +1,114 @@
+"""Tests for progress reporting and cancellation of concurrent upstream calls"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastmcp import Client
+
+from app.mcp import PARTIAL_RESULT_LOGGER
+from app.mcp_mount import get_mcp_server
+from app.models import FacetMap, SearchResponse
+from app.services.progress import gather_with_progress
+
+SEARCH = "app.services.marketfiyat_service.MarketfiyatService.search"
+
+
+async def _sleep(value: int, delay: float, cancelled: list[int]) -> int:
+    try:
+        await asyncio.sleep(delay)
+    except asyncio.CancelledError:
+        cancelled.append(value)
+        raise
+    return value
+
+
+@pytest.mark.asyncio
+async def test_results_are_reported_as_they_finish():
+    """Test the callback sees results in completion order, results stay ordered"""
+    seen: list[tuple[int, int]] = []
+
+    async def on_result(position: int, result: int) -> None:
+        seen.append((position, result))
+
+    results = await gather_with_progress(
+        [_sleep(0, 0.03, []), _sleep(1, 0.0, []), _sleep(2, 0.01, [])], on_result
+    )
+
+    assert results == [0, 1, 2]
+    assert seen == [(1, 1), (2, 2), (0, 0)]
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_outstanding_calls():
+    """Test the first failure aborts the awaitables still running"""
+    cancelled: list[int] = []
+
+    async def fail() -> int:
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        await gather_with_progress([_sleep(0, 10, cancelled), fail()])
+    await asyncio.sleep(0)
+
+    assert cancelled == [0]
+
+
+@pytest.mark.asyncio
+async def test_cancellation_aborts_outstanding_calls():
+    """Test cancelling the caller cancels every awaitable still running"""
+    cancelled: list[int] = []
+    task = asyncio.ensure_future(
+        gather_with_progress([_sleep(index, 10, cancelled) for index in range(3)])
+    )
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0)
+
+    assert sorted(cancelled) == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_multi_page_search_reports_progress(app: FastAPI):
+    """Test each fetched page is sent as progress and as a partial result"""
+
+    async def mock_search(request):
+        return SearchResponse(
+            numberOfFound=0, searchResultType=1, content=[], facetMap=FacetMap()
+        )
+
+    progress: list[tuple[float, float | None]] = []
+    partials: list[dict] = []
+
+    async def on_progress(value: float, total: float | None, message: str | None):
+        progress.append((value, total))
+
+    async def on_log(message) -> None:
+        if message.logger == PARTIAL_RESULT_LOGGER:
+            partials.append(message.data["extra"])
+
+    with patch(SEARCH, side_effect=mock_search):
+        async with Client(get_mcp_server(app), log_handler=on_log) as client:
+            await client.call_tool(
+                "search_products",
+                {
+                    "keywords": "süt",
+                    "latitude": 39.9,
+                    "longitude": 32.5,
+                    "page_count": 3,
+                },
+                progress_handler=on_progress,
+            )
+
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert sorted(partial["label"] for partial in partials) == [
+        "page 0",
+        "page 1",
+        "page 2",
+    ]
+    assert partials[0]["result"] == {"numberOfFound": 0, "content": []}
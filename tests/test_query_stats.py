@@ -0,0 +1,121 @@
+"""Tests for heavy-hitter query tracking and cache eviction"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import FacetMap, SearchRequest, SearchResponse
+from app.services import MarketfiyatService
+from app.services.query_stats import CountMinSketch, HeavyHitters, normalize_key
+
+
+def test_normalize_key():
+    """Test spelling variants and nearby coordinates share one key"""
+    assert normalize_key(("SÜT  Kakao", 0, 24, 39.93641, 32.58598, 1)) == (
+        normalize_key(("sut kakao", 0, 24, 39.93649, 32.58611, 1))
+    )
+
+
+def test_count_min_never_undercounts():
+    """Test estimates are at least the true counts, even when tiny"""
+    sketch = CountMinSketch(width=16, depth=3)
+    for number in range(200):
+        for _ in range(number % 5):
+            sketch.add(number)
+
+    assert all(sketch.estimate(number) >= number % 5 for number in range(200))
+    sketch.halve()
+    assert sketch.estimate(4) >= 2
+
+
+def test_heavy_hitters_keep_top_k():
+    """Test the heaviest keys survive a long tail of rare keys"""
+    tracker = HeavyHitters(k=3, width=1024)
+    for round_number in range(50):
+        tracker.add("ekmek", sample="Ekmek")
+        if round_number % 2 == 0:
+            tracker.add("süt")
+        tracker.add(f"rare-{round_number}")
+
+    top = tracker.top()
+
+    assert [key for key, _, _ in top[:2]] == ["ekmek", "süt"]
+    assert top[0] == ("ekmek", "Ekmek", 50)
+    assert len(top) == 3
+    assert tracker.total == 125
+
+
+def test_heavy_hitters_decay():
+    """Test counts halve after each window so old traffic fades"""
+    tracker = HeavyHitters(k=2, width=1024, window=10)
+    for _ in range(9):
+        tracker.add("ekmek")
+
+    tracker.add("süt")
+
+    assert tracker.top()[0] == ("ekmek", "ekmek", 4)
+
+
+def _upstream() -> AsyncMock:
+    response = MagicMock()
+    response.json.return_value = SearchResponse(
+        numberOfFound=0, searchResultType=2, content=[], facetMap=FacetMap()
+    ).model_dump()
+    client = AsyncMock()
+    client.post = AsyncMock(return_value=response)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_requested():
+    """Test a full cache drops the entries requested least often"""
+    service = MarketfiyatService(cache_seconds=300, cache_max_entries=2)
+    service.get_nearest_depots = AsyncMock(return_value=[])
+    service._client = _upstream()
+
+    popular = SearchRequest(keywords="ekmek", latitude=39.9, longitude=32.8)
+    for _ in range(3):
+        await service.search(popular)
+    await service.search(popular.model_copy(update={"keywords": "un"}))
+    await service.search(popular.model_copy(update={"keywords": "tuz"}))
+
+    assert len(service._cache) == 2
+    assert service._build_cache_key(popular) in service._cache
+    assert service.cache_stats()["evictions"] == 1
+
+
+def test_top_queries_endpoint(client: TestClient, app):
+    """Test the admin endpoint reports normalized heavy hitters"""
+    with patch(
+        "app.services.marketfiyat_service.MarketfiyatService.get_nearest_depots",
+        new=AsyncMock(return_value=[]),
+    ):
+        service = app.state.marketfiyat_service
+        service._client = _upstream()
+        for keywords in ("Süt", "süt", "SUT", "ekmek"):
+            response = client.get(
+                "/search",
+                params={"keywords": keywords, "latitude": 39.9, "longitude": 32.8},
+            )
+            assert response.status_code == 200
+
+    response = client.get("/admin/queries/top", params={"limit": 1})
+
+    assert response.json() == {
+        "total": 4,
+        "queries": [
+            {
+                "keywords": "sut",
+                "pages": 0,
+                "size": 24,
+                "latitude": 39.9,
+                "longitude": 32.8,
+                "distance": 1,
+                "category": False,
+                "count": 3,
+            }
+        ],
+    }
@@ -0,0 +1,86 @@
+"""Tests for the precomputed OpenAPI and MCP tool schema artifact"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from fastmcp import Client
+
+from app.main import create_app
+from app.mcp_mount import get_mcp_server
+from app.schema_artifact import load_schema_artifact, main, route_fingerprint
+
+ARTIFACT_PATH = "app.schema_artifact.SCHEMA_ARTIFACT_PATH"
+
+
+@pytest.fixture(scope="module")
+def artifact_file(tmp_path_factory) -> Path:
+    """Build the artifact once with marked OpenAPI and tool descriptions"""
+    path = tmp_path_factory.mktemp("artifact") / "schemas.json"
+    main([str(path)])
+    artifact = json.loads(path.read_text())
+    artifact["openapi"]["info"]["x-precomputed"] = True
+    for tool in artifact["mcpTools"]:
+        tool["description"] = "precomputed"
+    path.write_text(json.dumps(artifact))
+    return path
+
+
+def test_artifact_matches_running_code(artifact_file: Path):
+    """Test a fresh artifact loads and a stale or missing one is ignored"""
+    app = create_app(use_artifact=False)
+    assert load_schema_artifact(app, artifact_file) is not None
+    assert load_schema_artifact(app, artifact_file.parent / "missing.json") is None
+
+    stale = json.loads(artifact_file.read_text())
+    stale["fingerprint"] = "0" * 64
+    stale_file = artifact_file.parent / "stale.json"
+    stale_file.write_text(json.dumps(stale))
+    assert load_schema_artifact(app, stale_file) is None
+
+
+def test_fingerprint_covers_schema_package_versions():
+    """Test upgrading FastAPI, Pydantic or FastMCP invalidates the artifact"""
+    app = create_app(use_artifact=False)
+
+    def fingerprint(upgraded: str | None = None) -> str:
+        def version(package: str) -> str:
+            return "2.0" if package == upgraded else "1.0"
+
+        with patch("app.schema_artifact.version", side_effect=version):
+            return route_fingerprint(app)
+
+    fingerprints = {
+        fingerprint(package) for package in ("fastapi", "pydantic", "fastmcp")
+    }
+
+    assert len(fingerprints) == 3
+    assert fingerprint() not in fingerprints
+
+
+def test_openapi_served_from_artifact(artifact_file: Path):
+    """Test /openapi.json returns the precomputed document"""
+    with patch(ARTIFACT_PATH, str(artifact_file)):
+        app = create_app()
+
+    response = TestClient(app).get("/openapi.json")
+
+    assert response.status_code == 200
+    assert response.json()["info"]["x-precomputed"] is True
+
+
+@pytest.mark.asyncio
+async def test_mcp_tools_listed_from_artifact(artifact_file: Path):
+    """Test tools/list answers with the precomputed tool definitions"""
+    with patch(ARTIFACT_PATH, str(artifact_file)):
+        app = create_app()
+
+    async with Client(get_mcp_server(app)) as client:
+        tools = await client.list_tools()
+
+    assert "search_products" in {tool.name for tool in tools}
+    assert {tool.description for tool in tools} == {"precomputed"}
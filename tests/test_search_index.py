@@ -0,0 +1,224 @@
+"""Tests for Turkish tokenization and the local product index"""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import (
+    Product,
+    SearchRequest,
+)
+from app.services.search_index import ProductIndex
+from app.services.text import fold_text, tokenize, turkish_lower
+from tests.conftest import make_offer, make_product, make_response
+
+HOME = (39.9366, 32.5859)
+
+
+def _product(product_id: str, title: str, *offers: tuple[str, float, float]) -> Product:
+    return make_product(
+        product_id,
+        *(
+            make_offer(
+                depot_id,
+                price,
+                latitude=HOME[0] + north_km / 111.2,
+                longitude=HOME[1],
+            )
+            for depot_id, price, north_km in offers
+        ),
+        title=title,
+        brand="Pınar",
+        categories=["Süt Ürünleri ve Kahvaltılık", "Süt"],
+    )
+
+
+def _request(
+    keywords: str, distance: int = 1, pages: int = 0, size: int = 24
+) -> SearchRequest:
+    return SearchRequest(
+        keywords=keywords,
+        latitude=HOME[0],
+        longitude=HOME[1],
+        distance=distance,
+        pages=pages,
+        size=size,
+    )
+
+
+def test_turkish_lower_and_fold():
+    """Test Turkish casing and diacritic folding"""
+    assert turkish_lower("ISPARTA İNCİR") == "ısparta incir"
+    assert fold_text("Şekersiz Yoğurt ÇİĞ") == "sekersiz yogurt cig"
+    assert tokenize("Tam Yağlı SÜT, 1 Lt") == ["tam", "yagli", "sut", "1", "lt"]
+
+
+@pytest.fixture
+def index():
+    """Create an index filled by an upstream search for 'süt' with 5 km radius"""
+    product_index = ProductIndex()
+    product_index.add(
+        make_response(
+            _product("p1", "Tam Yağlı Süt", ("bim-1", 40.0, 0.5), ("a101-1", 35.0, 3)),
+            _product("p2", "Yarım Yağlı Süt", ("bim-1", 30.0, 0.5)),
+            _product("p3", "Laktozsuz Süt", ("sok-1", 45.0, 4)),
+        ),
+        _request("süt", distance=5),
+        ttl=60,
+    )
+    return product_index
+
+
+def test_lookup_matches_all_tokens(index):
+    """Test lookup intersects postings across title, brand and categories"""
+    assert index.lookup("SUT") == {"p1", "p2", "p3"}
+    assert index.lookup("tam yağlı") == {"p1"}
+    assert index.lookup("pınar laktozsuz") == {"p3"}
+    assert index.lookup("peynir") == set()
+
+
+def test_local_search_within_covered_area(index):
+    """Test a covered query is answered locally with offers in range only"""
+    response = index.search(_request("Süt", distance=1))
+
+    assert response is not None
+    assert [product.id for product in response.content] == ["p2", "p1"]
+    assert [offer.depotId for offer in response.content[1].productDepotInfoList] == [
+        "bim-1"
+    ]
+    assert response.numberOfFound == 2
+
+
+def test_local_search_requires_coverage(index):
+    """Test uncovered queries, areas and later pages fall back to upstream"""
+    assert index.search(_request("ekmek")) is None
+    assert index.search(_request("süt", distance=10)) is None
+    assert index.stats()["local_misses"] == 2
+
+
+def test_partial_results_only_cover_first_page():
+    """Test pages beyond a partial upstream result are not answered locally"""
+    product_index = ProductIndex()
+    product_index.add(
+        make_response(_product("p1", "Süt", ("bim-1", 40.0, 0)), found=50),
+        _request("süt"),
+        ttl=60,
+    )
+    assert product_index.search(_request("süt")) is not None
+    assert product_index.search(_request("süt", pages=1)) is None
+
+
+def test_partial_page_only_answers_matching_requests():
+    """Test a partial first page is replayed only for requests it can fill"""
+    product_index = ProductIndex()
+    product_index.add(
+        make_response(
+            _product("p1", "Tam Süt", ("bim-1", 40.0, 0)),
+            _product("p2", "Yarım Süt", ("bim-1", 30.0, 0)),
+            found=50,
+        ),
+        _request("süt", distance=5, size=2),
+        ttl=60,
+    )
+
+    assert product_index.search(_request("süt", distance=5, size=24)) is None
+    assert product_index.search(_request("süt", distance=1, size=2)) is None
+    response = product_index.search(_request("süt", distance=5, size=1))
+    assert response is not None
+    assert [product.id for product in response.content] == ["p1"]
+    assert response.numberOfFound == 50
+
+
+def test_complete_results_cover_narrower_queries(index):
+    """Test a complete broader result answers queries that add keywords"""
+    assert index.search(_request("tam yağlı süt")) is not None
+
+    partial = ProductIndex()
+    partial.add(
+        make_response(_product("p1", "Tam Yağlı Süt", ("bim-1", 40.0, 0.5)), found=50),
+        _request("süt"),
+        ttl=60,
+    )
+    assert partial.search(_request("tam yağlı süt")) is None
+
+
+def test_offers_merge_and_eviction():
+    """Test offers from several searches merge and the index stays bounded"""
+    product_index = ProductIndex(max_products=2)
+    product_index.add(make_response(_product("p1", "Tam Süt", ("bim-1", 40.0, 0))))
+    product_index.add(make_response(_product("p1", "Tam Süt", ("a101-1", 38.0, 0))))
+    merged = product_index._products["p1"].productDepotInfoList
+    assert [offer.depotId for offer in merged] == ["bim-1", "a101-1"]
+    product_index.add(make_response(_product("p2", "Ayran", ("bim-1", 10.0, 0))))
+    product_index.add(make_response(_product("p3", "Kefir", ("bim-1", 20.0, 0))))
+
+    assert len(product_index) == 2
+    assert product_index.lookup("süt") == {"p2", "p3"}
+    assert product_index.lookup("ayran") == {"p2"}
+    assert product_index.lookup("tam") == set()
+
+
+def test_search_endpoint_local_mode(client: TestClient, app):
+    """Test the local flag answers from the index and falls back otherwise"""
+    service = app.state.marketfiyat_service
+    service.index.add(
+        make_response(_product("p1", "Tam Yağlı Süt", ("bim-1", 40.0, 0.2))),
+        _request("süt"),
+        ttl=60,
+    )
+
+    with patch(
+        "app.services.marketfiyat_service.MarketfiyatService.search"
+    ) as mock_search:
+        mock_search.return_value = make_response()
+        params = {"keywords": "süt", "latitude": HOME[0], "longitude": HOME[1]}
+
+        local = client.get("/search", params={**params, "local": True})
+        assert local.json()["content"][0]["id"] == "p1"
+        assert mock_search.call_count == 0
+
+        fallback = client.get(
+            "/search", params={**params, "keywords": "ekmek", "local": True}
+        )
+        assert fallback.json()["content"] == []
+        assert mock_search.call_count == 1
+
+
+def test_stale_offers_are_left_out():
+    """Test offers not seen upstream within the freshness window are dropped"""
+    clock = [1000.0]
+    with patch("app.services.search_index.time.monotonic", lambda: clock[0]):
+        product_index = ProductIndex(freshness=60)
+        product_index.add(
+            make_response(_product("p1", "Tam Süt", ("bim-1", 40.0, 0))),
+            _request("süt"),
+            ttl=600,
+        )
+        product_index.add(
+            make_response(_product("p2", "Yarım Süt", ("bim-1", 30.0, 0)))
+        )
+        clock[0] += 100
+        product_index.add(make_response(_product("p1", "Tam Süt", ("a101-1", 38.0, 0))))
+
+        response = product_index.search(_request("süt"))
+
+    assert response is not None
+    assert [product.id for product in response.content] == ["p1"]
+    assert [offer.depotId for offer in response.content[0].productDepotInfoList] == [
+        "a101-1"
+    ]
+    merged = product_index._products["p1"].productDepotInfoList
+    assert [offer.depotId for offer in merged] == ["a101-1"]
+
+
+def test_local_mode_rejects_multiple_pages(client: TestClient):
+    """Test local answers are not silently skipped for multi-page requests"""
+    params = {"keywords": "süt", "latitude": HOME[0], "longitude": HOME[1]}
+
+    response = client.get("/search", params={**params, "local": True, "page_count": 2})
+
+    assert response.status_code == 422
+    assert "page_count" in response.json()["detail"]
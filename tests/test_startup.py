@@ -0,0 +1,23 @@
+"""Tests for the deferred MCP endpoint"""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from tests.conftest import MCP_HEADERS, MCP_INITIALIZE
+
+
+def test_mcp_endpoint_starts_on_first_request():
+    """Test the MCP endpoint is built by its first request and closed on shutdown"""
+    app = create_app()
+    mount = app.state.mcp_mount
+
+    with TestClient(app) as client:
+        assert not mount.started
+        response = client.post("/mcp/", json=MCP_INITIALIZE, headers=MCP_HEADERS)
+        assert response.status_code == 200
+        assert "mcp-session-id" in response.headers
+        assert mount.started
+
+    assert not mount.started
@@ -0,0 +1,179 @@
+"""Tests for the typeahead suggestion index"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import CategoriesResponse, Category
+from app.services.suggest import (
+    BRAND,
+    CATEGORY,
+    PRODUCT,
+    QUERY,
+    SuggestionIndex,
+)
+from app.services.text import normalize
+
+
+@pytest.fixture
+def index():
+    """Create an index with categories, brands and titles"""
+    suggestion_index = SuggestionIndex()
+    suggestion_index.add_categories(
+        CategoriesResponse(
+            content=[
+                Category(
+                    name="Süt Ürünleri ve Kahvaltılık",
+                    subcategories=["Süt", "Yoğurt", "Peynir"],
+                )
+            ]
+        )
+    )
+    suggestion_index.add("Pınar", BRAND)
+    suggestion_index.add("Pınar Tam Yağlı Süt 1 L", PRODUCT)
+    suggestion_index.add("Sütaş Ayran", PRODUCT)
+    suggestion_index.rebuild()
+    return suggestion_index
+
+
+def _texts(index: SuggestionIndex, prefix: str, limit: int = 10) -> list[str]:
+    return [suggestion.text for suggestion in index.suggest(prefix, limit)]
+
+
+def test_prefix_matches_word_starts(index):
+    """Test prefixes match from any word start, ignoring case and diacritics"""
+    assert _texts(index, "SUT") == [
+        "Süt",
+        "Süt Ürünleri ve Kahvaltılık",
+        "Sütaş Ayran",
+        "Pınar Tam Yağlı Süt 1 L",
+    ]
+    assert _texts(index, "pinar") == ["Pınar", "Pınar Tam Yağlı Süt 1 L"]
+    assert _texts(index, "tam yağ") == ["Pınar Tam Yağlı Süt 1 L"]
+    assert _texts(index, "ekmek") == []
+    assert _texts(index, "  ") == []
+
+
+def test_popularity_ranks_first(index):
+    """Test searched terms outrank unsearched ones and keep their count"""
+    for _ in range(3):
+        index.record_query("sütaş ayran")
+    index.record_query("SÜT")
+    index.rebuild()
+
+    suggestions = index.suggest("sut", limit=2)
+
+    assert [(s.text, s.popularity) for s in suggestions] == [
+        ("Sütaş Ayran", 3),
+        ("Süt", 1),
+    ]
+
+
+def test_popularity_before_term_exists(index):
+    """Test searches counted before a term is added still rank it"""
+    index.record_query("süzme peynir")
+    index.record_query("süzme peynir")
+    index.add("süzme peynir", QUERY)
+    index.rebuild()
+
+    suggestion = index.suggest("s", limit=1)[0]
+
+    assert (suggestion.text, suggestion.type, suggestion.popularity) == (
+        "süzme peynir",
+        QUERY,
+        2,
+    )
+
+
+def test_kind_upgrade_and_eviction():
+    """Test a term keeps its best source and the index stays bounded"""
+    index = SuggestionIndex(max_terms=2)
+    index.add("Süt", PRODUCT)
+    index.add("süt", CATEGORY)
+    index.rebuild()
+    assert index.suggest("süt")[0].type == CATEGORY
+
+    index.add("Ayran", PRODUCT)
+    index.add("Kefir", PRODUCT)
+    index.rebuild()
+
+    assert len(index) == 2
+    assert _texts(index, "s") == []
+    assert _texts(index, "k") == ["Kefir"]
+
+
+def test_long_prefix():
+    """Test prefixes longer than the indexed key length are still checked"""
+    index = SuggestionIndex(max_key_length=4)
+    index.add("Tam Yağlı Süt", PRODUCT)
+    index.add("Tam Yağlı Peynir", PRODUCT)
+    index.rebuild()
+
+    assert _texts(index, "tam yagli p") == ["Tam Yağlı Peynir"]
+    assert _texts(index, "yagli s") == ["Tam Yağlı Süt"]
+
+
+def test_blocks_rank_like_a_full_scan():
+    """Test precomputed block tops give the same answers as ranking every match"""
+    index = SuggestionIndex()
+    for number in range(5_000):
+        index.add(f"Ürün {number} Süt", PRODUCT)
+    for number in range(0, 5_000, 7):
+        for _ in range(number % 5):
+            index.record_query(f"ürün {number} süt")
+    index.rebuild()
+
+    for prefix in ("u", "ur", "urun 1", "urun 42", "s", "sut"):
+        expected = sorted(
+            (-index._popularity.get(key, 0), len(key), key)
+            for key in index._terms
+            if f" {prefix}" in f" {key}"
+        )[:10]
+        assert [normalize(item.text) for item in index.suggest(prefix)] == [
+            key for _, _, key in expected
+        ], prefix
+
+
+def test_changes_show_after_rebuild():
+    """Test lookups use the last snapshot until the index is rebuilt"""
+    index = SuggestionIndex()
+    index.add("Süt", CATEGORY)
+    assert _texts(index, "sü") == []
+
+    assert asyncio.run(index.refresh())
+    assert _texts(index, "sü") == ["Süt"]
+    assert not asyncio.run(index.refresh())
+    assert index.stats()["rebuilds"] == 1
+
+
+def test_memory_budget_evicts_oldest_terms():
+    """Test the estimated size of the terms stays within the byte budget"""
+    index = SuggestionIndex(max_bytes=20_000)
+    for number in range(500):
+        index.add(f"Pınar Tam Yağlı Süt {number}", PRODUCT)
+    index.rebuild()
+
+    stats = index.stats()
+    assert 0 < stats["bytes"] <= 20_000
+    assert stats["evictions"] == 500 - len(index)
+    assert _texts(index, "pinar tam yagli sut 499") == ["Pınar Tam Yağlı Süt 499"]
+    assert _texts(index, "pinar tam yagli sut 0") == []
+
+
+def test_suggest_endpoint(client: TestClient, app):
+    """Test the suggest endpoint answers from the index"""
+    suggestions = app.state.marketfiyat_service.suggestions
+    suggestions.add("Süt", CATEGORY)
+    suggestions.rebuild()
+
+    response = client.get("/suggest", params={"q": "sü", "limit": 5})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "query": "sü",
+        "suggestions": [{"text": "Süt", "type": "category", "popularity": 0}],
+    }
+    assert client.get("/suggest", params={"q": ""}).status_code == 422
@@ -0,0 +1,104 @@
+"""Tests for Server-Timing phase breakdowns"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastmcp import Client
+
+from app.mcp import SERVER_TIMING_META
+from app.mcp_mount import get_mcp_server
+from app.models import FacetMap, SearchResponse
+from app.timing import ServerTiming, record_timing, timed
+
+NEAREST = "app.services.marketfiyat_service.MarketfiyatService.get_nearest_depots"
+PARAMS = {"keywords": "süt", "latitude": 39.9, "longitude": 32.5}
+
+
+def _upstream() -> AsyncMock:
+    response = MagicMock(status_code=200)
+    response.json.return_value = SearchResponse(
+        numberOfFound=0, searchResultType=2, content=[], facetMap=FacetMap()
+    ).model_dump()
+    client = AsyncMock()
+    client.post = AsyncMock(return_value=response)
+    return client
+
+
+def _phases(header: str) -> dict[str, str]:
+    phases = {}
+    for metric in header.split(", "):
+        name, _, value = metric.partition(";")
+        phases[name] = value
+    return phases
+
+
+def test_server_timing_header():
+    """Test phases are summed and merged pages report the worst cache state"""
+    timing = ServerTiming()
+    timing.add("upstream", 0.010)
+    timing.add("upstream", 0.0025)
+    for state in ("hit", "stale", "hit"):
+        timing.mark_cache(state)
+
+    phases = _phases(timing.header())
+
+    assert phases["cache"] == 'desc="stale"'
+    assert phases["upstream"] == "dur=12.5"
+    assert float(phases["total"].removeprefix("dur=")) >= 0
+
+
+def test_phases_outside_a_request_are_ignored():
+    """Test timing calls are no-ops unless a request is being recorded"""
+    with timed("upstream"):
+        pass
+
+    with record_timing() as timing, timed("decode"):
+        pass
+
+    assert list(timing.phases) == ["decode"]
+
+
+def test_search_server_timing(client: TestClient, app: FastAPI):
+    """Test REST searches report their phases and cache outcome"""
+    app.state.marketfiyat_service._client = _upstream()
+    with patch(NEAREST, new=AsyncMock(return_value=[])):
+        miss = client.get("/search", params=PARAMS)
+        hit = client.get("/search", params=PARAMS)
+
+    phases = _phases(miss.headers["server-timing"])
+    assert phases["cache"] == 'desc="miss"'
+    assert {"depot", "upstream", "decode", "lock", "serialize", "total"} <= set(phases)
+    phases = _phases(hit.headers["server-timing"])
+    assert phases["cache"] == 'desc="hit"'
+    assert "upstream" not in phases
+
+
+def test_expired_entry_is_stale(client: TestClient, app: FastAPI):
+    """Test a search that finds an expired cache entry is flagged stale"""
+    service = app.state.marketfiyat_service
+    service._client = _upstream()
+    with patch(NEAREST, new=AsyncMock(return_value=[])):
+        client.get("/search", params=PARAMS)
+        for entry in service._cache.values():
+            entry.expires_at = datetime(2000, 1, 1)
+        response = client.get("/search", params=PARAMS)
+
+    assert _phases(response.headers["server-timing"])["cache"] == 'desc="stale"'
+
+
+@pytest.mark.asyncio
+async def test_tool_result_timing_metadata(app: FastAPI):
+    """Test search tool results carry the timings in their metadata"""
+    app.state.marketfiyat_service._client = _upstream()
+    with patch(NEAREST, new=AsyncMock(return_value=[])):
+        async with Client(get_mcp_server(app)) as client:
+            result = await client.call_tool("search_products", PARAMS)
+
+    timing = result.content[0].meta[SERVER_TIMING_META]
+    assert timing["cache"] == "miss"
+    assert {"upstream", "serialize", "total"} <= set(timing["durations"])
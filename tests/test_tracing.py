@@ -0,0 +1,207 @@
+"""Tests for request tracing"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastmcp import Client
+from mcp import types
+
+from app.mcp_mount import get_mcp_server
+from app.models import FacetMap, SearchResponse
+from app.tracing import (
+    JsonlSpanExporter,
+    Span,
+    Tracer,
+    inject_trace_context,
+    load_span_exporter,
+    parse_traceparent,
+)
+
+NEAREST = "app.services.marketfiyat_service.MarketfiyatService.get_nearest_depots"
+PARAMS = {"keywords": "süt", "latitude": 39.9, "longitude": 32.5}
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+TRACEPARENT = f"00-{TRACE_ID}-00f067aa0ba902b7-01"
+
+
+class SpanCollector:
+    """Exporter keeping finished spans in memory"""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def close(self) -> None:
+        pass
+
+    def named(self, name: str) -> Span:
+        return next(span for span in self.spans if span.name == name)
+
+
+@pytest.fixture
+def spans(app: FastAPI) -> SpanCollector:
+    collector = SpanCollector()
+    app.state.tracer.exporter = collector
+    response = MagicMock(status_code=200)
+    response.json.return_value = SearchResponse(
+        numberOfFound=0, searchResultType=2, content=[], facetMap=FacetMap()
+    ).model_dump()
+    upstream = AsyncMock()
+    upstream.post = AsyncMock(return_value=response)
+    app.state.marketfiyat_service._client = upstream
+    return collector
+
+
+def test_parse_traceparent():
+    """Test only well-formed W3C trace contexts are accepted"""
+    assert parse_traceparent(TRACEPARENT) == (TRACE_ID, "00f067aa0ba902b7", "01")
+    assert parse_traceparent(TRACEPARENT.upper()) is not None
+    assert parse_traceparent(None) is None
+    assert parse_traceparent("00-xyz-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(f"ff-{TRACE_ID}-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(f"00-{'0' * 32}-00f067aa0ba902b7-01") is None
+
+
+def test_spans_nest_and_record_errors(tmp_path):
+    """Test child spans share the trace and failures are marked"""
+    exporter = JsonlSpanExporter(tmp_path / "traces.jsonl", batch_size=100)
+    tracer = Tracer(exporter)
+    with (
+        tracer.span("outer") as outer,
+        pytest.raises(ValueError),
+        tracer.span("inner", key="value"),
+    ):
+        raise ValueError("boom")
+    tracer.close()
+
+    inner, recorded = (
+        json.loads(line) for line in exporter.path.read_text().splitlines()
+    )
+    assert inner["traceId"] == recorded["traceId"] == outer.trace_id
+    assert inner["parentId"] == recorded["spanId"]
+    assert recorded["parentId"] is None
+    assert inner["status"] == "error"
+    assert inner["attributes"] == {"key": "value", "error": "ValueError"}
+    assert recorded["durationMs"] >= inner["durationMs"]
+
+
+def test_batches_are_written_off_the_calling_thread(tmp_path):
+    """Test full batches go to the writer thread and close writes the rest"""
+    exporter = JsonlSpanExporter(tmp_path / "traces.jsonl", batch_size=2)
+    writers = []
+    write = exporter._write
+
+    def record(batch: list[Span]) -> None:
+        writers.append(threading.current_thread())
+        write(batch)
+
+    exporter._write = record
+    tracer = Tracer(exporter)
+    for name in ("first", "second", "third"):
+        with tracer.span(name):
+            pass
+    tracer.close()
+
+    assert len(writers) == 2
+    assert threading.current_thread() not in writers
+    lines = exporter.path.read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["first", "second", "third"]
+
+
+def test_idle_spans_are_written_without_close(tmp_path):
+    """Test a lone span reaches the file after the flush interval"""
+    exporter = JsonlSpanExporter(
+        tmp_path / "traces.jsonl", batch_size=100, flush_interval=0.05
+    )
+    with Tracer(exporter).span("lonely"):
+        pass
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if exporter.path.exists() and exporter.path.read_text().endswith("\n"):
+            break
+        time.sleep(0.01)
+    assert json.loads(exporter.path.read_text())["name"] == "lonely"
+    exporter.close()
+
+
+def test_disabled_tracer_records_nothing():
+    """Test spans are no-ops without an exporter"""
+    with Tracer().span("search") as span:
+        assert span is None
+
+
+@pytest.mark.asyncio
+async def test_upstream_requests_carry_trace_context():
+    """Test the httpx hook sends the current span as traceparent"""
+    request = httpx.Request("POST", "https://example.com/api/v2/search")
+    with Tracer(SpanCollector()).span("upstream") as span:
+        await inject_trace_context(request)
+
+    assert request.headers["traceparent"] == span.traceparent
+
+
+def test_load_span_exporter(tmp_path):
+    """Test exporters are selected by name or loaded from a factory"""
+    assert load_span_exporter("", "traces.jsonl") is None
+    exporter = load_span_exporter("jsonl", str(tmp_path / "traces.jsonl"))
+    assert isinstance(exporter, JsonlSpanExporter)
+    factory = load_span_exporter("tests.test_tracing:SpanCollector", "")
+    assert isinstance(factory, SpanCollector)
+    with pytest.raises(ValueError):
+        load_span_exporter("collector", "")
+
+
+def test_search_spans_continue_incoming_trace(client: TestClient, spans: SpanCollector):
+    """Test a REST search is traced from the route to the upstream call"""
+    with patch(NEAREST, new=AsyncMock(return_value=[])):
+        response = client.get(
+            "/search", params=PARAMS, headers={"traceparent": TRACEPARENT}
+        )
+    assert response.status_code == 200
+
+    request = spans.named("GET /search")
+    search = spans.named("search")
+    upstream = spans.named("upstream /api/v2/search")
+    assert {span.trace_id for span in spans.spans} == {TRACE_ID}
+    assert request.parent_id == "00f067aa0ba902b7"
+    assert request.attributes["status"] == 200
+    assert search.parent_id == request.span_id
+    assert search.attributes["keywords"] == "süt"
+    assert spans.named("cache.read").attributes["state"] == "miss"
+    assert spans.named("depot").parent_id == search.span_id
+    assert upstream.parent_id == search.span_id
+    assert upstream.attributes["status"] == 200
+    assert spans.named("cache.write").parent_id == search.span_id
+
+
+@pytest.mark.asyncio
+async def test_tool_span_continues_meta_trace(app: FastAPI, spans: SpanCollector):
+    """Test tool dispatch continues a traceparent sent in the request _meta"""
+    params = types.CallToolRequestParams(
+        name="search_products",
+        arguments=PARAMS,
+        _meta={"traceparent": TRACEPARENT},
+    )
+    with patch(NEAREST, new=AsyncMock(return_value=[])):
+        async with Client(get_mcp_server(app)) as client:
+            await client.session.send_request(
+                types.ClientRequest(
+                    types.CallToolRequest(method="tools/call", params=params)
+                ),
+                types.CallToolResult,
+            )
+
+    tool = spans.named("mcp.tool search_products")
+    assert tool.trace_id == TRACE_ID
+    assert tool.parent_id == "00f067aa0ba902b7"
+    assert spans.named("search").parent_id == tool.span_id
@@ -0,0 +1,110 @@
+"""Tests for compact search response views"""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import (
+    SearchView,
+)
+from app.services import project_search_response, render_search_response
+from tests.conftest import make_offer, make_product, make_response
+
+
+@pytest.fixture
+def search_response():
+    """Create a search response with several offers per product"""
+    return make_response(
+        make_product(
+            "p1",
+            make_offer("bim-1", 38.5, depot_name="bim depot", unit_price="38.50 ₺"),
+            make_offer("a101-1", 36.0, depot_name="a101 depot", unit_price="36.00 ₺"),
+            title="Süt 1 Lt",
+            brand="Dost",
+            imageUrl="https://example.com/p1.png",
+            refinedVolumeOrWeight="1 lt",
+        ),
+        make_product(
+            "p2",
+            title="Ekmek",
+            brand="Uno",
+            imageUrl="https://example.com/p2.png",
+            categories=["Ekmek"],
+        ),
+        result_type=1,
+    )
+
+
+def test_summary_view(search_response):
+    """Test the summary view keeps title, brand and the minimum price"""
+    projected = project_search_response(search_response, SearchView.SUMMARY)
+
+    assert projected.numberOfFound == 2
+    assert projected.content[0].minPrice == 36.0
+    assert projected.content[0].offerCount == 2
+    assert projected.content[1].minPrice is None
+
+
+def test_cheapest_view(search_response):
+    """Test the cheapest view picks the lowest priced offer"""
+    data = json.loads(render_search_response(search_response, SearchView.CHEAPEST))
+
+    assert data["content"][0]["cheapest"]["marketAdi"] == "a101"
+    assert data["content"][0]["cheapest"]["price"] == 36.0
+    assert data["content"][1]["cheapest"] is None
+    assert "imageUrl" not in data["content"][0]
+    assert "facetMap" not in data
+
+
+def test_full_view_matches_model_dump(search_response):
+    """Test the full view is identical to the default serialization"""
+    rendered = json.loads(render_search_response(search_response, SearchView.FULL))
+
+    assert rendered == search_response.model_dump(mode="json")
+
+
+def test_search_get_with_view(client: TestClient, search_response):
+    """Test the view query parameter on the search endpoint"""
+    with patch(
+        "app.services.marketfiyat_service.MarketfiyatService.search"
+    ) as mock_search:
+        mock_search.return_value = search_response
+
+        response = client.get(
+            "/search",
+            params={
+                "keywords": "süt",
+                "latitude": 39.9366,
+                "longitude": 32.5859,
+                "view": "summary",
+            },
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["content"][0] == {
+            "id": "p1",
+            "title": "Süt 1 Lt",
+            "brand": "Dost",
+            "minPrice": 36.0,
+            "offerCount": 2,
+        }
+
+
+def test_search_invalid_view(client: TestClient):
+    """Test an unknown view is rejected"""
+    response = client.get(
+        "/search",
+        params={
+            "keywords": "süt",
+            "latitude": 39.9366,
+            "longitude": 32.5859,
+            "view": "everything",
+        },
+    )
+
+    assert response.status_code == 422